@@ -8,14 +8,15 @@ from alembic import context
 # Додаємо шлях до кореневого каталогу проєкту, щоб коректно імпортувати `config.py`
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Імпортуємо змінну підключення до бази даних
-from app.config import SQLALCHEMY_DATABASE_URL, Base  # Імпортуємо Base, щоб Alembic міг бачити моделі
+# Імпортуємо налаштування підключення до бази даних
+from app.config import Base, get_settings
+import app.database.models  # noqa: F401 — реєструє моделі в Base.metadata
 
 # Отримуємо конфігурацію Alembic
 config = context.config
 
 # Встановлюємо URL бази даних у конфігурацію Alembic
-config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL)
+config.set_main_option("sqlalchemy.url", get_settings().get_database_url())
 
 # Налаштування логування Alembic
 if config.config_file_name is not None:
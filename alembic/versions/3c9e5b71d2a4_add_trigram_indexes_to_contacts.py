@@ -0,0 +1,53 @@
+"""Add trigram indexes to contacts
+
+Revision ID: 3c9e5b71d2a4
+Revises: 0fe4f0f5efb9
+Create Date: 2026-10-17 09:12:41.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5b71d2a4'
+down_revision: Union[str, None] = '0fe4f0f5efb9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = ('first_name', 'last_name', 'email')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm є лише в PostgreSQL; на інших БД пошук працює без цих індексів
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CREATE INDEX CONCURRENTLY не блокує запис у contacts на час побудови GIN-індексів,
+    # але не може виконуватися в транзакції. Невалідний індекс після перерваної побудови
+    # треба видалити вручну (DROP INDEX CONCURRENTLY) і повторити міграцію.
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_contacts_{column}_trgm',
+                'contacts',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.drop_index(f'ix_contacts_{column}_trgm', table_name='contacts',
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""Add birthday_doy to contacts
+
+Revision ID: 5d8a2f6c4b17
+Revises: 3c9e5b71d2a4
+Create Date: 2026-10-17 10:04:18.552903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8a2f6c4b17'
+down_revision: Union[str, None] = '3c9e5b71d2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# month * 100 + day для наявних записів
+BACKFILL_SQL = {
+    'postgresql': (
+        'UPDATE contacts SET birthday_doy = '
+        'CAST(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday) AS INTEGER) '
+        'WHERE birthday IS NOT NULL'
+    ),
+    'sqlite': (
+        "UPDATE contacts SET birthday_doy = CAST(strftime('%m%d', birthday) AS INTEGER) "
+        'WHERE birthday IS NOT NULL'
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('birthday_doy', sa.Integer(), nullable=True))
+    op.execute(BACKFILL_SQL.get(op.get_bind().dialect.name, BACKFILL_SQL['postgresql']))
+    op.create_index('ix_contacts_user_id_birthday_doy', 'contacts', ['user_id', 'birthday_doy'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_birthday_doy', table_name='contacts')
+    op.drop_column('contacts', 'birthday_doy')
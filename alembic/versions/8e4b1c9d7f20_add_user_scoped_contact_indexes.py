@@ -0,0 +1,79 @@
+"""Add user-scoped contact indexes and per-user email uniqueness
+
+Revision ID: 8e4b1c9d7f20
+Revises: 5d8a2f6c4b17
+Create Date: 2026-10-17 14:20:37.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b1c9d7f20'
+down_revision: Union[str, None] = '5d8a2f6c4b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Список контактів (keyset за id) і сортування/пошук за прізвищем у межах користувача
+INDEXES = {
+    'ix_contacts_user_id_id': ['user_id', 'id'],
+    'ix_contacts_user_id_name': ['user_id', 'last_name', 'first_name'],
+}
+USER_EMAIL_UNIQUE = 'uq_contacts_user_id_email'
+# Ім'я, яке PostgreSQL дав безіменному UniqueConstraint('email') з 7a6821247c93
+GLOBAL_EMAIL_UNIQUE = 'contacts_email_key'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY не блокує запис у таблицю, але не може виконуватися
+        # в транзакції. Якщо побудова перервалася, IF NOT EXISTS не допоможе з невалідним
+        # індексом — його треба видалити вручну (DROP INDEX CONCURRENTLY) і повторити міграцію.
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(name, 'contacts', columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+            op.create_index(USER_EMAIL_UNIQUE, 'contacts', ['user_id', 'email'], unique=True,
+                            postgresql_concurrently=True, if_not_exists=True)
+        # Обмеження поверх готового індексу і видалення глобального — лише зміна каталогу
+        op.execute(
+            f'ALTER TABLE contacts ADD CONSTRAINT {USER_EMAIL_UNIQUE} UNIQUE USING INDEX {USER_EMAIL_UNIQUE}'
+        )
+        op.execute(f'ALTER TABLE contacts DROP CONSTRAINT IF EXISTS {GLOBAL_EMAIL_UNIQUE}')
+        return
+
+    # Інші БД (SQLite у розробці): звичайні індекси, обмеження змінюються перебудовою таблиці
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'contacts', columns, unique=False)
+    with op.batch_alter_table(
+        'contacts',
+        naming_convention={'uq': 'uq_%(table_name)s_%(column_0_name)s'},
+    ) as batch_op:
+        batch_op.drop_constraint('uq_contacts_email', type_='unique')
+        batch_op.create_unique_constraint(USER_EMAIL_UNIQUE, ['user_id', 'email'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Глобальна унікальність не відновиться, якщо в різних користувачів є однакові email
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute(f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {GLOBAL_EMAIL_UNIQUE} ON contacts (email)')
+        op.execute(
+            f'ALTER TABLE contacts ADD CONSTRAINT {GLOBAL_EMAIL_UNIQUE} UNIQUE USING INDEX {GLOBAL_EMAIL_UNIQUE}'
+        )
+        op.execute(f'ALTER TABLE contacts DROP CONSTRAINT IF EXISTS {USER_EMAIL_UNIQUE}')
+        with op.get_context().autocommit_block():
+            for name in INDEXES:
+                op.drop_index(name, table_name='contacts', postgresql_concurrently=True, if_exists=True)
+        return
+
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_constraint(USER_EMAIL_UNIQUE, type_='unique')
+        batch_op.create_unique_constraint('uq_contacts_email', ['email'])
+    for name in INDEXES:
+        op.drop_index(name, table_name='contacts')
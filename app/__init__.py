@@ -0,0 +1,6 @@
+from dotenv import load_dotenv
+
+# Змінні з .env (не перезаписують уже задані в оточенні) завантажуються один раз,
+# до імпорту будь-якого модуля застосунку: з os.environ їх читають app.config.Settings
+# і сторонні бібліотеки (наприклад, boto3 — AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY).
+load_dotenv()
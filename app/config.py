@@ -1,55 +1,211 @@
 import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from redis import asyncio as aioredis
-from fastapi_limiter import FastAPILimiter
+from functools import lru_cache
+from typing import Optional
 
-# Завантажуємо змінні середовища
-load_dotenv()
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from sqlalchemy.orm import declarative_base
 
-# Перевірка змінних середовища
-print(f"DATABASE_URL: {os.getenv('DATABASE_URL')}")
-print(f"SECRET_KEY: {os.getenv('SECRET_KEY')}")
+# Налаштування процесу. Імпорт модуля нічого не створює і не виводить: налаштування
+# читаються при першому виклику get_settings(), двигуни БД і фабрики сесій — при першому
+# зверненні (у робочому процесі — під час старту застосунку, у lifespan).
+# Файл .env завантажується один раз у app/__init__.py.
 
-# Функція для отримання URL бази даних
-def get_database_url():
-    database_url = os.getenv("DATABASE_URL")
-    if not database_url:
-        print("ERROR: DATABASE_URL is not set.")
-    return database_url
 
-# Отримуємо URL бази даних
-SQLALCHEMY_DATABASE_URL = get_database_url()
+class Settings(BaseSettings):
+    """
+    Усі налаштування застосунку. Кожне поле читається зі змінної середовища з тією ж
+    назвою у верхньому регістрі (DATABASE_URL, REDIS_URL, RATE_LIMIT_ENABLED, ...).
+    Модулі беруть свої значення з get_settings(), а не з os.environ.
+    """
 
-# Отримуємо URL Redis
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    # 🔹 База даних
+    database_url: Optional[str] = None
+    # Окремий URL для асинхронного драйвера; за замовчуванням виводиться з DATABASE_URL
+    async_database_url: Optional[str] = None
+    # Пул з'єднань (спільний для всього процесу)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+    db_echo: bool = False
+    # Без пулу (кожен запит — нове з'єднання), наприклад у тестах з кількома event loop
+    db_use_null_pool: bool = False
 
-# Якщо змінна DATABASE_URL не була знайдена, вивести повідомлення
-if SQLALCHEMY_DATABASE_URL is None:
-    print("ERROR: DATABASE_URL is not set.")
-else:
-    print(f"Using database: {SQLALCHEMY_DATABASE_URL}")  # Додаємо вивід для перевірки
+    # 🔹 Redis і кеш
+    redis_url: str = "redis://localhost:6379"
+    contacts_cache_ttl: int = 60
+    principal_cache_size: int = 1024
+    principal_cache_local_ttl: float = 30
+    principal_cache_ttl: int = 300
 
-# Створюємо двигун бази даних
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    # 🔹 JWT
+    secret_key: str = "your_secret_key_here"
+    jwt_keys_dir: str = ""
+    jwt_active_kid: str = ""
+    jwt_accept_legacy_hs256: bool = True
+    jwt_keys_reload_interval: float = 60
+
+    # 🔹 Паролі
+    password_hash_scheme: str = "bcrypt"
+    password_bcrypt_rounds: int = 12
+    password_argon2_time_cost: int = 3
+    password_argon2_memory_cost: int = 65536
+    password_hash_workers: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    # За замовчуванням — 8 задач на процес хешування
+    password_hash_max_pending: Optional[int] = None
+
+    # 🔹 Обмеження частоти запитів ("кількість/секунди" для кожної політики)
+    rate_limit_enabled: bool = True
+    rate_limit_trust_proxy: bool = False
+    rate_limit_local_max_keys: int = 10000
+    rate_limit_login: str = "10/60"
+    rate_limit_login_ip: str = "30/60"
+    rate_limit_signup: str = "10/3600"
+    rate_limit_password_reset: str = "5/3600"
+    rate_limit_contacts_import: str = "10/60"
+    rate_limit_contacts_write: str = "120/60"
+    rate_limit_me: str = "5/60"
+
+    # 🔹 Листи
+    base_url: str = "http://127.0.0.1:8000"
+    mailgun_api_key: Optional[str] = None
+    mailgun_domain: Optional[str] = None
+    mailgun_sender: Optional[str] = None
+    email_transport: str = "mailgun"
+    email_file_path: str = "emails.jsonl"
+    email_send_timeout: float = 10
+    email_queue_name: str = "email"
+    email_max_attempts: int = 5
+    email_retry_base_delay: float = 5
+    email_retry_max_delay: float = 600
+    email_worker_heartbeat_ttl: float = 60
+    email_worker_poll_interval: float = 1
+    email_worker_metrics_port: int = 0
+
+    # 🔹 Контакти
+    contacts_page_size: int = 100
+    contacts_max_page_size: int = 1000
+    contacts_export_batch_size: int = 1000
+    contacts_import_batch_size: int = 1000
+    contacts_import_max_rows: int = 100000
+    contacts_import_max_bytes: int = 20 * 1024 * 1024
+    contacts_search_limit: int = 50
+    birthdays_window_days: int = 7
+
+    # 🔹 Аватари і сховище
+    # Каталог локального сховища аватарів (створюється під час першого запису)
+    avatar_storage_path: str = "app/static/avatars"
+    avatar_storage_backend: str = "local"
+    avatar_url_prefix: str = "/avatars"
+    avatar_max_bytes: int = 5 * 1024 * 1024
+    # Розміри варіантів через кому
+    avatar_sizes: str = "64,128,256"
+    avatar_default_size: int = 128
+    avatar_format: str = "webp"
+    avatar_quality: int = 85
+    avatar_max_pixels: int = 25_000_000
+    avatar_cache_max_age: int = 365 * 24 * 3600
+    avatar_accel_redirect_prefix: str = ""
+    avatar_workers: int = 2
+    s3_bucket: str = "avatars"
+    s3_prefix: str = "avatars/"
+    s3_upload_prefix: str = "uploads/"
+    s3_region: str = "us-east-1"
+    s3_endpoint_url: str = ""
+    s3_public_endpoint_url: str = ""
+    s3_public_url: str = ""
+    s3_presign_expires: int = 600
+
+    # 🔹 Спостережуваність
+    metrics_enabled: bool = True
+    sql_slow_query_ms: float = 200
+    sql_n_plus_one_threshold: int = 5
+    sql_log_max_length: int = 1000
+
+    def get_database_url(self) -> str:
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not set")
+        return self.database_url
+
+    def get_async_database_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        database_url = self.get_database_url()
+        if database_url.startswith(("postgresql://", "postgresql+psycopg2://", "postgres://")):
+            return "postgresql+asyncpg://" + database_url.split("://", 1)[1]
+        if database_url.startswith("sqlite://"):
+            return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return database_url
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Налаштування процесу (читаються один раз).
+    """
+    return Settings()
 
-# Створюємо фабрику сесій
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Базовий клас для моделей SQLAlchemy
 Base = declarative_base()
 
-# Імпортуємо всі моделі, щоб Alembic бачив їх
-from app.database import models
 
-# Ініціалізація FastAPI Rate Limiter (обмеження запитів)
-async def init_limiter():
-    redis = await aioredis.from_url(REDIS_URL)
-    await FastAPILimiter.init(redis)
+# 🔹 Двигуни і фабрики сесій (єдиний пул на процес; налаштування пулу — у app.database.engine)
+@lru_cache
+def get_engine():
+    from app.database.engine import create_db_engine
+
+    return create_db_engine(get_settings().get_database_url())
+
+
+@lru_cache
+def get_async_engine():
+    from app.database.engine import create_async_db_engine
+
+    return create_async_db_engine(get_settings().get_async_database_url())
+
+
+@lru_cache
+def get_session_factory():
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+@lru_cache
+def get_async_session_factory():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def dispose_engines() -> None:
+    """
+    Закриває пули з'єднань створених двигунів (при завершенні застосунку).
+    """
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+
+
+# Імена, які раніше створювалися під час імпорту; тепер — ліниво при першому зверненні
+_LAZY_EXPORTS = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "SessionLocal": get_session_factory,
+    "AsyncSessionLocal": get_async_session_factory,
+    "SQLALCHEMY_DATABASE_URL": lambda: get_settings().get_database_url(),
+    "ASYNC_SQLALCHEMY_DATABASE_URL": lambda: get_settings().get_async_database_url(),
+    "REDIS_URL": lambda: get_settings().redis_url,
+    "AVATAR_STORAGE_PATH": lambda: get_settings().avatar_storage_path,
+}
 
-# Шлях до папки з аватарами
-AVATAR_STORAGE_PATH = os.getenv("AVATAR_STORAGE_PATH", "app/static/avatars")
 
-# Створюємо директорію для збереження аватарів, якщо вона ще не існує
-os.makedirs(AVATAR_STORAGE_PATH, exist_ok=True)
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return _LAZY_EXPORTS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
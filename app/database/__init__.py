@@ -1,11 +1,10 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.config import get_database_url
+# Двигун і фабрика сесій створюються один раз у app.config при першому зверненні.
+# Реекспорт лінивий, щоб імпорт пакета не створював двигун.
+_CONFIG_EXPORTS = ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal")
 
-# Створення підключення до БД
-DATABASE_URL = get_database_url()
 
-# Створення сесії
-engine = create_engine(DATABASE_URL, echo=True)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name):
+    if name in _CONFIG_EXPORTS:
+        from app import config
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
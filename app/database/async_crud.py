@@ -0,0 +1,238 @@
+from typing import AsyncIterator, Optional
+from sqlalchemy import insert, select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.models import Contact, User, contact_columns
+from app.database.schemas import (
+    ContactCreate, ContactUpdate,
+    UserCreate, UserResponse
+)
+from app.services import async_cache as cache, password_hasher
+
+# Асинхронні аналоги функцій з app.database.crud для маршрутів на asyncio.
+# Хешування паролів (bcrypt) виконується в окремому пулі процесів (app.services.password_hasher).
+
+
+# 🔹 Операції з користувачами (User)
+async def create_user(db: AsyncSession, user: UserCreate) -> UserResponse:
+    """
+    Створення нового користувача з хешуванням пароля.
+
+    :param db: Асинхронна сесія бази даних.
+    :param user: Дані користувача для створення.
+    :return: Об'єкт відповіді користувача.
+    """
+    hashed_password = await password_hasher.hash_password(user.password)
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        password_hash=hashed_password,
+        role=user.role
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+
+    return UserResponse.model_validate(db_user)
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User).filter(User.id == user_id))
+    return result.scalars().first()
+
+
+async def update_avatar(db: AsyncSession, user: User, avatar_path: str):
+    user.avatar_url = avatar_path
+    await db.commit()
+    await db.refresh(user)
+    await cache.invalidate_principal(user.email)
+    return user
+
+
+async def update_user_password(db: AsyncSession, email: str, new_password: str) -> Optional[User]:
+    user = await get_user_by_email(db, email)
+    if not user:
+        return None
+    user.password_hash = await password_hasher.hash_password(new_password)
+    await db.commit()
+    await db.refresh(user)
+    await cache.invalidate_principal(user.email)
+    return user
+
+
+async def update_password_hash(db: AsyncSession, user: User, password_hash: str) -> User:
+    """
+    Зберігає новий хеш пароля (наприклад, після оновлення політики хешування).
+
+    :param db: Асинхронна сесія бази даних.
+    :param user: Користувач.
+    :param password_hash: Новий хеш.
+    :return: Оновлений користувач.
+    """
+    user.password_hash = password_hash
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+# 🔹 Операції з контактами (Contact)
+async def create_contact(db: AsyncSession, contact: ContactCreate, user_id: int):
+    db_contact = Contact(
+        **contact.model_dump(),
+        user_id=user_id
+    )
+    db.add(db_contact)
+    await db.commit()
+    await db.refresh(db_contact)
+    await cache.invalidate_contacts(user_id)
+    return db_contact
+
+
+async def bulk_insert_contacts(db: AsyncSession, contacts: list[dict], user_id: int) -> set[str]:
+    """
+    Вставляє пачку контактів одним INSERT (SQLAlchemy розбиває його на
+    multi-VALUES запити) в окремій транзакції. Рядки, що порушують унікальність
+    email, пропускаються (ON CONFLICT DO NOTHING) замість помилки всієї пачки.
+
+    :param db: Асинхронна сесія бази даних.
+    :param contacts: Провалідовані дані контактів.
+    :param user_id: ID користувача, якому належать контакти.
+    :return: Множина email успішно вставлених контактів.
+    """
+    if not contacts:
+        return set()
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(Contact).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(Contact).on_conflict_do_nothing()
+    else:
+        stmt = insert(Contact)
+
+    result = await db.execute(
+        stmt.returning(Contact.email),
+        [{**contact, "user_id": user_id} for contact in contacts],
+    )
+    inserted = set(result.scalars().all())
+    await db.commit()
+    return inserted
+
+
+async def get_contacts(db: AsyncSession, user_id: int, fields: Optional[list[str]] = None):
+    result = await db.execute(select(*contact_columns(fields)).filter(Contact.user_id == user_id))
+    return result.scalars().all() if fields is None else result.all()
+
+
+async def get_contacts_page(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    cursor: Optional[int] = None,
+    fields: Optional[list[str]] = None
+):
+    """
+    Сторінка контактів користувача з keyset-пагінацією за id.
+
+    :param db: Асинхронна сесія бази даних.
+    :param user_id: ID користувача.
+    :param limit: Максимальна кількість контактів на сторінці.
+    :param cursor: ID останнього контакту попередньої сторінки.
+    :param fields: Якщо задано — вибираються лише ці колонки (плюс id), рядки замість ORM-об'єктів.
+    :return: Пара (контакти сторінки; курсор наступної сторінки або None).
+    """
+    query = select(*contact_columns(fields)).filter(Contact.user_id == user_id)
+    if cursor is not None:
+        query = query.filter(Contact.id > cursor)
+    result = await db.execute(query.order_by(Contact.id).limit(limit + 1))
+    items = result.scalars().all() if fields is None else result.all()
+
+    next_cursor = items[limit - 1].id if len(items) > limit else None
+    return items[:limit], next_cursor
+
+
+async def stream_contacts(
+    db: AsyncSession,
+    user_id: int,
+    columns: tuple[str, ...],
+    batch_size: int = 1000
+) -> AsyncIterator[list]:
+    """
+    Потоково читає контакти користувача пачками через серверний курсор (yield_per),
+    не завантажуючи всю вибірку в пам'ять.
+
+    :param db: Асинхронна сесія бази даних.
+    :param user_id: ID користувача.
+    :param columns: Колонки контакту для вибірки.
+    :param batch_size: Кількість рядків у пачці.
+    :return: Асинхронний ітератор пачок рядків.
+    """
+    query = (
+        select(*(getattr(Contact, c) for c in columns))
+        .filter(Contact.user_id == user_id)
+        .order_by(Contact.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(query)
+    async for partition in result.partitions():
+        yield partition
+
+
+async def count_contacts(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(select(func.count(Contact.id)).filter(Contact.user_id == user_id))
+    return result.scalar_one()
+
+
+async def get_contact_by_id(db: AsyncSession, contact_id: int, user_id: int, fields: Optional[list[str]] = None):
+    """
+    Контакт користувача за ID.
+
+    :param db: Асинхронна сесія бази даних.
+    :param contact_id: ID контакту.
+    :param user_id: ID користувача.
+    :param fields: Якщо задано — лише ці колонки (плюс id), рядок замість ORM-об'єкта (для читання).
+    :return: Контакт або None.
+    """
+    result = await db.execute(
+        select(*contact_columns(fields)).filter(Contact.id == contact_id, Contact.user_id == user_id)
+    )
+    return result.scalars().first() if fields is None else result.first()
+
+
+async def update_contact(db: AsyncSession, contact_id: int, contact: ContactUpdate, user_id: int):
+    db_contact = await get_contact_by_id(db, contact_id, user_id)
+    if db_contact:
+        for key, value in contact.model_dump(exclude_unset=True).items():
+            setattr(db_contact, key, value)
+        await db.commit()
+        await db.refresh(db_contact)
+        await cache.invalidate_contacts(user_id)
+    return db_contact
+
+
+async def delete_contact(db: AsyncSession, contact_id: int, user_id: int):
+    db_contact = await get_contact_by_id(db, contact_id, user_id)
+    if db_contact:
+        await db.delete(db_contact)
+        await db.commit()
+        await cache.invalidate_contacts(user_id)
+    return db_contact
+
+
+# 🔹 Функції для видалення користувачів (User)
+async def delete_user(db: AsyncSession, user_id: int):
+    db_user = await get_user_by_id(db, user_id)
+    if db_user:
+        await db.delete(db_user)
+        await db.commit()
+        await cache.invalidate_principal(db_user.email)
+    return db_user
+
+
+# 🔹 Перевірка пароля
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify_password(plain_password, hashed_password)
@@ -1,11 +1,13 @@
 from typing import Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.database.models import Contact, User
+from app.database.models import Contact, User, contact_columns
 from app.database.schemas import (
     ContactCreate, ContactUpdate,
     UserCreate, UserResponse
 )
 from app.services.security import hash_password, verify_password as verify_password_service
+from app.services import cache
 
 
 # 🔹 Операції з користувачами (User)
@@ -52,6 +54,7 @@ def update_avatar(db: Session, user: User, avatar_path: str):
     user.avatar_url = avatar_path
     db.commit()
     db.refresh(user)
+    cache.invalidate_principal(user.email)
     return user
 
 
@@ -62,6 +65,7 @@ def update_user_password(db: Session, email: str, new_password: str) -> Optional
     user.password_hash = hash_password(new_password)
     db.commit()
     db.refresh(user)
+    cache.invalidate_principal(user.email)
     return user
 
 
@@ -74,15 +78,55 @@ def create_contact(db: Session, contact: ContactCreate, user_id: int):
     db.add(db_contact)
     db.commit()
     db.refresh(db_contact)
+    cache.invalidate_contacts(user_id)
     return db_contact
 
 
-def get_contacts(db: Session, user_id: int):
-    return db.query(Contact).filter(Contact.user_id == user_id).all()
+def get_contacts(db: Session, user_id: int, fields: Optional[list[str]] = None):
+    return db.query(*contact_columns(fields)).filter(Contact.user_id == user_id).all()
 
 
-def get_contact_by_id(db: Session, contact_id: int, user_id: int):
-    return db.query(Contact).filter(Contact.id == contact_id, Contact.user_id == user_id).first()
+def get_contacts_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    cursor: Optional[int] = None,
+    fields: Optional[list[str]] = None
+):
+    """
+    Сторінка контактів користувача з keyset-пагінацією за id.
+
+    :param db: Сесія бази даних.
+    :param user_id: ID користувача.
+    :param limit: Максимальна кількість контактів на сторінці.
+    :param cursor: ID останнього контакту попередньої сторінки.
+    :param fields: Якщо задано — вибираються лише ці колонки (плюс id), рядки замість ORM-об'єктів.
+    :return: Пара (контакти сторінки; курсор наступної сторінки або None).
+    """
+    query = db.query(*contact_columns(fields)).filter(Contact.user_id == user_id)
+    if cursor is not None:
+        query = query.filter(Contact.id > cursor)
+    items = query.order_by(Contact.id).limit(limit + 1).all()
+
+    next_cursor = items[limit - 1].id if len(items) > limit else None
+    return items[:limit], next_cursor
+
+
+def count_contacts(db: Session, user_id: int) -> int:
+    return db.query(func.count(Contact.id)).filter(Contact.user_id == user_id).scalar()
+
+
+def get_contact_by_id(db: Session, contact_id: int, user_id: int, fields: Optional[list[str]] = None):
+    """
+    Контакт користувача за ID.
+
+    :param db: Сесія бази даних.
+    :param contact_id: ID контакту.
+    :param user_id: ID користувача.
+    :param fields: Якщо задано — лише ці колонки (плюс id), рядок замість ORM-об'єкта (для читання).
+    :return: Контакт або None.
+    """
+    return db.query(*contact_columns(fields)).filter(Contact.id == contact_id, Contact.user_id == user_id).first()
 
 
 def update_contact(db: Session, contact_id: int, contact: ContactUpdate, user_id: int):
@@ -92,6 +136,7 @@ def update_contact(db: Session, contact_id: int, contact: ContactUpdate, user_id
             setattr(db_contact, key, value)
         db.commit()
         db.refresh(db_contact)
+        cache.invalidate_contacts(user_id)
     return db_contact
 
 
@@ -100,6 +145,7 @@ def delete_contact(db: Session, contact_id: int, user_id: int):
     if db_contact:
         db.delete(db_contact)
         db.commit()
+        cache.invalidate_contacts(user_id)
     return db_contact
 
 
@@ -109,6 +155,7 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        cache.invalidate_principal(db_user.email)
     return db_user
 
 
@@ -1,11 +1,20 @@
-from sqlalchemy.orm import sessionmaker
-from app.config import engine
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from app import config
 
 def get_db():
-    db = SessionLocal()
+    db = config.get_session_factory()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with config.get_async_session_factory()() as db:
+        yield db
+
+
+def __getattr__(name):
+    # SessionLocal / AsyncSessionLocal створюються ліниво в app.config
+    if name in ("SessionLocal", "AsyncSessionLocal"):
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,159 @@
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.config import get_settings
+from app.services import metrics, sql_instrumentation
+
+_settings = get_settings()
+
+# Налаштування пулу з'єднань (задаються через змінні середовища)
+DB_POOL_SIZE = _settings.db_pool_size
+DB_MAX_OVERFLOW = _settings.db_max_overflow
+DB_POOL_TIMEOUT = _settings.db_pool_timeout
+DB_POOL_RECYCLE = _settings.db_pool_recycle
+DB_POOL_PRE_PING = _settings.db_pool_pre_ping
+DB_STATEMENT_TIMEOUT_MS = _settings.db_statement_timeout_ms
+DB_ECHO = _settings.db_echo
+# DB_USE_NULL_POOL=1 вимикає асинхронний пул: кожна сесія відкриває власне з'єднання
+# (потрібно, коли запити обслуговуються різними event loop, як у TestClient).
+DB_USE_NULL_POOL = _settings.db_use_null_pool
+
+
+class _PoolStats:
+    """
+    Накопичувальна статистика видачі з'єднань з пулу.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts_total": self.checkouts,
+                "timeouts_total": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Вимірює час очікування з'єднання (включно з відкриттям нового при overflow).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = _PoolStats()
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_kwargs(url: str, poolclass, is_async: bool) -> dict:
+    kwargs = {"echo": DB_ECHO}
+    if DB_USE_NULL_POOL and is_async:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            poolclass=poolclass,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    if DB_STATEMENT_TIMEOUT_MS and make_url(url).get_backend_name() == "postgresql":
+        if is_async:
+            kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return kwargs
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Створює синхронний двигун БД з налаштуваннями пулу із середовища.
+
+    :param url: URL бази даних.
+    :return: Двигун SQLAlchemy.
+    """
+    engine = create_engine(url, **_engine_kwargs(url, InstrumentedQueuePool, is_async=False))
+    metrics.instrument_engine(engine)
+    sql_instrumentation.instrument_engine(engine)
+    return engine
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """
+    Створює асинхронний двигун БД з налаштуваннями пулу із середовища.
+
+    :param url: URL бази даних з асинхронним драйвером.
+    :return: Асинхронний двигун SQLAlchemy.
+    """
+    engine = create_async_engine(url, **_engine_kwargs(url, InstrumentedAsyncQueuePool, is_async=True))
+    metrics.instrument_engine(engine.sync_engine)
+    sql_instrumentation.instrument_engine(engine.sync_engine)
+    return engine
+
+
+def pool_status(engine) -> dict:
+    """
+    Повертає поточний стан пулу з'єднань двигуна.
+
+    :param engine: Синхронний або асинхронний двигун.
+    :return: Розмір пулу, видані/вільні з'єднання, overflow та статистика очікування.
+    """
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
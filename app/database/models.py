@@ -1,9 +1,28 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Date, Boolean, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
 from app.config import Base
 
 
+def birthday_doy(birthday: Optional[date]) -> Optional[int]:
+    """
+    День року дня народження у вигляді month * 100 + day (наприклад, 1231),
+    незалежний від року і високосності.
+
+    :param birthday: Дата народження.
+    :return: Ключ для пошуку найближчих днів народження або None.
+    """
+    if birthday is None:
+        return None
+    return birthday.month * 100 + birthday.day
+
+
+def _birthday_doy_default(context) -> Optional[int]:
+    # Для INSERT без ORM (наприклад, масовий імпорт) значення обчислюється з параметра birthday
+    return birthday_doy(context.get_current_parameters().get("birthday"))
+
+
 class User(Base):
     """
     Модель користувача, яка містить інформацію про зареєстрованих користувачів.
@@ -29,14 +48,55 @@ class Contact(Base):
     Модель контактів, які прив'язані до користувачів.
     """
     __tablename__ = "contacts"
+    __table_args__ = (
+        # Триграмні GIN-індекси (pg_trgm) для пошуку за підрядком; лише в PostgreSQL
+        *(
+            Index(
+                f"ix_contacts_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("first_name", "last_name", "email")
+        ),
+        # Пошук найближчих днів народження — діапазон за індексом
+        Index("ix_contacts_user_id_birthday_doy", "user_id", "birthday_doy"),
+        # Усі запити фільтрують за user_id: сторінки списку (keyset за id) і впорядкування
+        # за прізвищем читаються діапазоном індексу одного користувача
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_name", "user_id", "last_name", "first_name"),
+        # Email унікальний у межах користувача; у різних користувачів контакти можуть збігатися
+        UniqueConstraint("user_id", "email", name="uq_contacts_user_id_email"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=False)
+    email = Column(String, nullable=False)
     phone = Column(String, nullable=False)
     birthday = Column(Date, nullable=True)
+    # month * 100 + day; підтримується автоматично при зміні birthday
+    birthday_doy = Column(Integer, nullable=True, default=_birthday_doy_default)
     extra_info = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     user = relationship("User", back_populates="contacts")
+
+    @validates("birthday")
+    def _sync_birthday_doy(self, key, value):
+        self.birthday_doy = birthday_doy(value)
+        return value
+
+
+def contact_columns(fields: Optional[Iterable[str]] = None) -> tuple:
+    """
+    Що вибирати з таблиці контактів. Без fields — ORM-сутність Contact (для змін);
+    з fields — лише ці колонки (id першим): результат — легкі рядки Row
+    (іменовані кортежі) без ORM-об'єктів і без відстеження в сесії.
+
+    :param fields: Назви полів або None.
+    :return: Аргументи для select().
+    """
+    if fields is None:
+        return (Contact,)
+    return (Contact.id, *(getattr(Contact, f) for f in fields if f != "id"))
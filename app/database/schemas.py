@@ -67,3 +67,40 @@ class ContactResponse(ContactCreate):
 
     class Config:
         from_attributes = True
+
+
+class ContactPartialResponse(BaseModel):
+    """
+    Контакт у списку GET /contacts/. Без `fields=` повертаються всі поля ContactResponse,
+    з `fields=` — лише id і вибрані поля, тому всі поля, крім id, необов'язкові.
+    """
+    id: int
+    user_id: Optional[int] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    birthday: Optional[date] = None
+    extra_info: Optional[str] = None
+
+
+class ContactImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ContactImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[ContactImportError]
+
+
+class AvatarUploadForm(BaseModel):
+    key: str
+    url: str
+    fields: dict[str, str]
+    expires_in: int
+
+
+class AvatarUploadComplete(BaseModel):
+    key: str
@@ -4,21 +4,36 @@ from contextlib import asynccontextmanager
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, PlainTextResponse
+from loguru import logger
+from redis.exceptions import RedisError
 
-from app.config import init_limiter  # Ініціалізація Rate Limiter
-from app.routes import contacts, users, auth
+from app import config
+from app.database.engine import pool_status
+from app.routes import avatars as avatar_routes, contacts, users, auth
+from app.services import async_cache, avatars, cache, jwt_keys, metrics, password_hasher, sql_instrumentation
 
+# Імпорт застосунку нічого не підключає: двигун БД і клієнт Redis створюються тут,
+# під час старту робочого процесу, а не в кожному процесі, що лише імпортує app.main.
+# Маршрути працюють лише через async_crud/async_cache, тож синхронні двигун і клієнт
+# Redis не створюються (закриваються, лише якщо їх створив хтось інший)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_limiter()
+    config.get_async_engine()
+    async_cache.get_redis()
     yield
+    await config.dispose_engines()
+    await async_cache.close_redis()
+    cache.close_redis()
+    password_hasher.shutdown()
+    avatars.shutdown()
 
-app = FastAPI(title="Contacts API with Authentication", lifespan=lifespan)
+# orjson серіалізує відповіді в кілька разів швидше за стандартний json
+app = FastAPI(title="Contacts API with Authentication", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Налаштування OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -32,22 +47,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 🔹 Метрики запитів (затримка, статуси, SQL і Redis на запит); METRICS_ENABLED=0 вимикає
+app.add_middleware(metrics.MetricsMiddleware)
+# 🔹 Виявлення N+1 (однакові SQL-запити в межах одного HTTP-запиту)
+app.add_middleware(sql_instrumentation.QueryTrackingMiddleware)
+
+# 🔹 Переповнена черга хешування паролів — 503 замість очікування без обмежень
+@app.exception_handler(password_hasher.PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: password_hasher.PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# 🔹 Redis потрібен для сесій (refresh-токенів); кеш обробляє його недоступність сам
+@app.exception_handler(RedisError)
+async def redis_error_handler(request: Request, exc: RedisError):
+    logger.error(f"Redis недоступний: {exc}")
+    return JSONResponse(status_code=503, content={"detail": "Session store unavailable"}, headers={"Retry-After": "1"})
+
 # 🔹 Підключаємо маршрути
 app.include_router(contacts.router)
 app.include_router(users.router)
 app.include_router(auth.router)
+app.include_router(avatar_routes.router)
 
 # 🔹 Підключення статичних файлів (включаючи favicon)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # 🔹 Головна сторінка API
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to Contacts API"}
 
+# 🔹 Стан пулів з'єднань з БД (для підбору розміру пулу під навантаженням)
+@app.get("/health/db-pool")
+async def db_pool_health():
+    status = {"async": pool_status(config.get_async_engine())}
+    # Синхронний пул показується, лише якщо двигун уже створено (скрипти, синхронний crud)
+    if config.get_engine.cache_info().currsize:
+        status["sync"] = pool_status(config.get_engine())
+    return status
+
+# 🔹 Метрики пулу хешування паролів
+@app.get("/health/password-hasher")
+async def password_hasher_health():
+    return password_hasher.stats()
+
+# 🔹 Метрики у форматі Prometheus
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# 🔹 Публічні ключі для локальної перевірки токенів іншими сервісами
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    return JSONResponse(jwt_keys.jwks(), headers={"Cache-Control": "public, max-age=300"})
+
 # 🔹 Перевірка токена (для Swagger UI)
 @app.get("/secure-endpoint/")
-def secure_endpoint(token: str = Depends(oauth2_scheme)):
+async def secure_endpoint(token: str = Depends(oauth2_scheme)):
     return {"message": "Token is valid"}
 
 # 🔹 Повернення favicon
@@ -1,38 +1,32 @@
-import os
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from jose import JWTError, jwt
-from fastapi_limiter.depends import RateLimiter
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.services.auth import (
+    authenticate_user,
     create_access_token,
-    create_refresh_token,
     create_verification_token,
     get_current_user,
-    get_db,
-    verify_refresh_token,
-    SECRET_KEY,
-    ALGORITHM,
+    verify_verification_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
-from app.database import crud, schemas
-from app.services.email import send_email
-from dotenv import load_dotenv
-
-load_dotenv()
-
-BASE_URL = os.getenv("BASE_URL", "http://127.0.0.1:8000")
+from app.database import async_crud as crud, schemas
+from app.database.db import get_async_db
+from app.services.email_queue import enqueue_email
+from app.services import async_cache as cache, refresh_tokens
+from app.services.rate_limit import login_ip_limit, login_limit, me_limit, signup_limit
+BASE_URL = get_settings().base_url
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not crud.verify_password(form_data.password, user.password_hash):
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(login_ip_limit), Depends(login_limit)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -43,7 +37,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         data={"sub": user.email},
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    refresh_token = await refresh_tokens.issue(user.email)
 
     return {
         "access_token": access_token,
@@ -53,20 +47,21 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.post("/refresh", response_model=schemas.Token)
-def refresh_token(
+async def refresh_token(
     request: schemas.RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    email = verify_refresh_token(request.refresh_token)
-    if not email:
+    # Refresh-токен одноразовий: замість нього видається новий тієї ж сесії
+    rotated = await refresh_tokens.rotate(request.refresh_token)
+    if not rotated:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    email, new_refresh_token = rotated
 
-    user = crud.get_user_by_email(db, email)
+    user = await crud.get_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     access_token = create_access_token(data={"sub": user.email})
-    new_refresh_token = create_refresh_token(data={"sub": user.email})
 
     return {
         "access_token": access_token,
@@ -75,47 +70,59 @@ def refresh_token(
     }
 
 
-@router.post("/signup", response_model=schemas.UserResponse)
-def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = crud.get_user_by_email(db, user_data.email)
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: schemas.RefreshTokenRequest):
+    # Відкликає сесію, якій належить refresh-токен
+    if not await refresh_tokens.revoke(request.refresh_token):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(current_user: schemas.UserResponse = Depends(get_current_user)):
+    # Відкликає всі сесії поточного користувача
+    await refresh_tokens.revoke_user(current_user.email)
+
+
+@router.post("/signup", response_model=schemas.UserResponse, dependencies=[Depends(signup_limit)])
+async def signup(user_data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await crud.get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    new_user = crud.create_user(db, user_data)
+    new_user = await crud.create_user(db, user_data)
 
     verification_token = create_verification_token(user_data.email)
     confirmation_url = f"{BASE_URL}/auth/verify/{verification_token}"
 
     subject = "Please verify your email address"
     body = f"Click the following link to verify your email: {confirmation_url}"
-    send_email(subject, user_data.email, body)
+    await enqueue_email(subject, user_data.email, body)
 
     return new_user
 
 
-@router.get("/me", response_model=schemas.UserResponse, dependencies=[Depends(RateLimiter(times=5, seconds=60))])
-def read_users_me(current_user: schemas.UserResponse = Depends(get_current_user)):
+@router.get("/me", response_model=schemas.UserResponse, dependencies=[Depends(me_limit)])
+async def read_users_me(current_user: schemas.UserResponse = Depends(get_current_user)):
     return current_user
 
 
 @router.get("/verify/{token}", response_model=schemas.UserResponse)
-def verify_email(token: str, db: Session = Depends(get_db)):
-    try:
-        email = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
-        if not email:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+async def verify_email(token: str, db: AsyncSession = Depends(get_async_db)):
+    # Приймається лише токен з листа підтвердження (scope "verify_email")
+    email = verify_verification_token(token)
+    if not email:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
 
-        user = crud.get_user_by_email(db, email)
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user = await crud.get_user_by_email(db, email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-        if user.is_verified:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already verified")
+    if user.is_verified:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already verified")
 
-        user.is_verified = True
-        db.commit()
-        db.refresh(user)
+    user.is_verified = True
+    await db.commit()
+    await db.refresh(user)
+    await cache.invalidate_principal(user.email)
 
-        return user
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+    return user
@@ -0,0 +1,48 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.services import avatars, storage
+
+router = APIRouter(prefix="/avatars", tags=["Avatars"])
+
+
+# 🔹 Віддача варіантів аватарів з локального сховища (AVATAR_STORAGE_PATH)
+@router.api_route("/{name}", methods=["GET", "HEAD"])
+async def get_avatar(name: str, request: Request):
+    """
+    Віддає варіант аватара. URL містить хеш вмісту, тому відповідь кешується
+    назавжди (immutable); повторний запит з If-None-Match отримує 304 без
+    звернення до диска. Підтримуються запити Range.
+
+    :param name: Ім'я файлу варіанта.
+    :param request: Запит.
+    :return: Файл, 304, відповідь з X-Accel-Redirect для nginx або
+             переадресація на адресу у сховищі S3.
+    """
+    media_type = avatars.variant_media_type(name)
+    if media_type is None:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+
+    headers = avatars.cache_headers(name)
+    if avatars.etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    backend = storage.get_storage()
+    if not isinstance(backend, storage.LocalStorage):
+        # Старі URL /avatars/... після переходу на S3
+        return RedirectResponse(backend.url(name), status_code=301, headers=headers)
+
+    if avatars.AVATAR_ACCEL_REDIRECT_PREFIX:
+        # Файл віддає nginx із внутрішнього location (sendfile)
+        headers["X-Accel-Redirect"] = avatars.AVATAR_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + name
+        return Response(headers=headers, media_type=media_type)
+
+    path = backend.path(name)
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
@@ -1,32 +1,84 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from app.database import crud, schemas
-from app.config import SessionLocal
-from app.services.utils import search_contacts, get_upcoming_birthdays
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+from app.database import async_crud as crud, schemas
+from app import config
+from app.database.db import get_async_db
+from app.services.async_utils import search_contacts, get_upcoming_birthdays
+from app.services.utils import BIRTHDAYS_WINDOW_DAYS, CONTACTS_SEARCH_LIMIT
 from app.services.auth import get_current_user
+from app.services import async_cache as cache
+from app.services.export import EXPORT_COLUMNS, ndjson_lines, csv_lines
+from app.services.contact_import import (
+    CONTACTS_IMPORT_MAX_BYTES,
+    PARSERS,
+    ImportFormatError,
+    ImportTooLarge,
+    import_contacts,
+    limit_stream,
+    spool,
+)
+from app.services.rate_limit import contacts_import_limit, contacts_write_limit
+
+_settings = config.get_settings()
 
 router = APIRouter(prefix="/contacts", tags=["Contacts"])
 
-# 🔹 Функція для отримання сесії бази даних
-def get_db():
+# Розмір сторінки списку контактів
+CONTACTS_PAGE_SIZE = _settings.contacts_page_size
+CONTACTS_MAX_PAGE_SIZE = _settings.contacts_max_page_size
+CONTACT_FIELDS = tuple(schemas.ContactResponse.model_fields)
+# Усі поля у порядку вибірки get_contacts_page (id першим)
+CONTACT_COLUMNS = ["id"] + [f for f in CONTACT_FIELDS if f != "id"]
+
+# Кількість рядків, що читаються з БД за один раз під час експорту
+CONTACTS_EXPORT_BATCH_SIZE = _settings.contacts_export_batch_size
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_lines, "application/x-ndjson"),
+    "csv": (csv_lines, "text/csv; charset=utf-8"),
+}
+# Запас на заголовки і межі multipart понад CONTACTS_IMPORT_MAX_BYTES
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[list[str]]:
     """
-    Генератор сесії для роботи з базою даних.
+    Розбирає параметр `fields` (поля через кому) і перевіряє їх назви.
 
-    :return: Сесія бази даних.
+    :param fields: Рядок з назвами полів або None.
+    :return: Список полів (id завжди першим) або None, якщо потрібні всі поля.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    if not fields:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(selected) - set(CONTACT_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [f for f in dict.fromkeys(selected) if f != "id"]
+
+
+def _rows_to_dicts(rows, columns: list[str]) -> list[dict]:
+    """
+    Рядки вибірки колонок (у порядку columns) -> словники для відповіді.
+    """
+    return [dict(zip(columns, row)) for row in rows]
 
 
 # 🔹 Створення нового контакту
-@router.post("/", response_model=schemas.ContactResponse, status_code=status.HTTP_201_CREATED)
-def create_contact(
+@router.post(
+    "/",
+    response_model=schemas.ContactResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(contacts_write_limit)]
+)
+async def create_contact(
     contact: schemas.ContactCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
@@ -37,30 +89,177 @@ def create_contact(
     :param current_user: Поточний користувач, для якого створюється контакт.
     :return: Створений контакт.
     """
-    return crud.create_contact(db, contact, current_user.id)
+    return await crud.create_contact(db, contact, current_user.id)
+
+
+def _import_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """
+    Визначає формат імпорту за розширенням файлу або Content-Type.
+    """
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith(".csv") or content_type.startswith("text/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type.startswith(("application/x-ndjson", "application/jsonl")):
+        return "ndjson"
+    if name.endswith(".json") or content_type.startswith("application/json"):
+        return "json"
+    raise HTTPException(status_code=415, detail="Supported formats: JSON array, NDJSON, CSV")
+
+
+# 🔹 Масовий імпорт контактів
+@router.post("/import", response_model=schemas.ContactImportResult, dependencies=[Depends(contacts_import_limit)])
+async def import_contacts_api(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.UserResponse = Depends(get_current_user)
+):
+    """
+    Масовий імпорт контактів з JSON-масиву в тілі запиту або з файлу
+    CSV/NDJSON (multipart, поле `file`). Рядки валідуються і вставляються
+    пачками; помилки повертаються у звіті з номером рядка.
+
+    :param request: HTTP-запит з даними імпорту.
+    :param db: Сесія бази даних.
+    :param current_user: Поточний користувач.
+    :return: Кількість вставлених контактів і звіт про помилки.
+    """
+    content_length = request.headers.get("content-length")
+    # Запас на заголовки multipart; точний ліміт перевіряється під час читання
+    if content_length and content_length.isdigit() and int(content_length) > CONTACTS_IMPORT_MAX_BYTES + _MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Import must not exceed {CONTACTS_IMPORT_MAX_BYTES} bytes")
+
+    content_type = request.headers.get("content-type", "")
+    form = None
+    stream = None
+    try:
+        # Тіло читається потоково з лічильником байтів (і без Content-Length) у тимчасовий
+        # файл, а CSV/NDJSON розбираються з нього по рядку
+        if content_type.startswith("multipart/form-data"):
+            body = limit_stream(request.stream(), CONTACTS_IMPORT_MAX_BYTES + _MULTIPART_OVERHEAD)
+            try:
+                form = await MultiPartParser(request.headers, body, max_files=1, max_fields=10).parse()
+            except MultiPartException as e:
+                raise HTTPException(status_code=400, detail=e.message)
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                raise HTTPException(status_code=400, detail="Expected a file in the 'file' field")
+            import_format = _import_format(upload.filename, upload.content_type)
+            stream = await spool(_upload_chunks(upload))
+        else:
+            import_format = _import_format(None, content_type)
+            stream = await spool(request.stream())
+
+        # JSON-масив розбирається цілком (json.load) — поза event loop
+        records = await run_in_threadpool(PARSERS[import_format], stream)
+        return await import_contacts(db, records, current_user.id)
+    except ImportTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8 encoded")
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if stream is not None:
+            stream.close()
+        if form is not None:
+            await form.close()
+
+
+async def _upload_chunks(upload: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(chunk_size):
+        yield chunk
 
 
 # 🔹 Отримання всіх контактів користувача
-@router.get("/", response_model=list[schemas.ContactResponse])
-def get_contacts(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=list[schemas.ContactPartialResponse])
+async def get_contacts(
+    limit: int = Query(CONTACTS_PAGE_SIZE, ge=1, le=CONTACTS_MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[int] = Query(None, ge=0, description="Value of X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. first_name,email"),
+    include_total: bool = Query(False, description="Add X-Total-Count header"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
-    Отримання всіх контактів поточного користувача.
+    Отримання контактів поточного користувача сторінками (keyset-пагінація за id).
+    Курсор наступної сторінки повертається в заголовку X-Next-Cursor.
+    Повні сторінки кешуються в Redis до наступної зміни контактів або до завершення TTL.
+    Відповідь будується напряму з кортежів колонок і серіалізується orjson, без
+    створення ORM-об'єктів і повторної валідації через response_model.
+    Без `fields` кожен контакт містить усі поля ContactResponse, з `fields` — лише id
+    і вибрані поля (схема ContactPartialResponse).
 
+    :param limit: Розмір сторінки.
+    :param cursor: Курсор сторінки (ID останнього контакту попередньої сторінки).
+    :param fields: Поля контакту, які потрібно повернути.
+    :param include_total: Чи рахувати загальну кількість контактів (X-Total-Count).
     :param db: Сесія бази даних.
     :param current_user: Поточний користувач.
-    :return: Список всіх контактів користувача.
+    :return: Сторінка контактів користувача.
+    """
+    selected = _parse_fields(fields)
+
+    headers = {}
+    if include_total:
+        headers["X-Total-Count"] = str(await crud.count_contacts(db, current_user.id))
+
+    cached = None
+    if selected is None:
+        cached, version = await cache.get_contact_page(current_user.id, cursor, limit)
+
+    if cached is not None:
+        contacts, next_cursor = cached["items"], cached["next_cursor"]
+    else:
+        columns = selected or CONTACT_COLUMNS
+        rows, next_cursor = await crud.get_contacts_page(db, current_user.id, limit, cursor, fields=columns)
+        contacts = _rows_to_dicts(rows, columns)
+        if selected is None:
+            await cache.set_contact_page(current_user.id, version, cursor, limit, contacts, next_cursor)
+
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    return ORJSONResponse(contacts, headers=headers)
+
+
+# 🔹 Потоковий експорт усіх контактів (NDJSON або CSV)
+@router.get("/export")
+async def export_contacts(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    current_user: schemas.UserResponse = Depends(get_current_user)
+):
+    """
+    Експорт усіх контактів поточного користувача потоком.
+    Рядки читаються з БД пачками через серверний курсор, тому споживання пам'яті
+    не залежить від кількості контактів.
+
+    :param export_format: Формат експорту: ndjson або csv.
+    :param current_user: Поточний користувач.
+    :return: Потокова відповідь з контактами.
     """
-    return crud.get_contacts(db, current_user.id)
+    serializer, media_type = EXPORT_FORMATS[export_format]
+    user_id = current_user.id
+
+    async def body():
+        # Сесія відкривається всередині генератора: залежності FastAPI
+        # закриваються ще до того, як почнеться передача тіла відповіді.
+        async with config.get_async_session_factory()() as db:
+            partitions = crud.stream_contacts(db, user_id, EXPORT_COLUMNS, CONTACTS_EXPORT_BATCH_SIZE)
+            async for chunk in serializer(partitions):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contacts.{export_format}"'},
+    )
 
 
 # 🔹 Отримання одного контакту за ID
 @router.get("/{contact_id}", response_model=schemas.ContactResponse)
-def get_contact(
+async def get_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
@@ -71,18 +270,23 @@ def get_contact(
     :param current_user: Поточний користувач.
     :return: Контакт або помилка 404, якщо контакт не знайдений.
     """
-    db_contact = crud.get_contact_by_id(db, contact_id, current_user.id)
+    cached, version = await cache.get_contact(current_user.id, contact_id)
+    if cached is not None:
+        return cached
+
+    db_contact = await crud.get_contact_by_id(db, contact_id, current_user.id, fields=CONTACT_COLUMNS)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
+    await cache.set_contact(current_user.id, version, db_contact)
     return db_contact
 
 
 # 🔹 Оновлення контакту
-@router.put("/{contact_id}", response_model=schemas.ContactResponse)
-def update_contact(
+@router.put("/{contact_id}", response_model=schemas.ContactResponse, dependencies=[Depends(contacts_write_limit)])
+async def update_contact(
     contact_id: int,
     contact: schemas.ContactUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
@@ -94,17 +298,17 @@ def update_contact(
     :param current_user: Поточний користувач.
     :return: Оновлений контакт.
     """
-    db_contact = crud.update_contact(db, contact_id, contact, current_user.id)
+    db_contact = await crud.update_contact(db, contact_id, contact, current_user.id)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     return db_contact
 
 
 # 🔹 Видалення контакту
-@router.delete("/{contact_id}", response_model=schemas.ContactResponse)
-def delete_contact(
+@router.delete("/{contact_id}", response_model=schemas.ContactResponse, dependencies=[Depends(contacts_write_limit)])
+async def delete_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
@@ -115,7 +319,7 @@ def delete_contact(
     :param current_user: Поточний користувач.
     :return: Видалений контакт або помилка 404, якщо не знайдено.
     """
-    db_contact = crud.delete_contact(db, contact_id, current_user.id)
+    db_contact = await crud.delete_contact(db, contact_id, current_user.id)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     return db_contact
@@ -123,41 +327,48 @@ def delete_contact(
 
 # 🔹 Пошук контактів за ім'ям, прізвищем або email
 @router.get("/search/", response_model=list[schemas.ContactResponse])
-def search_contacts_api(
+async def search_contacts_api(
     name: str = Query(None, description="Search by first or last name"),
     email: str = Query(None, description="Search by email"),
-    db: Session = Depends(get_db),
+    fuzzy: bool = Query(False, description="Typo-tolerant trigram search (PostgreSQL)"),
+    limit: int = Query(CONTACTS_SEARCH_LIMIT, ge=1, le=CONTACTS_MAX_PAGE_SIZE, description="Maximum number of results"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
     Пошук контактів за ім'ям, прізвищем або email.
+    У PostgreSQL використовує триграмні індекси і впорядковує результати за схожістю.
 
     :param name: Ім'я або прізвище для пошуку.
     :param email: Email для пошуку.
+    :param fuzzy: Нечіткий пошук (з помилками в написанні).
+    :param limit: Максимальна кількість результатів.
     :param db: Сесія бази даних.
     :param current_user: Поточний користувач.
     :return: Список знайдених контактів.
     """
-    contacts = search_contacts(db, name, email, current_user.id)
+    contacts = await search_contacts(db, name, email, current_user.id, fuzzy=fuzzy, limit=limit, fields=CONTACT_COLUMNS)
     if not contacts:
         raise HTTPException(status_code=404, detail="No contacts found")
-    return contacts
+    return ORJSONResponse(_rows_to_dicts(contacts, CONTACT_COLUMNS))
 
 
 # 🔹 Отримання контактів з найближчими днями народження
 @router.get("/upcoming_birthdays/", response_model=list[schemas.ContactResponse])
-def get_birthdays_api(
-    db: Session = Depends(get_db),
+async def get_birthdays_api(
+    days: int = Query(BIRTHDAYS_WINDOW_DAYS, ge=0, le=366, description="Number of days ahead to look for birthdays"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserResponse = Depends(get_current_user)
 ):
     """
     Отримання контактів з найближчими днями народження.
 
+    :param days: Кількість днів наперед (включно з сьогоднішнім днем).
     :param db: Сесія бази даних.
     :param current_user: Поточний користувач.
     :return: Список контактів з найближчими днями народження.
     """
-    contacts = get_upcoming_birthdays(db, current_user.id)
+    contacts = await get_upcoming_birthdays(db, current_user.id, days, fields=CONTACT_COLUMNS)
     if not contacts:
         raise HTTPException(status_code=404, detail="No upcoming birthdays found")
-    return contacts
+    return ORJSONResponse(_rows_to_dicts(contacts, CONTACT_COLUMNS))
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
 from datetime import timedelta
-import shutil
-import os
+from typing import AsyncIterator
 
-from app.config import SessionLocal
+from app.database.db import get_async_db
 import app.database.schemas as schemas
-import app.database.crud as crud
+import app.database.async_crud as crud
 from app.services.auth import (
     authenticate_user,
     create_access_token,
@@ -15,25 +17,18 @@ from app.services.auth import (
     verify_reset_token,
     get_current_admin_user
 )
+from app.services import avatars, refresh_tokens, storage
+from app.services.rate_limit import login_ip_limit, login_limit, password_reset_limit, signup_limit
 from loguru import logger
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-# 🔹 Функція для отримання сесії БД
-def get_db():
-    """
-    Функція для отримання сесії з бази даних.
-    Вона використовується для роботи з БД у маршрутах API.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Запас на заголовки і межі multipart понад AVATAR_MAX_BYTES
+_MULTIPART_OVERHEAD = 64 * 1024
 
 # 🔹 Реєстрація нового користувача
-@router.post("/signup", response_model=schemas.UserResponse, status_code=201)
-def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
+@router.post("/signup", response_model=schemas.UserResponse, status_code=201, dependencies=[Depends(signup_limit)])
+async def signup(user_data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Реєстрація нового користувача. Перевіряє наявність користувача з таким самим email.
     Якщо такий вже є, повертає статус 409 (конфлікт).
@@ -42,16 +37,16 @@ def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     :param db: Сесія БД для взаємодії з базою даних.
     :return: Дані про зареєстрованого користувача.
     """
-    existing_user = crud.get_user_by_email(db, user_data.email)
+    existing_user = await crud.get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    new_user = crud.create_user(db, user_data)
+    new_user = await crud.create_user(db, user_data)
     return new_user
 
 # 🔹 Авторизація користувача (логін)
-@router.post("/login")
-def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@router.post("/login", dependencies=[Depends(login_ip_limit), Depends(login_limit)])
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Авторизація користувача за email та паролем.
     Якщо пароль або email невірні, повертається статус 401 (неавторизовано).
@@ -60,7 +55,7 @@ def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     :param db: Сесія БД для взаємодії з базою даних.
     :return: Токен доступу (access_token) користувача.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -72,7 +67,7 @@ def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
 
 # 🔹 Тестовий маршрут
 @router.get("/test")
-def test_route():
+async def test_route():
     """
     Тестовий маршрут для перевірки доступності API.
     :return: Підтвердження, що API працює.
@@ -80,8 +75,8 @@ def test_route():
     return {"message": "Users API is working!"}
 
 # 🔐 Запит на скидання пароля
-@router.post("/reset_password_request/")
-def request_password_reset(email: str, db: Session = Depends(get_db)):
+@router.post("/reset_password_request/", dependencies=[Depends(password_reset_limit)])
+async def request_password_reset(email: str, db: AsyncSession = Depends(get_async_db)):
     """
     Генерує посилання для скидання пароля та логує його.
     Якщо користувач не знайдений, повертається статус 404.
@@ -90,7 +85,7 @@ def request_password_reset(email: str, db: Session = Depends(get_db)):
     :param db: Сесія БД для взаємодії з базою даних.
     :return: Повідомлення про успішну генерацію посилання для скидання пароля.
     """
-    user = crud.get_user_by_email(db, email)
+    user = await crud.get_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -101,8 +96,8 @@ def request_password_reset(email: str, db: Session = Depends(get_db)):
     return {"message": "Password reset link has been sent (check logs)."}
 
 # 🔐 Скидання пароля через токен
-@router.post("/reset_password/")
-def reset_password(token: str, new_password: str, db: Session = Depends(get_db)):
+@router.post("/reset_password/", dependencies=[Depends(password_reset_limit)])
+async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_async_db)):
     """
     Скидання пароля користувача через токен.
     Якщо токен недійсний або прострочений, повертається статус 400.
@@ -116,34 +111,121 @@ def reset_password(token: str, new_password: str, db: Session = Depends(get_db))
     if not email:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
 
-    user = crud.update_user_password(db, email, new_password)
+    user = await crud.update_user_password(db, email, new_password)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    # Після зміни пароля всі наявні сесії відкликаються
+    await refresh_tokens.revoke_user(email)
     return {"message": "Password has been reset successfully."}
 
 # 🔒 Оновлення аватара (тільки для адмінів)
 @router.post("/avatar", response_model=schemas.UserResponse)
-def update_user_avatar(
-    file: UploadFile = File(...),
+async def update_user_avatar(
+    request: Request,
+    size: int = Query(avatars.AVATAR_DEFAULT_SIZE, ge=1, description="Display size in pixels; avatar_url points to the smallest variant that fits"),
     current_user: schemas.UserResponse = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Оновлення аватара користувача. Дозволено лише адміністраторам.
+    Зображення (PNG, JPEG, GIF або WebP) передається у полі `file` форми multipart
+    або сирим тілом запиту; тіло читається потоково до AVATAR_MAX_BYTES.
+    Зберігаються квадратні варіанти AVATAR_SIZES з іменами за хешем вмісту.
     
-    :param file: Завантажений файл (аватар).
+    :param request: Запит із зображенням.
+    :param size: Розмір відображення, під який обирається avatar_url.
     :param current_user: Поточний авторизований користувач.
     :param db: Сесія БД.
     :return: Оновлений користувач.
     """
-    avatar_dir = "static/avatars"
-    os.makedirs(avatar_dir, exist_ok=True)
+    content_length = request.headers.get("content-length")
+    # Запас на заголовки multipart; точний ліміт перевіряється під час читання
+    if content_length and content_length.isdigit() and int(content_length) > avatars.AVATAR_MAX_BYTES + _MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Avatar must not exceed {avatars.AVATAR_MAX_BYTES} bytes")
 
-    avatar_path = os.path.join(avatar_dir, file.filename)
-    with open(avatar_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    form = None
+    try:
+        if request.headers.get("content-type", "").lower().startswith("multipart/form-data"):
+            # Форма розбирається з потоку з лічильником байтів: тіло без Content-Length
+            # (Transfer-Encoding: chunked) теж переривається на ліміті, а не буферизується
+            body = avatars.limit_stream(request.stream(), avatars.AVATAR_MAX_BYTES + _MULTIPART_OVERHEAD)
+            try:
+                form = await MultiPartParser(request.headers, body, max_files=1, max_fields=10).parse()
+            except MultiPartException as e:
+                raise HTTPException(status_code=400, detail=e.message)
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                raise HTTPException(status_code=400, detail="Multipart upload must contain a 'file' field")
+            chunks = _upload_chunks(upload)
+        else:
+            chunks = request.stream()
+
+        data = await avatars.read_limited(chunks, avatars.AVATAR_MAX_BYTES)
+        names = await avatars.process_avatar(data)
+    except avatars.AvatarTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except avatars.UnsupportedAvatar as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    finally:
+        if form is not None:
+            await form.close()
 
-    user = crud.get_user_by_email(db, current_user.email)
-    updated_user = crud.update_avatar(db, user, avatar_path)
+    user = await crud.get_user_by_email(db, current_user.email)
+    updated_user = await crud.update_avatar(db, user, avatars.avatar_url(avatars.pick_variant(names, size)))
     return updated_user
+
+
+# 🔒 Пряме завантаження аватара у сховище (тільки для адмінів, потрібне сховище s3)
+@router.post("/avatar/upload-url", response_model=schemas.AvatarUploadForm)
+async def create_avatar_upload(current_user: schemas.UserResponse = Depends(get_current_admin_user)):
+    """
+    Повертає підписану форму для завантаження зображення напряму в S3-сховище:
+    клієнт надсилає POST multipart на `url` з полями `fields`, полем `Content-Type`
+    (image/png, image/jpeg, ...) і файлом у полі `file`, після чого викликає /users/avatar/complete з отриманим `key`.
+    Файл не проходить через API, ліміт AVATAR_MAX_BYTES перевіряє сховище.
+
+    :param current_user: Поточний авторизований користувач.
+    :return: Ключ, адреса і поля форми.
+    """
+    try:
+        return await run_in_threadpool(avatars.create_direct_upload)
+    except storage.StorageError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+
+
+# 🔒 Обробка прямого завантаження
+@router.post("/avatar/complete", response_model=schemas.UserResponse)
+async def complete_avatar_upload(
+    body: schemas.AvatarUploadComplete,
+    size: int = Query(avatars.AVATAR_DEFAULT_SIZE, ge=1, description="Display size in pixels; avatar_url points to the smallest variant that fits"),
+    current_user: schemas.UserResponse = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Робить варіанти із зображення, завантаженого за /users/avatar/upload-url,
+    і оновлює аватар. Вихідний файл видаляється зі сховища.
+
+    :param body: Ключ завантаження.
+    :param size: Розмір відображення, під який обирається avatar_url.
+    :param current_user: Поточний авторизований користувач.
+    :param db: Сесія БД.
+    :return: Оновлений користувач.
+    """
+    try:
+        names = await avatars.process_direct_upload(body.key)
+    except avatars.UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except avatars.AvatarTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except avatars.UnsupportedAvatar as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    user = await crud.get_user_by_email(db, current_user.email)
+    updated_user = await crud.update_avatar(db, user, avatars.avatar_url(avatars.pick_variant(names, size)))
+    return updated_user
+
+
+async def _upload_chunks(upload: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(chunk_size):
+        yield chunk
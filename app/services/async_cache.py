@@ -0,0 +1,173 @@
+import asyncio
+import json
+import weakref
+from typing import Optional
+
+import orjson
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.database.schemas import UserResponse
+from app.services import metrics
+from app.services.cache import (
+    CONTACTS_CACHE_TTL,
+    PRINCIPAL_CACHE_TTL,
+    _principals,
+    _version_key,
+    _page_key,
+    _item_key,
+    _principal_version_key,
+    _principal_key,
+    _dump_contact,
+)
+
+# Асинхронні аналоги функцій з app.services.cache для маршрутів на asyncio.
+# Ключі, TTL, формат записів і локальний LRU користувачів спільні з синхронною версією.
+
+# З'єднання redis.asyncio прив'язані до event loop, тому клієнт зберігається
+# окремо для кожного loop (у робочому процесі uvicorn він один).
+_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Повертає (і за потреби створює) асинхронний клієнт Redis для поточного event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _redis_clients.get(loop)
+    if client is None:
+        client = metrics.InstrumentedAsyncRedis.from_url(
+            get_settings().redis_url,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        _redis_clients[loop] = client
+    return client
+
+
+async def close_redis() -> None:
+    """
+    Закриває клієнт Redis поточного event loop (при завершенні застосунку).
+    """
+    client = _redis_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _get_version(client: aioredis.Redis, user_id: int) -> int:
+    return int(await client.get(_version_key(user_id)) or 0)
+
+
+# 🔹 Сторінка списку контактів
+async def get_contact_page(user_id: int, cursor: Optional[int], limit: int) -> tuple[Optional[dict], int]:
+    try:
+        client = get_redis()
+        version = await _get_version(client, user_id)
+        cached = await client.get(_page_key(user_id, version, cursor, limit))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, читаємо контакти з БД: {e}")
+        return None, -1
+    if cached is None:
+        return None, version
+    return orjson.loads(cached), version
+
+
+async def set_contact_page(
+    user_id: int,
+    version: int,
+    cursor: Optional[int],
+    limit: int,
+    contacts: list[dict],
+    next_cursor: Optional[int]
+) -> None:
+    """
+    Кешує сторінку контактів.
+
+    :param contacts: Контакти у вигляді словників з полями ContactResponse
+                     (вже готові до серіалізації, без повторної валідації).
+    """
+    if version < 0:
+        return
+    payload = orjson.dumps({"items": contacts, "next_cursor": next_cursor})
+    try:
+        await get_redis().set(_page_key(user_id, version, cursor, limit), payload, ex=CONTACTS_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Не вдалося записати контакти в кеш: {e}")
+
+
+# 🔹 Окремий контакт
+async def get_contact(user_id: int, contact_id: int) -> tuple[Optional[dict], int]:
+    try:
+        client = get_redis()
+        version = await _get_version(client, user_id)
+        cached = await client.get(_item_key(user_id, version, contact_id))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, читаємо контакт з БД: {e}")
+        return None, -1
+    if cached is None:
+        return None, version
+    return json.loads(cached), version
+
+
+async def set_contact(user_id: int, version: int, contact) -> None:
+    if version < 0:
+        return
+    payload = json.dumps(_dump_contact(contact))
+    try:
+        await get_redis().set(_item_key(user_id, version, contact.id), payload, ex=CONTACTS_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Не вдалося записати контакт у кеш: {e}")
+
+
+# 🔹 Інвалідація
+async def invalidate_contacts(user_id: int) -> None:
+    try:
+        await get_redis().incr(_version_key(user_id))
+    except RedisError as e:
+        logger.warning(f"Не вдалося інвалідувати кеш контактів: {e}")
+
+
+# 🔹 Кеш автентифікованих користувачів (principal)
+async def get_principal(subject: str) -> tuple[Optional[UserResponse], tuple[int, int]]:
+    generation = _principals.generation
+    principal = _principals.get(subject)
+    if principal is not None:
+        return principal, (-1, generation)
+
+    try:
+        client = get_redis()
+        version = int(await client.get(_principal_version_key(subject)) or 0)
+        cached = await client.get(_principal_key(subject, version))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, читаємо користувача з БД: {e}")
+        return None, (-1, generation)
+    if cached is None:
+        return None, (version, generation)
+
+    principal = UserResponse.model_validate_json(cached)
+    _principals.set(subject, principal, generation)
+    return principal, (version, generation)
+
+
+async def set_principal(subject: str, version: tuple[int, int], user) -> UserResponse:
+    redis_version, generation = version
+    principal = UserResponse.model_validate(user)
+    _principals.set(subject, principal, generation)
+    if redis_version < 0:
+        return principal
+    try:
+        await get_redis().set(_principal_key(subject, redis_version), principal.model_dump_json(), ex=PRINCIPAL_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Не вдалося записати користувача в кеш: {e}")
+    return principal
+
+
+async def invalidate_principal(subject: str) -> None:
+    _principals.pop(subject)
+    try:
+        await get_redis().incr(_principal_version_key(subject))
+    except RedisError as e:
+        logger.warning(f"Не вдалося інвалідувати кеш користувача: {e}")
@@ -0,0 +1,36 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.utils import (
+    BIRTHDAYS_WINDOW_DAYS,
+    CONTACTS_SEARCH_LIMIT,
+    build_birthdays_query,
+    build_search_query,
+)
+
+# Асинхронні аналоги функцій з app.services.utils для маршрутів на asyncio.
+
+
+# 🔎 Пошук контактів за ім'ям, прізвищем або email з урахуванням user_id
+async def search_contacts(
+    db: AsyncSession,
+    name: str = None,
+    email: str = None,
+    user_id: int = None,
+    fuzzy: bool = False,
+    limit: int = CONTACTS_SEARCH_LIMIT,
+    fields: Optional[list[str]] = None
+):
+    query = build_search_query(db.bind.dialect.name, name, email, user_id, fuzzy, limit, fields)
+    result = await db.execute(query)
+    return result.scalars().all() if fields is None else result.all()
+
+
+# 🎉 Контакти з днями народження у найближчі дні (ІГНОРУЄ РІК)
+async def get_upcoming_birthdays(
+    db: AsyncSession,
+    user_id: int,
+    days: int = BIRTHDAYS_WINDOW_DAYS,
+    fields: Optional[list[str]] = None
+):
+    result = await db.execute(build_birthdays_query(user_id, days, fields=fields))
+    return result.scalars().all() if fields is None else result.all()
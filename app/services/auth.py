@@ -1,44 +1,43 @@
-import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from jose import JWTError, jwt
+from jose import JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from dotenv import load_dotenv
-from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import SessionLocal
-from app.database import crud
+from app.database import async_crud
+from app.database.db import get_async_db
 from app.database.models import User
-
-# Завантаження змінних середовища
-load_dotenv()
+from app.database.schemas import UserResponse
+from app.services import async_cache, jwt_keys, password_hasher
 
 # JWT конфігурація
-SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")
-ALGORITHM = "HS256"
+# Ключі підпису і алгоритм задаються в app.services.jwt_keys (HS256 з SECRET_KEY або RS256/ES256)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """
+    Перевіряє email і пароль. Якщо хеш пароля створено за застарілою політикою
+    (інший алгоритм або інша вартість), він прозоро замінюється новим.
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = crud.get_user_by_email(db, email)
-    if not user or not pwd_context.verify(password, user.password_hash):
+    :param db: Асинхронна сесія бази даних.
+    :param email: Email користувача.
+    :param password: Пароль.
+    :return: Користувач або None, якщо дані невірні.
+    """
+    user = await async_crud.get_user_by_email(db, email)
+    if not user:
+        return None
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return None
+    if new_hash is not None:
+        await async_crud.update_password_hash(db, user, new_hash)
     return user
 
 
@@ -46,63 +45,86 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire, "scope": "access_token"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt_keys.encode(to_encode)
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     to_encode.update({"exp": expire, "scope": "refresh_token"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt_keys.encode(to_encode)
 
 
-def verify_refresh_token(token: str) -> Optional[str]:
+def decode_refresh_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("scope") != "refresh_token":
-            return None
-        return payload.get("sub")
+        payload = jwt_keys.decode(token)
     except JWTError:
         return None
+    if payload.get("scope") != "refresh_token" or not payload.get("sub"):
+        return None
+    return payload
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def verify_refresh_token(token: str) -> Optional[str]:
+    payload = decode_refresh_token(token)
+    return payload.get("sub") if payload else None
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_keys.decode(token)
         user_email: str = payload.get("sub")
-        if user_email is None:
+        # Refresh-, reset- і verification-токени не дають доступу до API
+        if user_email is None or payload.get("scope") != "access_token":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = crud.get_user_by_email(db, user_email)
+    # Користувач береться з кешу, щоб не звертатися до БД на кожен запит
+    # Версія читається до запиту в БД: якщо користувача тим часом інвалідовано,
+    # прочитаний запис не потрапить у кеш
+    principal, version = await async_cache.get_principal(user_email)
+    if principal is not None:
+        return principal
+
+    user = await async_crud.get_user_by_email(db, user_email)
     if user is None:
         raise credentials_exception
-    return user
+    return await async_cache.set_principal(user_email, version, user)
 
 
 def create_verification_token(email: str, expires_delta: timedelta = timedelta(hours=1)) -> str:
-    to_encode = {"sub": email}
+    to_encode = {"sub": email, "scope": "verify_email"}
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt_keys.encode(to_encode)
+
+
+def verify_verification_token(token: str) -> Optional[str]:
+    try:
+        payload = jwt_keys.decode(token)
+        if payload.get("scope") != "verify_email":
+            return None
+        return payload.get("sub")
+    except JWTError:
+        return None
 
 
 def create_reset_token(email: str, expires_delta: timedelta = timedelta(hours=1)) -> str:
     to_encode = {"sub": email, "scope": "reset_password"}
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt_keys.encode(to_encode)
 
 
 def verify_reset_token(token: str) -> Optional[str]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_keys.decode(token)
         if payload.get("scope") != "reset_password":
             return None
         return payload.get("sub")
@@ -110,7 +132,7 @@ def verify_reset_token(token: str) -> Optional[str]:
         return None
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin_user(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import re
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.services import storage
+
+_settings = get_settings()
+
+# Аватари: завантаження читається потоково з обмеженням розміру, тип визначається
+# за сигнатурою вмісту (а не за іменем файлу чи Content-Type). Pillow у пулі процесів
+# робить квадратні варіанти фіксованих розмірів; імена файлів — хеш вмісту, тож
+# однаковий аватар зберігається один раз, а URL можна кешувати назавжди.
+AVATAR_MAX_BYTES = _settings.avatar_max_bytes
+AVATAR_SIZES = tuple(sorted(int(size) for size in _settings.avatar_sizes.split(",")))
+AVATAR_DEFAULT_SIZE = _settings.avatar_default_size
+# webp або jpeg
+AVATAR_FORMAT = _settings.avatar_format.lower()
+AVATAR_QUALITY = _settings.avatar_quality
+# Вихідні зображення з більшою кількістю пікселів відхиляються (захист від "бомб")
+AVATAR_MAX_PIXELS = _settings.avatar_max_pixels
+# Вміст за URL ніколи не змінюється, тож браузер і CDN кешують його назавжди
+AVATAR_CACHE_MAX_AGE = _settings.avatar_cache_max_age
+# За nginx: внутрішній location, з якого nginx віддає файл сам (sendfile, без копіювання
+# через процес застосунку), наприклад /_avatars/. Порожньо — файл віддає застосунок.
+AVATAR_ACCEL_REDIRECT_PREFIX = _settings.avatar_accel_redirect_prefix
+# AVATAR_WORKERS=0 — обробляти у пулі потоків (без окремих процесів)
+AVATAR_WORKERS = _settings.avatar_workers
+
+# Сигнатури підтримуваних форматів: варіанти, кожен — набір частин (зміщення, байти)
+_SIGNATURES = {
+    "png": [[(0, b"\x89PNG\r\n\x1a\n")]],
+    "jpeg": [[(0, b"\xff\xd8\xff")]],
+    "gif": [[(0, b"GIF87a")], [(0, b"GIF89a")]],
+    "webp": [[(0, b"RIFF"), (8, b"WEBP")]],
+}
+_SNIFF_BYTES = 12
+_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+_MEDIA_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+_VARIANT_NAME = re.compile(r"^[0-9a-f]{16}-[0-9]{1,5}\.(webp|jpg)$")
+_UPLOAD_NAME = re.compile(r"^uploads/[0-9a-f]{32}$")
+
+if AVATAR_FORMAT not in _EXTENSIONS:
+    raise ValueError(f"Unsupported AVATAR_FORMAT: {AVATAR_FORMAT}, expected webp or jpeg")
+
+
+class AvatarError(ValueError):
+    """
+    Завантажений файл не можна використати як аватар.
+    """
+
+
+class AvatarTooLarge(AvatarError):
+    """
+    Файл перевищує AVATAR_MAX_BYTES.
+    """
+
+
+class UnsupportedAvatar(AvatarError):
+    """
+    Вміст не є зображенням підтримуваного формату.
+    """
+
+
+class UploadNotFound(AvatarError):
+    """
+    Файл прямого завантаження відсутній у сховищі (не завантажено або посилання прострочене).
+    """
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """
+    Визначає формат зображення за сигнатурою на початку файлу.
+
+    :param data: Вміст файлу (достатньо перших 12 байтів).
+    :return: "png", "jpeg", "gif", "webp" або None.
+    """
+    for image_type, signatures in _SIGNATURES.items():
+        for parts in signatures:
+            if all(data[offset:offset + len(magic)] == magic for offset, magic in parts):
+                return image_type
+    return None
+
+
+async def read_limited(chunks: AsyncIterator[bytes], limit: int = AVATAR_MAX_BYTES) -> bytes:
+    """
+    Читає потік частинами і перериває читання, щойно розмір перевищить ліміт.
+
+    :param chunks: Асинхронний потік байтів (тіло запиту або файл форми).
+    :param limit: Максимальний розмір у байтах.
+    :return: Вміст.
+    :raises AvatarTooLarge: Якщо вміст більший за ліміт.
+    :raises UnsupportedAvatar: Якщо початок вмісту не схожий на зображення.
+    """
+    buffer = bytearray()
+    sniffed = False
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        if len(buffer) > limit:
+            raise AvatarTooLarge(f"Avatar must not exceed {limit} bytes")
+        # Тип перевіряється, щойно прочитано заголовок, щоб не дочитувати не-зображення
+        if not sniffed and len(buffer) >= _SNIFF_BYTES:
+            _check_type(buffer)
+            sniffed = True
+    if not sniffed:
+        _check_type(buffer)
+    return bytes(buffer)
+
+
+async def limit_stream(chunks: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes]:
+    """
+    Пропускає потік далі і перериває його, щойно сумарний розмір перевищить ліміт
+    (наприклад, тіло multipart до розбору, коли Content-Length немає).
+
+    :param chunks: Асинхронний потік байтів.
+    :param limit: Максимальний розмір у байтах.
+    :raises AvatarTooLarge: Якщо потік більший за ліміт.
+    """
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > limit:
+            raise AvatarTooLarge(f"Avatar must not exceed {AVATAR_MAX_BYTES} bytes")
+        yield chunk
+
+
+def _check_type(buffer: bytearray) -> None:
+    if sniff_image_type(bytes(buffer[:_SNIFF_BYTES])) is None:
+        raise UnsupportedAvatar("Avatar must be a PNG, JPEG, GIF or WebP image")
+
+
+def render_variants(data: bytes, sizes: tuple[int, ...], image_format: str, quality: int, max_pixels: int) -> dict[int, bytes]:
+    """
+    Робить квадратні варіанти зображення (обрізання по центру). Виконується в пулі процесів.
+
+    :param data: Вихідне зображення.
+    :param sizes: Сторони варіантів у пікселях.
+    :param image_format: "webp" або "jpeg".
+    :param quality: Якість стиснення.
+    :param max_pixels: Максимальна кількість пікселів вихідного зображення.
+    :return: Словник {розмір: вміст файлу}.
+    :raises UnsupportedAvatar: Якщо зображення пошкоджене або завелике.
+    """
+    # Pillow потрібен лише робочим процесам обробки, тому імпортується тут, а не під час старту
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width * image.height > max_pixels:
+                raise UnsupportedAvatar(f"Avatar must not exceed {max_pixels} pixels")
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image_format == "webp" and image.mode in ("RGBA", "LA", "P") else "RGB")
+            variants = {}
+            for size in sizes:
+                variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+                output = io.BytesIO()
+                variant.save(output, format=image_format.upper(), quality=quality, optimize=True)
+                variants[size] = output.getvalue()
+            return variants
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise UnsupportedAvatar(f"Invalid image: {e}")
+
+
+def variant_name(data: bytes, size: int) -> str:
+    """
+    Ім'я файлу варіанта: хеш вмісту і розмір, наприклад 3fa2c1d09e8b7a65-128.webp.
+    """
+    return f"{hashlib.sha256(data).hexdigest()[:16]}-{size}.{_EXTENSIONS[AVATAR_FORMAT]}"
+
+
+def _write_variants(variants: dict[int, bytes]) -> dict[int, str]:
+    backend = storage.get_storage()
+    names = {}
+    for size, content in variants.items():
+        name = variant_name(content, size)
+        # Ім'я залежить лише від вмісту, тож наявний файл не перезаписується
+        if not backend.exists(name):
+            backend.save(name, content, variant_media_type(name), cache_headers(name)["Cache-Control"])
+        names[size] = name
+    return names
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=AVATAR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _reset_executor(broken: Executor) -> None:
+    """
+    Прибирає зламаний пул (після аварійного завершення процесу), щоб наступний
+    виклик _get_executor() створив новий. Пул, уже замінений іншим викликом, не чіпається.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _render_in_pool(*args) -> dict[int, bytes]:
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            return await loop.run_in_executor(executor, render_variants, *args)
+        except BrokenProcessPool:
+            # Процес пулу завершився аварійно (наприклад, OOM на decompression bomb):
+            # пул відтворюється, обробка повторюється один раз
+            _reset_executor(executor)
+    raise UnsupportedAvatar("Image could not be processed")
+
+
+async def process_avatar(data: bytes) -> dict[int, str]:
+    """
+    Обробляє завантажене зображення у пулі процесів і зберігає варіанти у сховищі.
+
+    :param data: Вміст, прочитаний через read_limited.
+    :return: Словник {розмір: ім'я файлу}.
+    :raises UnsupportedAvatar: Якщо зображення пошкоджене, завелике або двічі поспіль
+                               призвело до аварійного завершення процесу обробки.
+    """
+    args = (data, AVATAR_SIZES, AVATAR_FORMAT, AVATAR_QUALITY, AVATAR_MAX_PIXELS)
+    if AVATAR_WORKERS <= 0:
+        variants = await run_in_threadpool(render_variants, *args)
+    else:
+        variants = await _render_in_pool(*args)
+    return await run_in_threadpool(_write_variants, variants)
+
+
+def pick_variant(names: dict[int, str], size: int = AVATAR_DEFAULT_SIZE) -> str:
+    """
+    Обирає найменший варіант, не менший за потрібний розмір (або найбільший наявний).
+
+    :param names: Словник {розмір: ім'я файлу}.
+    :param size: Розмір відображення в пікселях.
+    :return: Ім'я файлу.
+    """
+    fitting = [s for s in sorted(names) if s >= size]
+    return names[fitting[0] if fitting else max(names)]
+
+
+def avatar_url(name: str) -> str:
+    """
+    Публічний URL варіанта аватара (маршрут /avatars або адреса в S3/CDN).
+    """
+    return storage.get_storage().url(name)
+
+
+def create_direct_upload() -> dict:
+    """
+    Створює підписану форму, за якою клієнт завантажує зображення напряму в сховище,
+    не передаючи файл через API. Після завантаження викликається process_direct_upload.
+    Клієнт додає до форми поле Content-Type зі значенням image/*; вихідний файл лежить
+    у приватному префіксі сховища, доки його не оброблено.
+
+    :return: {"key": ..., "url": ..., "fields": {...}, "expires_in": ...}.
+    :raises storage.StorageError: Якщо сховище не підтримує прямі завантаження.
+    """
+    key = f"{storage.UPLOAD_NAMESPACE}{uuid.uuid4().hex}"
+    form = storage.get_storage().presigned_upload(key, AVATAR_MAX_BYTES, storage.S3_PRESIGN_EXPIRES)
+    return {"key": key, "url": form["url"], "fields": form["fields"], "expires_in": storage.S3_PRESIGN_EXPIRES}
+
+
+async def process_direct_upload(key: str) -> dict[int, str]:
+    """
+    Обробляє зображення, завантажене за create_direct_upload: перевіряє розмір і тип,
+    зберігає варіанти і видаляє вихідний файл.
+
+    :param key: Ключ з create_direct_upload.
+    :return: Словник {розмір: ім'я файлу}.
+    :raises UploadNotFound: Якщо файлу немає.
+    :raises AvatarTooLarge: Якщо файл більший за AVATAR_MAX_BYTES.
+    :raises UnsupportedAvatar: Якщо це не зображення підтримуваного формату.
+    """
+    if not _UPLOAD_NAME.match(key):
+        raise UploadNotFound("Unknown upload key")
+    backend = storage.get_storage()
+    size = await run_in_threadpool(backend.size, key)
+    if size is None:
+        raise UploadNotFound("Upload not found or expired")
+    try:
+        if size > AVATAR_MAX_BYTES:
+            raise AvatarTooLarge(f"Avatar must not exceed {AVATAR_MAX_BYTES} bytes")
+        data = await run_in_threadpool(backend.read, key)
+        _check_type(data)
+        return await process_avatar(data)
+    finally:
+        await run_in_threadpool(backend.delete, key)
+
+
+def variant_media_type(name: str) -> Optional[str]:
+    """
+    Перевіряє, що ім'я має формат variant_name (без шляхів), і повертає MIME-тип.
+
+    :param name: Ім'я файлу з URL.
+    :return: MIME-тип або None, якщо це не ім'я варіанта.
+    """
+    match = _VARIANT_NAME.match(name)
+    return _MEDIA_TYPES[match.group(1)] if match else None
+
+
+def cache_headers(name: str) -> dict:
+    """
+    Заголовки кешування варіанта. ETag — сильний: ім'я файлу вже є хешем вмісту,
+    тож його можна обчислити без читання файлу.
+    """
+    return {
+        "ETag": f'"{name.rsplit(".", 1)[0]}"',
+        "Cache-Control": f"public, max-age={AVATAR_CACHE_MAX_AGE}, immutable",
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Перевіряє заголовок If-None-Match (слабке порівняння, RFC 9110).
+
+    :param if_none_match: Значення заголовка.
+    :param etag: ETag ресурсу.
+    :return: True, якщо клієнт уже має цю версію.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def shutdown() -> None:
+    """
+    Зупиняє пул процесів (викликається при завершенні застосунку).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,304 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import redis
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.database.schemas import ContactResponse, UserResponse
+from app.services import metrics
+
+_settings = get_settings()
+
+# Час життя закешованих контактів (секунди)
+CONTACTS_CACHE_TTL = _settings.contacts_cache_ttl
+
+# Кеш автентифікованих користувачів: розмір і TTL локального LRU та TTL у Redis
+PRINCIPAL_CACHE_SIZE = _settings.principal_cache_size
+PRINCIPAL_CACHE_LOCAL_TTL = _settings.principal_cache_local_ttl
+PRINCIPAL_CACHE_TTL = _settings.principal_cache_ttl
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Повертає (і за потреби створює) спільний клієнт Redis для кешу.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = metrics.InstrumentedRedis.from_url(
+            get_settings().redis_url,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    return _redis_client
+
+
+def close_redis() -> None:
+    """
+    Закриває спільний клієнт Redis (при завершенні застосунку).
+    """
+    global _redis_client
+    if _redis_client is not None:
+        _redis_client.close()
+        _redis_client = None
+
+
+# 🔹 Ключі кешу
+# Усі ключі контактів користувача містять номер "покоління" (версії).
+# Будь-яка зміна контактів збільшує версію, тому старі записи стають
+# недосяжними одразу і самі зникають після завершення TTL.
+def _version_key(user_id: int) -> str:
+    return f"contacts:{user_id}:ver"
+
+
+def _page_key(user_id: int, version: int, cursor: Optional[int], limit: int) -> str:
+    return f"contacts:{user_id}:v{version}:page:{cursor or 0}:{limit}"
+
+
+def _item_key(user_id: int, version: int, contact_id: int) -> str:
+    return f"contacts:{user_id}:v{version}:item:{contact_id}"
+
+
+def _get_version(client: redis.Redis, user_id: int) -> int:
+    return int(client.get(_version_key(user_id)) or 0)
+
+
+def _dump_contact(contact) -> dict:
+    return ContactResponse.model_validate(contact).model_dump(mode="json")
+
+
+def _dump_page(contacts: Iterable, next_cursor: Optional[int]) -> str:
+    return json.dumps({"items": [_dump_contact(c) for c in contacts], "next_cursor": next_cursor})
+
+
+# 🔹 Сторінка списку контактів
+def get_contact_page(user_id: int, cursor: Optional[int], limit: int) -> tuple[Optional[dict], int]:
+    """
+    Повертає закешовану сторінку контактів користувача.
+
+    :param user_id: ID користувача.
+    :param cursor: Курсор сторінки (ID останнього контакту попередньої сторінки).
+    :param limit: Розмір сторінки.
+    :return: Пара ({"items", "next_cursor"} або None, якщо запису немає; поточна версія кешу).
+    """
+    try:
+        client = get_redis()
+        version = _get_version(client, user_id)
+        cached = client.get(_page_key(user_id, version, cursor, limit))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, читаємо контакти з БД: {e}")
+        return None, -1
+    if cached is None:
+        return None, version
+    return json.loads(cached), version
+
+
+def set_contact_page(
+    user_id: int,
+    version: int,
+    cursor: Optional[int],
+    limit: int,
+    contacts: Iterable,
+    next_cursor: Optional[int]
+) -> None:
+    """
+    Кешує сторінку контактів під версією, прочитаною до запиту в БД.
+
+    :param user_id: ID користувача.
+    :param version: Версія кешу, отримана з get_contact_page.
+    :param cursor: Курсор сторінки.
+    :param limit: Розмір сторінки.
+    :param contacts: Контакти сторінки.
+    :param next_cursor: Курсор наступної сторінки.
+    """
+    if version < 0:
+        return
+    payload = _dump_page(contacts, next_cursor)
+    try:
+        get_redis().set(_page_key(user_id, version, cursor, limit), payload, ex=CONTACTS_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Не вдалося записати контакти в кеш: {e}")
+
+
+# 🔹 Окремий контакт
+def get_contact(user_id: int, contact_id: int) -> tuple[Optional[dict], int]:
+    """
+    Повертає закешований контакт користувача.
+
+    :param user_id: ID користувача.
+    :param contact_id: ID контакту.
+    :return: Пара (контакт або None; поточна версія кешу).
+    """
+    try:
+        client = get_redis()
+        version = _get_version(client, user_id)
+        cached = client.get(_item_key(user_id, version, contact_id))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, читаємо контакт з БД: {e}")
+        return None, -1
+    if cached is None:
+        return None, version
+    return json.loads(cached), version
+
+
+def set_contact(user_id: int, version: int, contact) -> None:
+    """
+    Кешує один контакт під версією, прочитаною до запиту в БД.
+
+    :param user_id: ID користувача.
+    :param version: Версія кешу, отримана з get_contact.
+    :param contact: Контакт для збереження.
+    """
+    if version < 0:
+        return
+    payload = json.dumps(_dump_contact(contact))
+    try:
+        get_redis().set(_item_key(user_id, version, contact.id), payload, ex=CONTACTS_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Не вдалося записати контакт у кеш: {e}")
+
+
+# 🔹 Інвалідація
+def invalidate_contacts(user_id: int) -> None:
+    """
+    Робить недійсними всі закешовані контакти користувача.
+
+    :param user_id: ID користувача.
+    """
+    try:
+        get_redis().incr(_version_key(user_id))
+    except RedisError as e:
+        logger.warning(f"Не вдалося інвалідувати кеш контактів: {e}")
+
+
+# 🔹 Кеш автентифікованих користувачів (principal)
+class _LocalLRU:
+    """
+    Потокобезпечний LRU-кеш у пам'яті процесу з TTL для кожного запису.
+    Лічильник generation збільшується при кожному видаленні: запис, прочитаний
+    до видалення, не повертається в кеш (set з generation, взятим до читання).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+
+_principals = _LocalLRU(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_LOCAL_TTL)
+
+
+# Ключ користувача, як і ключі контактів, містить версію: інвалідація збільшує її, тож
+# запис, зчитаний з БД до інвалідації, потрапляє під стару версію і більше не читається.
+def _principal_version_key(subject: str) -> str:
+    return f"principal:{subject}:ver"
+
+
+def _principal_key(subject: str, version: int) -> str:
+    return f"principal:{subject}:v{version}"
+
+
+def get_principal(subject: str) -> tuple[Optional[UserResponse], tuple[int, int]]:
+    """
+    Повертає закешованого користувача за `sub` з JWT.
+    Спочатку перевіряється локальний LRU, потім Redis.
+
+    :param subject: Значення `sub` з токена (email користувача).
+    :return: Пара (дані користувача або None; версія для set_principal —
+             версія в Redis, -1 якщо Redis недоступний, і покоління локального LRU).
+    """
+    generation = _principals.generation
+    principal = _principals.get(subject)
+    if principal is not None:
+        return principal, (-1, generation)
+
+    try:
+        client = get_redis()
+        version = int(client.get(_principal_version_key(subject)) or 0)
+        cached = client.get(_principal_key(subject, version))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, читаємо користувача з БД: {e}")
+        return None, (-1, generation)
+    if cached is None:
+        return None, (version, generation)
+
+    principal = UserResponse.model_validate_json(cached)
+    _principals.set(subject, principal, generation)
+    return principal, (version, generation)
+
+
+def set_principal(subject: str, version: tuple[int, int], user) -> UserResponse:
+    """
+    Кешує користувача локально та в Redis. Якщо після get_principal користувача
+    інвалідовано, запис не потрапляє ні в локальний LRU, ні під актуальну версію в Redis.
+
+    :param subject: Значення `sub` з токена.
+    :param version: Версія, повернута get_principal до читання користувача з БД.
+    :param user: ORM-об'єкт або схема користувача.
+    :return: Схема користувача.
+    """
+    redis_version, generation = version
+    principal = UserResponse.model_validate(user)
+    _principals.set(subject, principal, generation)
+    if redis_version < 0:
+        return principal
+    try:
+        get_redis().set(_principal_key(subject, redis_version), principal.model_dump_json(), ex=PRINCIPAL_CACHE_TTL)
+    except RedisError as e:
+        logger.warning(f"Не вдалося записати користувача в кеш: {e}")
+    return principal
+
+
+def invalidate_principal(subject: str) -> None:
+    """
+    Видаляє користувача з кешу. Викликається при зміні пароля, ролі,
+    аватара, статусу верифікації та при видаленні користувача.
+    Локальні LRU інших процесів застаріють не пізніше ніж через PRINCIPAL_CACHE_LOCAL_TTL.
+
+    :param subject: Значення `sub` з токена (email користувача).
+    """
+    _principals.pop(subject)
+    try:
+        get_redis().incr(_principal_version_key(subject))
+    except RedisError as e:
+        logger.warning(f"Не вдалося інвалідувати кеш користувача: {e}")
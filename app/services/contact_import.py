@@ -0,0 +1,234 @@
+import codecs
+import csv
+import io
+import json
+import tempfile
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import async_crud
+from app.database.schemas import ContactCreate, ContactImportError, ContactImportResult
+from app.services import async_cache
+
+_settings = get_settings()
+
+# Кількість рядків в одній транзакції імпорту та максимальний розмір імпорту
+CONTACTS_IMPORT_BATCH_SIZE = _settings.contacts_import_batch_size
+CONTACTS_IMPORT_MAX_ROWS = _settings.contacts_import_max_rows
+# Максимальний розмір тіла або файлу імпорту в байтах
+CONTACTS_IMPORT_MAX_BYTES = _settings.contacts_import_max_bytes
+# Файл імпорту тримається в пам'яті до цього розміру, далі — на диску
+_SPOOL_MAX_MEMORY = 1024 * 1024
+
+# Необов'язкові поля, для яких порожнє значення у CSV означає None
+_OPTIONAL_FIELDS = ("birthday", "extra_info")
+
+
+class ImportFormatError(ValueError):
+    """Файл імпорту неможливо розібрати."""
+
+
+class ImportTooLarge(ValueError):
+    """Тіло або файл імпорту більші за CONTACTS_IMPORT_MAX_BYTES."""
+
+
+async def limit_stream(chunks: AsyncIterator[bytes], limit: int = None) -> AsyncIterator[bytes]:
+    """
+    Пропускає потік далі і перериває його, щойно сумарний розмір перевищить ліміт.
+
+    :param chunks: Асинхронний потік байтів.
+    :param limit: Максимальний розмір у байтах (за замовчуванням CONTACTS_IMPORT_MAX_BYTES).
+    :raises ImportTooLarge: Якщо потік більший за ліміт.
+    """
+    limit = CONTACTS_IMPORT_MAX_BYTES if limit is None else limit
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > limit:
+            raise ImportTooLarge(f"Import must not exceed {limit} bytes")
+        yield chunk
+
+
+async def spool(chunks: AsyncIterator[bytes], limit: int = None) -> TextIO:
+    """
+    Записує потік у тимчасовий файл (у пам'яті до 1 МБ, далі на диску), перевіряючи
+    розмір і кодування UTF-8 ще до імпорту, тож некоректний файл не імпортується частково.
+
+    :param chunks: Асинхронний потік байтів (тіло запиту або файл форми).
+    :param limit: Максимальний розмір у байтах (за замовчуванням CONTACTS_IMPORT_MAX_BYTES).
+    :return: Текстовий файл для парсерів PARSERS; закривається викликачем.
+    :raises ImportTooLarge: Якщо вміст більший за ліміт.
+    :raises UnicodeDecodeError: Якщо вміст не в UTF-8.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+    try:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        async for chunk in limit_stream(chunks, limit):
+            decoder.decode(chunk)
+            file.write(chunk)
+        decoder.decode(b"", final=True)
+        file.seek(0)
+        return io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    except BaseException:
+        file.close()
+        raise
+
+
+def parse_json(stream: TextIO) -> Iterator:
+    """
+    Розбирає JSON-масив контактів (масив читається цілком, розмір обмежений
+    CONTACTS_IMPORT_MAX_BYTES).
+
+    :param stream: Тіло запиту.
+    :return: Ітератор записів.
+    """
+    try:
+        records = json.load(stream)
+    except json.JSONDecodeError as e:
+        raise ImportFormatError(f"Invalid JSON: {e.msg}")
+    if not isinstance(records, list):
+        raise ImportFormatError("Expected a JSON array of contacts")
+    return iter(records)
+
+
+def parse_ndjson(stream: TextIO) -> Iterator:
+    """
+    Розбирає NDJSON (один JSON-об'єкт на рядок) по рядку з потоку. Порожні рядки
+    пропускаються, некоректні рядки повертаються як ImportFormatError і потрапляють у звіт.
+
+    :param stream: Вміст файлу.
+    :return: Ітератор записів.
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ImportFormatError(f"Invalid JSON: {e.msg}")
+
+
+def parse_csv(stream: TextIO) -> Iterator:
+    """
+    Розбирає CSV із заголовком по рядку з потоку. Порожні необов'язкові поля стають None.
+    Помилка розбору рядка (наприклад, поле довше за csv.field_size_limit()) повертається
+    як ImportFormatError цього рядка, тож не перериває імпорт після вже вставлених пачок.
+
+    :param stream: Вміст файлу.
+    :return: Ітератор записів.
+    :raises ImportFormatError: Якщо неможливо прочитати заголовок.
+    """
+    reader = csv.DictReader(stream)
+    try:
+        reader.fieldnames
+    except csv.Error as e:
+        raise ImportFormatError(f"Invalid CSV header: {e}")
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield ImportFormatError(f"Invalid CSV: {e}")
+            continue
+        for field in _OPTIONAL_FIELDS:
+            if row.get(field) == "":
+                row[field] = None
+        yield row
+
+
+PARSERS = {
+    "json": parse_json,
+    "ndjson": parse_ndjson,
+    "csv": parse_csv,
+}
+
+
+def _validation_errors(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors(include_url=False)
+    ]
+
+
+def _validate_chunk(chunk: list[tuple[int, object]]) -> tuple[list[tuple[int, dict]], list[ContactImportError]]:
+    """
+    Валідує пачку записів через ContactCreate. Дублікати email всередині
+    пачки відкидаються ще до звернення до БД.
+
+    :param chunk: Пари (номер рядка, запис).
+    :return: Пара (валідні контакти з номерами рядків; помилки).
+    """
+    valid: list[tuple[int, dict]] = []
+    errors: list[ContactImportError] = []
+    emails: set[str] = set()
+    for row, record in chunk:
+        if isinstance(record, ImportFormatError):
+            errors.append(ContactImportError(row=row, errors=[str(record)]))
+            continue
+        try:
+            contact = ContactCreate.model_validate(record).model_dump()
+        except ValidationError as e:
+            errors.append(ContactImportError(row=row, errors=_validation_errors(e)))
+            continue
+        if contact["email"] in emails:
+            errors.append(ContactImportError(row=row, errors=["email: Duplicate email in import"]))
+            continue
+        emails.add(contact["email"])
+        valid.append((row, contact))
+    return valid, errors
+
+
+async def import_contacts(
+    db: AsyncSession,
+    records: Iterable,
+    user_id: int,
+    batch_size: int = None
+) -> ContactImportResult:
+    """
+    Валідує записи через ContactCreate і вставляє їх пачками, кожна пачка —
+    окрема транзакція. Помилки валідації та конфлікти email не зупиняють
+    імпорт, а потрапляють у звіт з номером рядка (починаючи з 1).
+    Читання, розбір і валідація пачки (перевірка email дорога) виконуються у пулі
+    потоків, щоб великий імпорт не блокував event loop.
+
+    :param db: Асинхронна сесія бази даних.
+    :param records: Записи контактів (dict), наприклад з parse_csv.
+    :param user_id: ID користувача.
+    :param batch_size: Кількість рядків у пачці (за замовчуванням CONTACTS_IMPORT_BATCH_SIZE).
+    :return: Звіт імпорту.
+    """
+    batch_size = CONTACTS_IMPORT_BATCH_SIZE if batch_size is None else batch_size
+    inserted = 0
+    errors: list[ContactImportError] = []
+
+    numbered = enumerate(islice(records, CONTACTS_IMPORT_MAX_ROWS + 1), start=1)
+    try:
+        while chunk := await run_in_threadpool(list, islice(numbered, batch_size)):
+            if chunk[-1][0] > CONTACTS_IMPORT_MAX_ROWS:
+                chunk.pop()
+                errors.append(ContactImportError(
+                    row=CONTACTS_IMPORT_MAX_ROWS + 1,
+                    errors=[f"Import is limited to {CONTACTS_IMPORT_MAX_ROWS} rows"]
+                ))
+
+            valid, chunk_errors = await run_in_threadpool(_validate_chunk, chunk)
+            errors.extend(chunk_errors)
+
+            created = await async_crud.bulk_insert_contacts(db, [contact for _, contact in valid], user_id)
+            inserted += len(created)
+            for row, contact in valid:
+                if contact["email"] not in created:
+                    errors.append(ContactImportError(row=row, errors=["email: Contact with this email already exists"]))
+    finally:
+        # Пачки комітяться окремо, тож кеш скидається і тоді, коли імпорт перервано помилкою
+        if inserted:
+            await async_cache.invalidate_contacts(user_id)
+
+    errors.sort(key=lambda e: e.row)
+    return ContactImportResult(inserted=inserted, failed=len(errors), errors=errors)
@@ -1,13 +1,20 @@
-import os
+import json
+import threading
+import time
 import requests
-from dotenv import load_dotenv
 
-# Завантажуємо змінні середовища з .env
-load_dotenv()
+from app.config import get_settings
 
-MAILGUN_API_KEY = os.getenv("MAILGUN_API_KEY")
-MAILGUN_DOMAIN = os.getenv("MAILGUN_DOMAIN")
-MAILGUN_SENDER = os.getenv("MAILGUN_SENDER")
+_settings = get_settings()
+
+MAILGUN_API_KEY = _settings.mailgun_api_key
+MAILGUN_DOMAIN = _settings.mailgun_domain
+MAILGUN_SENDER = _settings.mailgun_sender
+
+# Транспорт для черги листів: mailgun або file (локальна заміна для розробки і тестів)
+EMAIL_TRANSPORT = _settings.email_transport
+EMAIL_FILE_PATH = _settings.email_file_path
+EMAIL_SEND_TIMEOUT = _settings.email_send_timeout
 
 def send_email(subject: str, to_email: str, body: str):
     """
@@ -31,3 +38,78 @@ def send_email(subject: str, to_email: str, body: str):
         print(f"✅ Email успішно надіслано на {to_email}")
     else:
         print(f"❌ Помилка відправлення email: {response.status_code}, {response.text}")
+
+
+class EmailDeliveryError(Exception):
+    """
+    Помилка доставки листа. `retryable=False` означає, що повторна спроба не допоможе.
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class MailgunTransport:
+    """
+    Надсилає листи через Mailgun API з таймаутом; помилки піднімаються як EmailDeliveryError.
+    """
+
+    def send(self, subject: str, to_email: str, body: str) -> None:
+        if not MAILGUN_API_KEY or not MAILGUN_DOMAIN or not MAILGUN_SENDER:
+            raise EmailDeliveryError("Mailgun API Key, Domain або Sender Email не налаштовані", retryable=False)
+
+        try:
+            response = requests.post(
+                f"https://api.mailgun.net/v3/{MAILGUN_DOMAIN}/messages",
+                auth=("api", MAILGUN_API_KEY),
+                data={
+                    "from": f"Admin <{MAILGUN_SENDER}>",
+                    "to": [to_email],
+                    "subject": subject,
+                    "text": body
+                },
+                timeout=EMAIL_SEND_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            raise EmailDeliveryError(f"Mailgun недоступний: {e}")
+
+        if response.status_code != 200:
+            # 429 і 5xx — тимчасові помилки, інші 4xx — ні
+            retryable = response.status_code == 429 or response.status_code >= 500
+            raise EmailDeliveryError(f"Mailgun: {response.status_code}, {response.text}", retryable=retryable)
+
+
+class FileTransport:
+    """
+    Записує листи у файл (JSON на рядок) замість відправлення.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or EMAIL_FILE_PATH
+        self._lock = threading.Lock()
+
+    def send(self, subject: str, to_email: str, body: str) -> None:
+        line = json.dumps({"to": to_email, "subject": subject, "body": body, "sent_at": time.time()})
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+TRANSPORTS = {
+    "mailgun": MailgunTransport,
+    "file": FileTransport,
+}
+
+
+def get_transport(name: str = None):
+    """
+    Створює транспорт листів за назвою (за замовчуванням — EMAIL_TRANSPORT).
+
+    :param name: Назва транспорту.
+    :return: Об'єкт з методом send(subject, to_email, body).
+    """
+    name = name or EMAIL_TRANSPORT
+    try:
+        return TRANSPORTS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown email transport: {name}")
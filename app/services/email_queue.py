@@ -0,0 +1,234 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Optional
+
+import redis
+from loguru import logger
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.services import async_cache, metrics
+from app.services.email import EmailDeliveryError, get_transport
+
+_settings = get_settings()
+
+# Черга листів у Redis: список задач, відкладені повтори (sorted set за часом)
+# і dead-letter список для задач, що вичерпали спроби.
+EMAIL_QUEUE_NAME = _settings.email_queue_name
+EMAIL_MAX_ATTEMPTS = _settings.email_max_attempts
+EMAIL_RETRY_BASE_DELAY = _settings.email_retry_base_delay
+EMAIL_RETRY_MAX_DELAY = _settings.email_retry_max_delay
+# Воркер без heartbeat довше за цей час (секунди) вважається мертвим, а його задачі
+# повертаються в чергу; має бути більшим за найдовше надсилання листа
+EMAIL_WORKER_HEARTBEAT_TTL = _settings.email_worker_heartbeat_ttl
+
+# Задачі, відправлені без черги, коли Redis недоступний (тримаємо посилання до завершення)
+_fallback_tasks: set = set()
+
+
+def new_job(subject: str, to_email: str, body: str) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "subject": subject,
+        "to": to_email,
+        "body": body,
+        "attempts": 0,
+        "created_at": time.time(),
+    }
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Експоненційна затримка перед повтором (з невеликим випадковим розкидом).
+
+    :param attempts: Кількість уже зроблених спроб (від 1).
+    :return: Затримка в секундах.
+    """
+    delay = min(EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1), EMAIL_RETRY_MAX_DELAY)
+    return delay + random.uniform(0, delay * 0.1)
+
+
+class EmailQueue:
+    """
+    Операції з чергою листів для воркера (синхронний клієнт Redis).
+
+    Задача, взята в роботу, переноситься у власний список processing воркера і видаляється
+    звідти лише після обробки. Воркер регулярно оновлює heartbeat; задачі воркера, що
+    перестав його оновлювати (впав), інші воркери повертають у чергу.
+    """
+
+    def __init__(self, client: redis.Redis, name: str = EMAIL_QUEUE_NAME, worker_id: str = None):
+        self.client = client
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self.queue_key = f"{name}:queue"
+        self.processing_prefix = f"{name}:processing:"
+        self.processing_key = f"{self.processing_prefix}{self.worker_id}"
+        # Sorted set: id воркера -> час останнього heartbeat
+        self.workers_key = f"{name}:workers"
+        self.retry_key = f"{name}:retry"
+        self.dead_key = f"{name}:dead"
+
+    def push(self, job: dict) -> None:
+        self.client.rpush(self.queue_key, json.dumps(job))
+
+    def reserve(self, timeout: float = 0) -> Optional[str]:
+        """
+        Бере наступну задачу з черги (блокуючись до timeout секунд, 0 — без очікування).
+        """
+        if timeout:
+            return self.client.blmove(self.queue_key, self.processing_key, timeout, "LEFT", "RIGHT")
+        return self.client.lmove(self.queue_key, self.processing_key, "LEFT", "RIGHT")
+
+    def ack(self, raw: str) -> None:
+        self.client.lrem(self.processing_key, 1, raw)
+
+    def schedule_retry(self, raw: str, job: dict, error: str) -> None:
+        job = {**job, "last_error": error}
+        pipe = self.client.pipeline()
+        pipe.zadd(self.retry_key, {json.dumps(job): time.time() + retry_delay(job["attempts"])})
+        pipe.lrem(self.processing_key, 1, raw)
+        pipe.execute()
+
+    def bury(self, raw: str, job: dict, error: str) -> None:
+        job = {**job, "last_error": error, "failed_at": time.time()}
+        pipe = self.client.pipeline()
+        pipe.rpush(self.dead_key, json.dumps(job))
+        pipe.lrem(self.processing_key, 1, raw)
+        pipe.execute()
+
+    def promote_due(self) -> int:
+        """
+        Повертає в чергу задачі, час повтору яких настав.
+
+        :return: Кількість повернутих задач.
+        """
+        promoted = 0
+        for raw in self.client.zrangebyscore(self.retry_key, 0, time.time()):
+            # ZREM повертає 1 лише одному з воркерів, тому задача не дублюється
+            if self.client.zrem(self.retry_key, raw):
+                self.client.rpush(self.queue_key, raw)
+                promoted += 1
+        return promoted
+
+    def heartbeat(self) -> None:
+        """
+        Позначає воркер живим (викликається між задачами).
+        """
+        self.client.zadd(self.workers_key, {self.worker_id: time.time()})
+
+    def _requeue(self, processing_key: str) -> int:
+        requeued = 0
+        while self.client.lmove(processing_key, self.queue_key, "RIGHT", "LEFT") is not None:
+            requeued += 1
+        return requeued
+
+    def reclaim_stale(self, ttl: float = None) -> int:
+        """
+        Повертає в чергу задачі воркерів, що не оновлювали heartbeat довше за ttl секунд.
+        Задачі живих воркерів не чіпаються.
+
+        :param ttl: Поріг у секундах (за замовчуванням EMAIL_WORKER_HEARTBEAT_TTL).
+        :return: Кількість повернутих задач.
+        """
+        ttl = EMAIL_WORKER_HEARTBEAT_TTL if ttl is None else ttl
+        requeued = 0
+        for worker_id in self.client.zrangebyscore(self.workers_key, 0, time.time() - ttl):
+            # ZREM повертає 1 лише одному з воркерів, тому задачі повертає лише він
+            if self.client.zrem(self.workers_key, worker_id):
+                requeued += self._requeue(f"{self.processing_prefix}{worker_id}")
+        return requeued
+
+    def release(self) -> int:
+        """
+        Повертає в чергу власні незавершені задачі і знімає воркер з реєстру (при зупинці).
+
+        :return: Кількість повернутих задач.
+        """
+        requeued = self._requeue(self.processing_key)
+        self.client.zrem(self.workers_key, self.worker_id)
+        return requeued
+
+    def stats(self) -> dict:
+        workers = self.client.zrange(self.workers_key, 0, -1)
+        if self.worker_id not in workers:
+            workers.append(self.worker_id)
+        pipe = self.client.pipeline()
+        pipe.llen(self.queue_key)
+        pipe.zcard(self.retry_key)
+        pipe.llen(self.dead_key)
+        for worker_id in workers:
+            pipe.llen(f"{self.processing_prefix}{worker_id}")
+        queued, retrying, dead, *processing = pipe.execute()
+        return {"queued": queued, "processing": sum(processing), "retrying": retrying, "dead": dead}
+
+
+def process_job(queue: EmailQueue, raw: str, transport) -> bool:
+    """
+    Надсилає лист із задачі. При тимчасовій помилці задача відкладається
+    з експоненційною затримкою, після EMAIL_MAX_ATTEMPTS — у dead-letter.
+
+    :param queue: Черга листів.
+    :param raw: Задача у вигляді JSON-рядка.
+    :param transport: Транспорт листів.
+    :return: True, якщо лист надіслано.
+    """
+    try:
+        job = json.loads(raw)
+    except json.JSONDecodeError:
+        queue.bury(raw, {"raw": raw, "attempts": 0}, "Invalid job payload")
+        return False
+
+    job["attempts"] += 1
+    started = time.perf_counter()
+    try:
+        transport.send(job["subject"], job["to"], job["body"])
+    except Exception as e:
+        metrics.EMAIL_SEND_SECONDS.labels("error").observe(time.perf_counter() - started)
+        retryable = not isinstance(e, EmailDeliveryError) or e.retryable
+        if retryable and job["attempts"] < EMAIL_MAX_ATTEMPTS:
+            logger.warning(f"Лист {job['id']} не надіслано (спроба {job['attempts']}): {e}")
+            queue.schedule_retry(raw, job, str(e))
+        else:
+            logger.error(f"Лист {job['id']} переміщено в dead-letter: {e}")
+            queue.bury(raw, job, str(e))
+        return False
+
+    metrics.EMAIL_SEND_SECONDS.labels("sent").observe(time.perf_counter() - started)
+    queue.ack(raw)
+    logger.info(f"Лист {job['id']} надіслано на {job['to']}")
+    return True
+
+
+async def enqueue_email(subject: str, to_email: str, body: str, name: str = EMAIL_QUEUE_NAME) -> None:
+    """
+    Ставить лист у чергу; надсилає його воркер (python -m app.workers.email_worker).
+    Якщо Redis недоступний, лист надсилається у фоні поточного процесу.
+
+    :param subject: Тема листа.
+    :param to_email: Адреса отримувача.
+    :param body: Текст листа.
+    :param name: Назва черги.
+    """
+    job = new_job(subject, to_email, body)
+    try:
+        await async_cache.get_redis().rpush(f"{name}:queue", json.dumps(job))
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, лист надсилається без черги: {e}")
+        task = asyncio.create_task(run_in_threadpool(_send_now, job))
+        _fallback_tasks.add(task)
+        task.add_done_callback(_fallback_tasks.discard)
+
+
+def _send_now(job: dict) -> None:
+    started = time.perf_counter()
+    try:
+        get_transport().send(job["subject"], job["to"], job["body"])
+    except Exception as e:
+        metrics.EMAIL_SEND_SECONDS.labels("error").observe(time.perf_counter() - started)
+        logger.error(f"Не вдалося надіслати лист {job['id']}: {e}")
+    else:
+        metrics.EMAIL_SEND_SECONDS.labels("sent").observe(time.perf_counter() - started)
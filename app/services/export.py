@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+# Колонки, що потрапляють в експорт контактів
+EXPORT_COLUMNS = ("id", "first_name", "last_name", "email", "phone", "birthday", "extra_info")
+
+
+def _json_default(value):
+    # date/datetime -> ISO 8601
+    return value.isoformat()
+
+
+async def ndjson_lines(partitions: AsyncIterator[list], columns: tuple[str, ...] = EXPORT_COLUMNS) -> AsyncIterator[str]:
+    """
+    Перетворює пачки рядків на NDJSON (один JSON-об'єкт на рядок).
+
+    :param partitions: Асинхронний ітератор пачок рядків.
+    :param columns: Назви колонок у порядку вибірки.
+    :return: Асинхронний ітератор фрагментів NDJSON (по одному на пачку).
+    """
+    async for partition in partitions:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in partition
+        )
+
+
+async def csv_lines(partitions: AsyncIterator[list], columns: tuple[str, ...] = EXPORT_COLUMNS) -> AsyncIterator[str]:
+    """
+    Перетворює пачки рядків на CSV із заголовком.
+
+    :param partitions: Асинхронний ітератор пачок рядків.
+    :param columns: Назви колонок у порядку вибірки.
+    :return: Асинхронний ітератор фрагментів CSV (заголовок, потім по одному на пачку).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    async for partition in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(partition)
+        yield buffer.getvalue()
@@ -0,0 +1,183 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import ecdsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from loguru import logger
+
+from app.config import get_settings
+
+_settings = get_settings()
+
+# Підпис JWT. Без JWT_KEYS_DIR токени підписуються HS256 спільним SECRET_KEY (як раніше).
+# З JWT_KEYS_DIR — асиметричними ключами з каталогу:
+#   {kid}.pem      — приватний ключ RSA (RS256) або EC P-256 (ES256)
+#   {kid}.pub.pem  — лише публічний ключ (виведений з обігу ключ, токени якого ще діють)
+# Підписує ключ JWT_ACTIVE_KID (за замовчуванням — останній за назвою), перевіряються всі.
+# Публічні ключі доступні на /.well-known/jwks.json, тож інші сервіси перевіряють токени локально.
+SECRET_KEY = _settings.secret_key
+JWT_KEYS_DIR = _settings.jwt_keys_dir
+JWT_ACTIVE_KID = _settings.jwt_active_kid
+# Приймати токени без kid, підписані SECRET_KEY (на час переходу з HS256)
+JWT_ACCEPT_LEGACY_HS256 = _settings.jwt_accept_legacy_hs256
+# Як часто можна перечитувати каталог ключів, коли трапляється невідомий kid (секунди)
+JWT_KEYS_RELOAD_INTERVAL = _settings.jwt_keys_reload_interval
+
+LEGACY_ALGORITHM = "HS256"
+
+
+@dataclass(frozen=True)
+class JwtKey:
+    kid: str
+    algorithm: str
+    verifying_key: Key
+    signing_key: Optional[Key] = None
+
+    def public_jwk(self) -> dict:
+        return {**self.verifying_key.to_dict(), "kid": self.kid, "use": "sig", "alg": self.algorithm}
+
+
+def _key_algorithm(pem: str) -> str:
+    # Тип ключа визначається через ecdsa (залежність python-jose), бо бекенд
+    # cryptography у jose конструює RSA-ключ з будь-якого PEM без помилки
+    for loader in (ecdsa.SigningKey.from_pem, ecdsa.VerifyingKey.from_pem):
+        try:
+            key = loader(pem)
+        except Exception:
+            continue
+        if key.curve != ecdsa.NIST256p:
+            raise ValueError(f"Unsupported EC curve: {key.curve.name}, expected P-256")
+        return "ES256"
+    return "RS256"
+
+
+def _construct(pem: str) -> tuple[str, Key]:
+    algorithm = _key_algorithm(pem)
+    try:
+        return algorithm, jwk.construct(pem, algorithm)
+    except Exception as e:
+        raise ValueError(f"Unsupported key: expected an RSA or EC P-256 PEM key ({e})")
+
+
+def load_key(path: Path) -> JwtKey:
+    """
+    Завантажує ключ з PEM-файлу; алгоритм визначається за типом ключа.
+
+    :param path: Шлях до {kid}.pem або {kid}.pub.pem.
+    :return: Ключ з kid, алгоритмом і об'єктами для підпису/перевірки.
+    """
+    public_only = path.name.endswith(".pub.pem")
+    kid = path.name[: -len(".pub.pem")] if public_only else path.stem
+    algorithm, key = _construct(path.read_text())
+    if public_only or key.is_public():
+        return JwtKey(kid=kid, algorithm=algorithm, verifying_key=key.public_key())
+    return JwtKey(kid=kid, algorithm=algorithm, verifying_key=key.public_key(), signing_key=key)
+
+
+class KeyRing:
+    """
+    Набір ключів JWT, закешований у пам'яті.
+    """
+
+    def __init__(self, keys: dict[str, JwtKey], active_kid: Optional[str]):
+        self.keys = keys
+        self.active = keys[active_kid] if active_kid else None
+        if self.active is not None and self.active.signing_key is None:
+            raise ValueError(f"JWT key '{active_kid}' has no private part")
+
+    @classmethod
+    def from_directory(cls, keys_dir: str, active_kid: str = "") -> "KeyRing":
+        keys = {}
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            key = load_key(path)
+            # Приватний ключ має перевагу над публічною копією з тим самим kid
+            if key.kid not in keys or key.signing_key is not None:
+                keys[key.kid] = key
+        signing = sorted(kid for kid, key in keys.items() if key.signing_key is not None)
+        if not signing:
+            raise ValueError(f"No private JWT keys in {keys_dir}")
+        return cls(keys, active_kid or signing[-1])
+
+    def jwks(self) -> dict:
+        return {"keys": [key.public_jwk() for key in self.keys.values()]}
+
+
+_keyring: Optional[KeyRing] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_keyring() -> KeyRing:
+    """
+    Повертає закешований набір ключів (порожній у режимі HS256).
+    """
+    global _keyring, _loaded_at
+    if _keyring is None:
+        with _lock:
+            if _keyring is None:
+                _keyring = KeyRing.from_directory(JWT_KEYS_DIR, JWT_ACTIVE_KID) if JWT_KEYS_DIR else KeyRing({}, None)
+                _loaded_at = time.monotonic()
+    return _keyring
+
+
+def reload_keyring(force: bool = False) -> KeyRing:
+    """
+    Перечитує ключі з JWT_KEYS_DIR (не частіше ніж раз на JWT_KEYS_RELOAD_INTERVAL, якщо не force).
+    Дає змогу додати новий ключ без перезапуску: інші екземпляри підхоплять його
+    при першому токені з невідомим kid.
+    """
+    global _keyring, _loaded_at
+    with _lock:
+        if JWT_KEYS_DIR and (force or time.monotonic() - _loaded_at >= JWT_KEYS_RELOAD_INTERVAL):
+            try:
+                _keyring = KeyRing.from_directory(JWT_KEYS_DIR, JWT_ACTIVE_KID)
+            except (OSError, ValueError) as e:
+                logger.error(f"Не вдалося перечитати ключі JWT: {e}")
+            _loaded_at = time.monotonic()
+    return get_keyring()
+
+
+def encode(claims: dict) -> str:
+    """
+    Підписує токен активним ключем (з заголовком kid) або SECRET_KEY у режимі HS256.
+
+    :param claims: Дані токена.
+    :return: JWT.
+    """
+    active = get_keyring().active
+    if active is None:
+        return jwt.encode(claims, SECRET_KEY, algorithm=LEGACY_ALGORITHM)
+    return jwt.encode(claims, active.signing_key, algorithm=active.algorithm, headers={"kid": active.kid})
+
+
+def decode(token: str) -> dict:
+    """
+    Перевіряє підпис і термін дії токена. Ключ обирається за kid, алгоритм —
+    за ключем (а не за заголовком токена).
+
+    :param token: JWT.
+    :return: Дані токена.
+    :raises JWTError: Якщо токен недійсний.
+    """
+    kid = jwt.get_unverified_header(token).get("kid")
+    keyring = get_keyring()
+    if kid is None:
+        if keyring.active is not None and not JWT_ACCEPT_LEGACY_HS256:
+            raise JWTError("Token has no key id")
+        return jwt.decode(token, SECRET_KEY, algorithms=[LEGACY_ALGORITHM])
+
+    key = keyring.keys.get(kid) or reload_keyring().keys.get(kid)
+    if key is None:
+        raise JWTError("Unknown key id")
+    return jwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
+
+
+def jwks() -> dict:
+    """
+    Публічні ключі у форматі JWKS (RFC 7517).
+    """
+    return get_keyring().jwks()
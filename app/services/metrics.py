@@ -0,0 +1,435 @@
+import bisect
+import math
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.client import Pipeline
+from sqlalchemy import event
+
+from app.config import get_settings
+
+# Метрики застосунку у форматі Prometheus (GET /metrics): затримка і кількість запитів за
+# маршрутами, запити в обробці, SQL-запити і час БД на запит, звернення до Redis, час
+# хешування паролів і надсилання листів. Власний легкий реєстр без зовнішніх залежностей:
+# оновлення метрики — один lock і кілька арифметичних операцій.
+METRICS_ENABLED = get_settings().metrics_enabled
+
+# Межі кошиків гістограм (секунди / кількість)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PASSWORD_HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Metric:
+    """
+    Метрика з необов'язковими мітками; значення для кожного набору міток — окремий дочірній об'єкт.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple, object] = {}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            yield self.name, _format_labels(self.labelnames, values), child.value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self._samples()]
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS, registry: "Registry" = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, values, le), cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    """
+    Набір метрик, що віддаються разом у текстовому форматі Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# 🔹 Метрики застосунку
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being handled.")
+HTTP_REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per HTTP request.", ("route",), buckets=COUNT_BUCKETS)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per HTTP request.", ("route",))
+HTTP_REQUEST_REDIS_ROUND_TRIPS = Histogram(
+    "http_request_redis_round_trips", "Redis round trips per HTTP request.", ("route",), buckets=COUNT_BUCKETS)
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed.")
+DB_STATEMENT_SECONDS = Histogram("db_statement_duration_seconds", "SQL statement execution time.")
+REDIS_ROUND_TRIPS = Counter("redis_round_trips_total", "Redis round trips by command (PIPELINE for pipelines).", ("command",))
+REDIS_ROUND_TRIP_SECONDS = Histogram("redis_round_trip_duration_seconds", "Redis round trip time.")
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "Password hash/verify time including pool queueing.", ("operation",),
+    buckets=PASSWORD_HASH_BUCKETS)
+EMAIL_SEND_SECONDS = Histogram("email_send_duration_seconds", "Email send time by result.", ("result",))
+
+
+# 🔹 Лічильники поточного HTTP-запиту
+@dataclass
+class RequestStats:
+    db_statements: int = 0
+    db_seconds: float = 0.0
+    redis_round_trips: int = 0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """
+    Лічильники HTTP-запиту, що обробляється (None поза запитом).
+    """
+    return _request_stats.get()
+
+
+def route_name(scope: dict) -> str:
+    # Шаблон шляху маршруту (/contacts/{contact_id}), а не сам шлях — щоб кількість міток була обмеженою
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: затримка, статус, запити в обробці і лічильники БД/Redis для кожного HTTP-запиту.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        HTTP_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec()
+            _request_stats.reset(token)
+            method, route = scope["method"], route_name(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            HTTP_REQUEST_DB_STATEMENTS.labels(route).observe(stats.db_statements)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
+            HTTP_REQUEST_REDIS_ROUND_TRIPS.labels(route).observe(stats.redis_round_trips)
+
+
+# 🔹 SQL
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    elapsed = time.perf_counter() - started
+    DB_STATEMENTS.inc()
+    DB_STATEMENT_SECONDS.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("metrics_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """
+    Підписує синхронний двигун (для асинхронного — engine.sync_engine) на події виконання SQL.
+
+    :param engine: Двигун SQLAlchemy.
+    """
+    if not METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# 🔹 Redis
+def _record_redis(command: str, started: float) -> None:
+    REDIS_ROUND_TRIPS.labels(command).inc()
+    REDIS_ROUND_TRIP_SECONDS.observe(time.perf_counter() - started)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.redis_round_trips += 1
+
+
+def _command_name(args: tuple) -> str:
+    return str(args[0]).upper() if args else ""
+
+
+class InstrumentedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            _record_redis("PIPELINE", started)
+
+    def immediate_execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().immediate_execute_command(*args, **options)
+        finally:
+            _record_redis(_command_name(args), started)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Клієнт Redis, що рахує звернення до сервера (pipeline — одне звернення).
+    """
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            _record_redis(_command_name(args), started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedAsyncPipeline(AsyncPipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            _record_redis("PIPELINE", started)
+
+    async def immediate_execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().immediate_execute_command(*args, **options)
+        finally:
+            _record_redis(_command_name(args), started)
+
+
+class InstrumentedAsyncRedis(aioredis.Redis):
+    """
+    Асинхронний клієнт Redis, що рахує звернення до сервера (pipeline — одне звернення).
+    """
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            _record_redis(_command_name(args), started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedAsyncPipeline:
+        return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+# 🔹 Віддача метрик
+def render() -> str:
+    """
+    Усі метрики процесу в текстовому форматі Prometheus.
+    """
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Віддає метрики процесу без FastAPI (для воркерів) у фоновому потоці.
+
+    :param port: Порт.
+    :param host: Адреса.
+    :return: Запущений сервер (server.shutdown() зупиняє його).
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,178 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.services import metrics, security
+
+_settings = get_settings()
+
+# Хешування паролів (bcrypt) в окремому пулі процесів: навантаження на CPU
+# розподіляється між ядрами і не займає event loop та пул потоків маршрутів.
+# PASSWORD_HASH_WORKERS=0 — виконувати у пулі потоків (без окремих процесів).
+PASSWORD_HASH_WORKERS = _settings.password_hash_workers
+# Скільки операцій може одночасно чекати в пулі; понад це — PasswordHasherBusy (503)
+PASSWORD_HASH_MAX_PENDING = _settings.password_hash_max_pending or max(PASSWORD_HASH_WORKERS, 1) * 8
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Черга хешування паролів переповнена.
+    """
+
+
+class _HasherStats:
+    """
+    Лічильники операцій хешування: кількість, час виконання і відмови.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.operations = {op: {"count": 0, "seconds_total": 0.0, "seconds_max": 0.0} for op in ("hash", "verify")}
+        self.rehashed = 0
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.in_flight >= PASSWORD_HASH_MAX_PENDING:
+                self.rejected += 1
+                raise PasswordHasherBusy("Too many password hashing operations in progress")
+            self.in_flight += 1
+
+    def release(self, op: str, seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            stats = self.operations[op]
+            stats["count"] += 1
+            stats["seconds_total"] += seconds
+            stats["seconds_max"] = max(stats["seconds_max"], seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "workers": PASSWORD_HASH_WORKERS,
+                "max_pending": PASSWORD_HASH_MAX_PENDING,
+                "in_flight": self.in_flight,
+                "rejected_total": self.rejected,
+                "rehashed_total": self.rehashed,
+                **{
+                    f"{op}_{key}": round(value, 6) if isinstance(value, float) else value
+                    for op, stats in self.operations.items()
+                    for key, value in stats.items()
+                },
+            }
+
+
+_stats = _HasherStats()
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: дочірні процеси не успадковують потоки і з'єднання батьківського
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _reset_executor(broken: Executor) -> None:
+    """
+    Прибирає зламаний пул (після аварійного завершення процесу), щоб наступний
+    виклик _get_executor() створив новий. Пул, уже замінений іншим викликом, не чіпається.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(op: str, func, *args):
+    _stats.acquire()
+    started = time.perf_counter()
+    try:
+        if PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(func, *args)
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Процес пулу завершився аварійно (OOM, SIGKILL): пул відтворюється, операція
+            # повторюється один раз
+            _reset_executor(executor)
+            return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        elapsed = time.perf_counter() - started
+        _stats.release(op, elapsed)
+        metrics.PASSWORD_HASH_SECONDS.labels(op).observe(elapsed)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Асинхронно хешує пароль у пулі процесів.
+
+    :param password: Пароль у відкритому вигляді.
+    :return: Хеш пароля.
+    :raises PasswordHasherBusy: Якщо черга хешування переповнена.
+    """
+    return await _run("hash", security.hash_password, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Асинхронно перевіряє пароль у пулі процесів.
+
+    :param plain_password: Введений пароль.
+    :param hashed_password: Збережений хеш.
+    :return: True, якщо пароль правильний.
+    :raises PasswordHasherBusy: Якщо черга хешування переповнена.
+    """
+    return await _run("verify", security.verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Асинхронно перевіряє пароль; якщо хеш створено за застарілою політикою,
+    повертає новий хеш (обчислений у тому ж процесі пулу).
+
+    :param plain_password: Введений пароль.
+    :param hashed_password: Збережений хеш.
+    :return: Пара (пароль правильний; новий хеш або None).
+    :raises PasswordHasherBusy: Якщо черга хешування переповнена.
+    """
+    valid, new_hash = await _run("verify", security.verify_and_update, plain_password, hashed_password)
+    if new_hash is not None:
+        with _stats._lock:
+            _stats.rehashed += 1
+    return valid, new_hash
+
+
+def stats() -> dict:
+    """
+    Повертає метрики пулу хешування паролів.
+    """
+    return _stats.as_dict()
+
+
+def shutdown() -> None:
+    """
+    Зупиняє пул процесів (викликається при завершенні застосунку).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,216 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from jose import JWTError
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.services import async_cache, jwt_keys
+
+_settings = get_settings()
+
+# Обмеження частоти запитів: token bucket у Redis (атомарний Lua-скрипт), спільний для
+# всіх екземплярів API. Якщо Redis недоступний — локальний bucket у пам'яті процесу.
+# Політика маршруту задається як "кількість/секунди" і перевизначається змінною
+# RATE_LIMIT_<NAME>, наприклад RATE_LIMIT_LOGIN=20/60.
+RATE_LIMIT_ENABLED = _settings.rate_limit_enabled
+# Брати IP клієнта із X-Forwarded-For (лише за довіреним проксі)
+RATE_LIMIT_TRUST_PROXY = _settings.rate_limit_trust_proxy
+RATE_LIMIT_LOCAL_MAX_KEYS = _settings.rate_limit_local_max_keys
+
+# Повертає {дозволено, залишок токенів}; час береться з Redis, тож однаковий для всіх екземплярів
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+if now > ts then
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    ts = now
+end
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(ts))
+redis.call('PEXPIRE', KEYS[1], ttl)
+return {allowed, tostring(tokens)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Секунди до можливості наступного запиту та до повного відновлення bucket
+    retry_after: float
+    reset_after: float
+
+
+def _result(allowed: bool, tokens: float, capacity: int, per_second: float, cost: int) -> RateLimitResult:
+    return RateLimitResult(
+        allowed=allowed,
+        limit=capacity,
+        remaining=int(tokens),
+        retry_after=0.0 if allowed else (cost - tokens) / per_second,
+        reset_after=(capacity - tokens) / per_second,
+    )
+
+
+class _LocalBuckets:
+    """
+    Token bucket у пам'яті процесу (запасний варіант без Redis).
+    Зберігає не більше RATE_LIMIT_LOCAL_MAX_KEYS ключів, витісняючи найстаріші.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_LOCAL_MAX_KEYS):
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    def hit(self, key: str, capacity: int, per_second: float, cost: int = 1) -> RateLimitResult:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (float(capacity), now))
+            tokens = min(capacity, tokens + (now - ts) * per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return _result(allowed, tokens, capacity, per_second, cost)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_local = _LocalBuckets()
+
+
+async def hit(key: str, capacity: int, seconds: float, cost: int = 1) -> RateLimitResult:
+    """
+    Списує `cost` токенів з bucket `key` (місткість `capacity`, повне відновлення за `seconds`).
+
+    :param key: Ключ bucket.
+    :param capacity: Кількість запитів за період.
+    :param seconds: Тривалість періоду.
+    :param cost: Вартість запиту в токенах.
+    :return: Результат перевірки.
+    """
+    per_second = capacity / seconds
+    try:
+        allowed, tokens = await async_cache.get_redis().eval(
+            _TOKEN_BUCKET_LUA, 1, f"ratelimit:{key}",
+            capacity, per_second / 1000, cost, math.ceil(seconds * 1000),
+        )
+    except RedisError as e:
+        logger.warning(f"Redis недоступний, ліміт запитів рахується локально: {e}")
+        return _local.hit(key, capacity, per_second, cost)
+    return _result(bool(allowed), float(tokens), capacity, per_second, cost)
+
+
+def parse_policy(value: str) -> tuple[int, float]:
+    """
+    Розбирає політику "кількість/секунди".
+
+    :param value: Наприклад, "10/60".
+    :return: Пара (кількість запитів, секунди).
+    """
+    times, seconds = value.split("/")
+    return int(times), float(seconds)
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _user_identity(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt_keys.decode(token).get("sub")
+    except JWTError:
+        return None
+
+
+class RateLimit:
+    """
+    Залежність FastAPI, що застосовує політику обмеження частоти до маршруту.
+
+    :param name: Назва політики (ключ у Redis і суфікс змінної RATE_LIMIT_<NAME>).
+    :param default: Політика за замовчуванням, "кількість/секунди".
+    :param key: За чим рахувати запити: "ip", "user" (з токена, інакше IP)
+                або "ip_username" (IP + поле username форми входу).
+    """
+
+    def __init__(self, name: str, default: str, key: str = "ip"):
+        if key not in ("ip", "user", "ip_username"):
+            raise ValueError(f"Unknown rate limit key: {key}")
+        self.name = name
+        self.key = key
+        # Політики з полем rate_limit_<name> у Settings перевизначаються змінною RATE_LIMIT_<NAME>
+        self.times, self.seconds = parse_policy(getattr(_settings, f"rate_limit_{name}", None) or default)
+
+    async def identity(self, request: Request) -> str:
+        if self.key == "user":
+            user = _user_identity(request)
+            return f"user:{user}" if user else f"ip:{client_ip(request)}"
+        if self.key == "ip_username":
+            form = await request.form()
+            return f"ip:{client_ip(request)}:username:{str(form.get('username', '')).lower()}"
+        return f"ip:{client_ip(request)}"
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        result = await hit(f"{self.name}:{await self.identity(request)}", self.times, self.seconds)
+        headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(math.ceil(result.reset_after)),
+        }
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={**headers, "Retry-After": str(math.ceil(result.retry_after))},
+            )
+        response.headers.update(headers)
+
+
+# 🔹 Політики маршрутів
+login_limit = RateLimit("login", "10/60", key="ip_username")
+# Загальний ліміт входів з однієї адреси: не дає перебирати паролі, змінюючи username
+login_ip_limit = RateLimit("login_ip", "30/60")
+signup_limit = RateLimit("signup", "10/3600")
+password_reset_limit = RateLimit("password_reset", "5/3600")
+contacts_import_limit = RateLimit("contacts_import", "10/60", key="user")
+contacts_write_limit = RateLimit("contacts_write", "120/60", key="user")
+me_limit = RateLimit("me", "5/60", key="user")
@@ -0,0 +1,123 @@
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+from loguru import logger
+
+from app.services import async_cache
+from app.services.auth import REFRESH_TOKEN_EXPIRE_DAYS, create_refresh_token, decode_refresh_token
+
+# Серверне сховище refresh-токенів у Redis.
+#   refresh:jti:{jti}     — діючий (ще не використаний) токен: "{family}:{sub}"
+#   refresh:family:{fam}  — жива сесія (сімейство токенів, що змінюють один одного): sub
+#   refresh:user:{sub}    — множина сімейств користувача (для відкликання всіх сесій)
+# Усі ключі живуть REFRESH_TOKEN_EXPIRE_DAYS і продовжуються при кожній ротації.
+REFRESH_TOKEN_TTL = int(timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS).total_seconds())
+
+
+def _jti_key(jti: str) -> str:
+    return f"refresh:jti:{jti}"
+
+
+def _family_key(family: str) -> str:
+    return f"refresh:family:{family}"
+
+
+def _user_key(subject: str) -> str:
+    return f"refresh:user:{subject}"
+
+
+async def _store(subject: str, family: str) -> str:
+    jti = uuid.uuid4().hex
+    pipe = async_cache.get_redis().pipeline(transaction=True)
+    pipe.set(_jti_key(jti), f"{family}:{subject}", ex=REFRESH_TOKEN_TTL)
+    pipe.set(_family_key(family), subject, ex=REFRESH_TOKEN_TTL)
+    pipe.sadd(_user_key(subject), family)
+    pipe.expire(_user_key(subject), REFRESH_TOKEN_TTL)
+    await pipe.execute()
+    return create_refresh_token(data={"sub": subject, "jti": jti, "fam": family})
+
+
+async def issue(subject: str) -> str:
+    """
+    Створює refresh-токен нової сесії (нове сімейство).
+
+    :param subject: Email користувача.
+    :return: Refresh-токен.
+    """
+    return await _store(subject, uuid.uuid4().hex)
+
+
+async def rotate(token: str) -> Optional[tuple[str, str]]:
+    """
+    Обмінює refresh-токен на новий того ж сімейства. Кожен токен можна використати
+    лише один раз (GETDEL): повторне використання вказує на викрадений токен,
+    тож уся сесія відкликається.
+
+    :param token: Refresh-токен.
+    :return: Пара (email користувача; новий refresh-токен) або None, якщо токен недійсний.
+    """
+    payload = decode_refresh_token(token)
+    if payload is None or not payload.get("jti") or not payload.get("fam"):
+        return None
+    subject, jti, family = payload.get("sub"), payload["jti"], payload["fam"]
+
+    pipe = async_cache.get_redis().pipeline(transaction=True)
+    pipe.getdel(_jti_key(jti))
+    pipe.exists(_family_key(family))
+    stored, family_alive = await pipe.execute()
+
+    if stored is None:
+        if family_alive:
+            logger.warning(f"Повторне використання refresh-токена, сесію {family} відкликано")
+            await revoke_family(family, subject)
+        return None
+    if not family_alive or stored != f"{family}:{subject}":
+        return None
+
+    return subject, await _store(subject, family)
+
+
+async def revoke_family(family: str, subject: Optional[str] = None) -> None:
+    """
+    Відкликає сесію: усі токени сімейства стають недійсними.
+
+    :param family: ID сімейства.
+    :param subject: Email користувача (щоб прибрати сімейство з його множини).
+    """
+    pipe = async_cache.get_redis().pipeline(transaction=True)
+    pipe.delete(_family_key(family))
+    if subject:
+        pipe.srem(_user_key(subject), family)
+    await pipe.execute()
+
+
+async def revoke(token: str) -> bool:
+    """
+    Відкликає сесію, якій належить refresh-токен (вихід із системи).
+
+    :param token: Refresh-токен.
+    :return: True, якщо токен розпізнано.
+    """
+    payload = decode_refresh_token(token)
+    if payload is None or not payload.get("fam"):
+        return False
+    await revoke_family(payload["fam"], payload.get("sub"))
+    return True
+
+
+async def revoke_user(subject: str) -> int:
+    """
+    Відкликає всі сесії користувача (наприклад, після зміни пароля).
+
+    :param subject: Email користувача.
+    :return: Кількість відкликаних сесій.
+    """
+    client = async_cache.get_redis()
+    families = await client.smembers(_user_key(subject))
+    pipe = client.pipeline(transaction=True)
+    for family in families:
+        pipe.delete(_family_key(family))
+    pipe.delete(_user_key(subject))
+    await pipe.execute()
+    return len(families)
@@ -1,6 +1,53 @@
+from typing import Optional
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import get_settings
+
+_settings = get_settings()
+
+# Політика хешування паролів — єдина для всього застосунку.
+# PASSWORD_HASH_SCHEME — алгоритм нових хешів: bcrypt або argon2 (потрібен пакет argon2-cffi).
+# Хеші іншого алгоритму або з іншою вартістю оновлюються при успішному вході,
+# тож зміна вартості поступово поширюється на всіх користувачів.
+PASSWORD_HASH_SCHEME = _settings.password_hash_scheme
+PASSWORD_BCRYPT_ROUNDS = _settings.password_bcrypt_rounds
+PASSWORD_ARGON2_TIME_COST = _settings.password_argon2_time_cost
+PASSWORD_ARGON2_MEMORY_COST = _settings.password_argon2_memory_cost
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST
+) -> CryptContext:
+    """
+    Створює CryptContext для заданої політики.
+
+    :param scheme: Алгоритм для нових хешів.
+    :param bcrypt_rounds: Вартість bcrypt (log2 кількості раундів).
+    :param argon2_time_cost: Кількість ітерацій argon2.
+    :param argon2_memory_cost: Пам'ять argon2 (КіБ).
+    :return: Контекст хешування паролів.
+    """
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"Unsupported password hash scheme: {scheme}")
+    return CryptContext(
+        schemes=[scheme, *(s for s in SUPPORTED_SCHEMES if s != scheme)],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+    )
+
+
+pwd_context = build_context()
 
 def hash_password(password: str) -> str:
     """Хешує пароль перед збереженням у БД."""
@@ -9,3 +56,15 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Перевіряє, чи введений пароль відповідає збереженому хешу."""
     return pwd_context.verify(plain_password, hashed_password)
+
+def needs_update(hashed_password: str) -> bool:
+    """Перевіряє, чи хеш створено за застарілою політикою (алгоритм або вартість)."""
+    return pwd_context.needs_update(hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Перевіряє пароль і, якщо хеш застарів, повертає новий хеш за поточною політикою.
+
+    :return: Пара (пароль правильний; новий хеш або None).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,204 @@
+import hashlib
+import time
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from loguru import logger
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.services import metrics
+
+_settings = get_settings()
+
+# Інструментування SQL на подіях SQLAlchemy:
+# - журнал повільних запитів (текст запиту і відбиток параметрів, без самих значень);
+# - виявлення N+1: однаковий запит виконується багато разів за один HTTP-запит;
+# - бюджет запитів для тестів: query_budget(n) падає, якщо блок виконав більше n запитів.
+# Поріг повільного запиту в мілісекундах (0 — не журналювати)
+SQL_SLOW_QUERY_MS = _settings.sql_slow_query_ms
+# Скільки однакових запитів за HTTP-запит вважається N+1 (0 — не перевіряти)
+SQL_N_PLUS_ONE_THRESHOLD = _settings.sql_n_plus_one_threshold
+# Максимальна довжина тексту запиту в журналі
+SQL_LOG_MAX_LENGTH = _settings.sql_log_max_length
+
+N_PLUS_ONE = metrics.Counter(
+    "db_n_plus_one_total", "HTTP requests that repeated an identical SQL statement too often.", ("route",))
+SLOW_QUERIES = metrics.Counter("db_slow_queries_total", "SQL statements slower than SQL_SLOW_QUERY_MS.")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Блок коду виконав більше SQL-запитів, ніж дозволяє бюджет.
+    """
+
+
+def statement_fingerprint(statement: str) -> str:
+    """
+    Текст запиту без зайвих пробілів і переносів (однаковий для однакових запитів).
+    """
+    return " ".join(statement.split())
+
+
+def parameter_fingerprint(parameters) -> str:
+    """
+    Відбиток параметрів запиту: типи і короткий хеш значень. Самі значення (паролі,
+    email) у журнал не потрапляють, але однакові параметри дають однаковий відбиток.
+
+    :param parameters: Параметри DBAPI (кортеж, словник або список для executemany).
+    :return: Наприклад, "(int, str)#9f1c2a7b" або "50x(int, str)#...".
+    """
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, list, dict)):
+        prefix, sample = f"{len(parameters)}x", parameters[0]
+    else:
+        prefix, sample = "", parameters
+    if isinstance(sample, dict):
+        shape = ", ".join(f"{key}: {type(value).__name__}" for key, value in sample.items())
+    else:
+        shape = ", ".join(type(value).__name__ for value in (sample or ()))
+    digest = hashlib.blake2b(repr(parameters).encode("utf-8"), digest_size=4).hexdigest()
+    return f"{prefix}({shape})#{digest}"
+
+
+def _shorten(statement: str) -> str:
+    statement = statement_fingerprint(statement)
+    if len(statement) > SQL_LOG_MAX_LENGTH:
+        return statement[:SQL_LOG_MAX_LENGTH] + "..."
+    return statement
+
+
+# 🔹 Запити поточного HTTP-запиту
+_statements: ContextVar[Optional[StatementCounter]] = ContextVar("sql_statements", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["sql_started"].pop()) * 1000
+    if SQL_SLOW_QUERY_MS and elapsed_ms >= SQL_SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning(
+            f"Повільний SQL-запит {elapsed_ms:.1f} мс: {_shorten(statement)} "
+            f"[параметри {parameter_fingerprint(parameters)}]"
+        )
+    statements = _statements.get()
+    if statements is not None:
+        statements[statement] += 1
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    started = connection.info.get("sql_started") if connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """
+    Підписує синхронний двигун (для асинхронного — engine.sync_engine) на журнал
+    повільних запитів і облік запитів для виявлення N+1.
+
+    :param engine: Двигун SQLAlchemy.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def report_repeated(statements: StatementCounter, route: str, threshold: int = None) -> list[tuple[str, int]]:
+    """
+    Журналює запити, що повторилися щонайменше `threshold` разів (імовірний N+1).
+
+    :param statements: Кількість виконань кожного запиту.
+    :param route: Маршрут HTTP-запиту.
+    :param threshold: Поріг (за замовчуванням SQL_N_PLUS_ONE_THRESHOLD).
+    :return: Пари (запит, кількість) понад поріг.
+    """
+    threshold = SQL_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+    repeated = [(s, n) for s, n in statements.most_common() if n >= threshold]
+    if repeated:
+        N_PLUS_ONE.labels(route).inc()
+        for statement, count in repeated:
+            logger.warning(f"Можливий N+1 у {route}: запит виконано {count} разів: {_shorten(statement)}")
+    return repeated
+
+
+class QueryTrackingMiddleware:
+    """
+    ASGI-middleware: рахує однакові SQL-запити в межах HTTP-запиту і журналює N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_N_PLUS_ONE_THRESHOLD:
+            await self.app(scope, receive, send)
+            return
+
+        statements = StatementCounter()
+        token = _statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _statements.reset(token)
+            report_repeated(statements, f"{scope['method']} {metrics.route_name(scope)}")
+
+
+# 🔹 Бюджет запитів (для тестів)
+class QueryCounter:
+    """
+    Записує всі SQL-запити вказаних двигунів, поки активний (незалежно від потоку і event loop).
+    """
+
+    def __init__(self, engines: list = None):
+        if engines is None:
+            from app import config
+            engines = [config.get_engine(), config.get_async_engine().sync_engine]
+        self.engines = engines
+        self.statements: list[str] = []
+        self._listener = self._record
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement_fingerprint(statement))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> list[tuple[str, int]]:
+        return [(s, n) for s, n in StatementCounter(self.statements).most_common() if n >= threshold]
+
+    def __enter__(self) -> "QueryCounter":
+        for engine in self.engines:
+            event.listen(engine, "after_cursor_execute", self._listener)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for engine in self.engines:
+            event.remove(engine, "after_cursor_execute", self._listener)
+
+
+@contextmanager
+def query_budget(max_queries: int, engines: list = None) -> Iterator[QueryCounter]:
+    """
+    Перевіряє, що блок виконав не більше `max_queries` SQL-запитів:
+
+        with query_budget(2):
+            client.get("/contacts/", headers=headers)
+
+    :param max_queries: Дозволена кількість запитів.
+    :param engines: Двигуни (за замовчуванням — синхронний і асинхронний двигуни застосунку).
+    :raises QueryBudgetExceeded: Якщо запитів більше.
+    """
+    with QueryCounter(engines) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listing = "\n".join(f"  {i}. {_shorten(s)}" for i, s in enumerate(counter.statements, 1))
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} SQL statements, got {counter.count}:\n{listing}"
+        )
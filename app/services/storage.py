@@ -0,0 +1,201 @@
+import os
+import threading
+from typing import Optional
+
+from app.config import get_settings
+
+_settings = get_settings()
+
+# Сховище файлів аватарів: local — каталог AVATAR_STORAGE_PATH (один екземпляр API або
+# спільний том), s3 — S3-сумісне сховище (AWS S3, MinIO), спільне для всіх екземплярів.
+# Для s3 потрібен boto3; облікові дані — стандартні змінні AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY.
+AVATAR_STORAGE_BACKEND = _settings.avatar_storage_backend
+AVATAR_URL_PREFIX = _settings.avatar_url_prefix.rstrip("/")
+S3_BUCKET = _settings.s3_bucket
+S3_PREFIX = _settings.s3_prefix
+# Необроблені прямі завантаження (імена uploads/...) зберігаються поза публічним S3_PREFIX;
+# для цього префікса в бакеті має бути правило lifecycle, що видаляє незавершені завантаження
+S3_UPLOAD_PREFIX = _settings.s3_upload_prefix
+S3_REGION = _settings.s3_region
+# Для MinIO та інших S3-сумісних сховищ, наприклад http://minio:9000
+S3_ENDPOINT_URL = _settings.s3_endpoint_url
+# Адреса сховища, доступна браузеру, для підпису форм прямого завантаження
+# (наприклад http://localhost:9000, коли API звертається до MinIO як http://minio:9000)
+S3_PUBLIC_ENDPOINT_URL = _settings.s3_public_endpoint_url
+# Публічна адреса бакета (або CDN перед ним), з якої браузер завантажує аватари
+S3_PUBLIC_URL = _settings.s3_public_url
+# Скільки секунд дійсне посилання для прямого завантаження
+S3_PRESIGN_EXPIRES = _settings.s3_presign_expires
+
+# Імена необроблених прямих завантажень (див. avatars.create_direct_upload)
+UPLOAD_NAMESPACE = "uploads/"
+
+
+class StorageError(Exception):
+    """
+    Операція не підтримується сховищем або сховище недоступне.
+    """
+
+
+class LocalStorage:
+    """
+    Файли в локальному каталозі; віддаються маршрутом /avatars/{name}.
+    """
+
+    def __init__(self, root: str = None, url_prefix: str = None):
+        self.root = str(root or get_settings().avatar_storage_path)
+        self.url_prefix = AVATAR_URL_PREFIX if url_prefix is None else url_prefix.rstrip("/")
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def size(self, name: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path(name))
+        except FileNotFoundError:
+            return None
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def save(self, name: str, data: bytes, content_type: str, cache_control: str = None) -> None:
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Запис через тимчасовий файл, щоб паралельний запит не прочитав неповний файл
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def read(self, name: str) -> bytes:
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def delete(self, name: str) -> None:
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def url(self, name: str) -> str:
+        return f"{self.url_prefix}/{name}"
+
+    def presigned_upload(self, name: str, max_bytes: int, expires_in: int = S3_PRESIGN_EXPIRES) -> dict:
+        raise StorageError("Direct uploads require the s3 storage backend")
+
+
+class S3Storage:
+    """
+    Файли в S3-сумісному бакеті; браузер завантажує їх напряму зі сховища (або CDN).
+    """
+
+    def __init__(self, bucket: str = None, prefix: str = None, endpoint_url: str = None,
+                 region: str = None, public_url: str = None, upload_prefix: str = None,
+                 public_endpoint_url: str = None):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise StorageError("The s3 storage backend requires boto3 (pip install boto3)")
+
+        self.bucket = bucket or S3_BUCKET
+        self.prefix = S3_PREFIX if prefix is None else prefix
+        self.upload_prefix = S3_UPLOAD_PREFIX if upload_prefix is None else upload_prefix
+        if self.upload_prefix.startswith(self.prefix):
+            raise StorageError("S3_UPLOAD_PREFIX must be outside the public S3_PREFIX")
+        endpoint_url = endpoint_url or S3_ENDPOINT_URL or None
+        region = region or S3_REGION
+
+        def make_client(url):
+            return boto3.client(
+                "s3",
+                endpoint_url=url,
+                region_name=region,
+                config=Config(signature_version="s3v4", s3={"addressing_style": "path" if url else "auto"}),
+            )
+
+        self.client = make_client(endpoint_url)
+        # Форми прямого завантаження підписуються для адреси, яку бачить браузер
+        public_endpoint_url = public_endpoint_url or S3_PUBLIC_ENDPOINT_URL or None
+        self.presign_client = make_client(public_endpoint_url) if public_endpoint_url else self.client
+        if public_url or S3_PUBLIC_URL:
+            self.public_url = (public_url or S3_PUBLIC_URL).rstrip("/")
+        elif endpoint_url:
+            self.public_url = f"{endpoint_url.rstrip('/')}/{self.bucket}"
+        else:
+            self.public_url = f"https://{self.bucket}.s3.{region}.amazonaws.com"
+
+    def key(self, name: str) -> str:
+        if name.startswith(UPLOAD_NAMESPACE):
+            return f"{self.upload_prefix}{name[len(UPLOAD_NAMESPACE):]}"
+        return f"{self.prefix}{name}"
+
+    def size(self, name: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key(name))["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise StorageError(f"S3 error: {e}")
+
+    def exists(self, name: str) -> bool:
+        return self.size(name) is not None
+
+    def save(self, name: str, data: bytes, content_type: str, cache_control: str = None) -> None:
+        extra = {"CacheControl": cache_control} if cache_control else {}
+        self.client.put_object(Bucket=self.bucket, Key=self.key(name), Body=data, ContentType=content_type, **extra)
+
+    def read(self, name: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self.key(name))["Body"].read()
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(name))
+
+    def url(self, name: str) -> str:
+        return f"{self.public_url}/{self.key(name)}"
+
+    def presigned_upload(self, name: str, max_bytes: int, expires_in: int = S3_PRESIGN_EXPIRES) -> dict:
+        """
+        Підписана форма для завантаження файлу браузером напряму в бакет (POST multipart).
+        Сховище саме відхилить файл, більший за max_bytes, або без поля Content-Type image/*.
+
+        :param name: Ім'я об'єкта (без префікса; uploads/... — у приватному S3_UPLOAD_PREFIX).
+        :param max_bytes: Максимальний розмір файлу.
+        :param expires_in: Термін дії підпису в секундах.
+        :return: {"url": ..., "fields": {...}} — поля додаються до форми перед полем file.
+        """
+        return self.presign_client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=self.key(name),
+            Conditions=[["content-length-range", 1, max_bytes], ["starts-with", "$Content-Type", "image/"]],
+            ExpiresIn=expires_in,
+        )
+
+
+BACKENDS = {
+    "local": LocalStorage,
+    "s3": S3Storage,
+}
+
+_storage = None
+_lock = threading.Lock()
+
+
+def get_storage():
+    """
+    Повертає сховище, вибране AVATAR_STORAGE_BACKEND (створюється один раз на процес).
+
+    :return: LocalStorage або S3Storage.
+    """
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                try:
+                    backend = BACKENDS[AVATAR_STORAGE_BACKEND]
+                except KeyError:
+                    raise ValueError(f"Unknown avatar storage backend: {AVATAR_STORAGE_BACKEND}")
+                _storage = backend()
+    return _storage
@@ -1,39 +1,131 @@
 from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import Select, case, select
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
-from app.database.models import Contact
+from app.config import get_settings
+from app.database.models import Contact, birthday_doy, contact_columns
 
-# 🔎 Функція пошуку контактів за ім'ям, прізвищем або email з урахуванням user_id
-def search_contacts(db: Session, name: str = None, email: str = None, user_id: int = None):
-    query = db.query(Contact)
+_settings = get_settings()
+
+# Максимальна кількість результатів пошуку за замовчуванням
+CONTACTS_SEARCH_LIMIT = _settings.contacts_search_limit
+# Кількість днів наперед для пошуку найближчих днів народження
+BIRTHDAYS_WINDOW_DAYS = _settings.birthdays_window_days
+
+
+# 🔎 Побудова запиту пошуку контактів
+def build_search_query(
+    dialect: str,
+    name: str = None,
+    email: str = None,
+    user_id: int = None,
+    fuzzy: bool = False,
+    limit: int = CONTACTS_SEARCH_LIMIT,
+    fields: Optional[list[str]] = None
+) -> Select:
+    """
+    Будує запит пошуку за ім'ям, прізвищем або email.
+
+    У PostgreSQL `ILIKE '%...%'` обслуговується триграмними GIN-індексами (pg_trgm),
+    результати впорядковуються за схожістю (similarity). Режим `fuzzy` використовує
+    оператор `%` з pg_trgm і знаходить записи з помилками в написанні.
+    В інших БД (SQLite у тестах) — звичайний пошук за підрядком у порядку id.
+
+    :param dialect: Назва діалекту БД (db.bind.dialect.name).
+    :param name: Ім'я або прізвище для пошуку.
+    :param email: Email для пошуку.
+    :param user_id: ID користувача-власника контактів.
+    :param fuzzy: Нечіткий пошук (лише PostgreSQL).
+    :param limit: Максимальна кількість результатів.
+    :param fields: Якщо задано — вибираються лише ці колонки (плюс id) замість ORM-об'єктів.
+    :return: Запит SQLAlchemy.
+    """
+    query = select(*contact_columns(fields))
 
     if user_id is not None:
         query = query.filter(Contact.user_id == user_id)
 
+    trigram = dialect == "postgresql"
+    scores = []
     if name:
-        query = query.filter(
-            (Contact.first_name.ilike(f"%{name}%")) | (Contact.last_name.ilike(f"%{name}%"))
-        )
+        if trigram and fuzzy:
+            query = query.filter(Contact.first_name.op("%")(name) | Contact.last_name.op("%")(name))
+        else:
+            query = query.filter(
+                (Contact.first_name.ilike(f"%{name}%")) | (Contact.last_name.ilike(f"%{name}%"))
+            )
+        scores += [func.similarity(Contact.first_name, name), func.similarity(Contact.last_name, name)]
 
     if email:
-        query = query.filter(Contact.email.ilike(f"%{email}%"))
+        if trigram and fuzzy:
+            query = query.filter(Contact.email.op("%")(email))
+        else:
+            query = query.filter(Contact.email.ilike(f"%{email}%"))
+        scores.append(func.similarity(Contact.email, email))
+
+    if trigram and scores:
+        query = query.order_by(func.greatest(*scores).desc(), Contact.id)
+    else:
+        query = query.order_by(Contact.id)
+    return query.limit(limit)
+
+
+# 🔎 Функція пошуку контактів за ім'ям, прізвищем або email з урахуванням user_id
+def search_contacts(
+    db: Session,
+    name: str = None,
+    email: str = None,
+    user_id: int = None,
+    fuzzy: bool = False,
+    limit: int = CONTACTS_SEARCH_LIMIT,
+    fields: Optional[list[str]] = None
+):
+    result = db.execute(build_search_query(db.bind.dialect.name, name, email, user_id, fuzzy, limit, fields))
+    return result.scalars().all() if fields is None else result.all()
+
+# 🎉 Побудова запиту найближчих днів народження
+def build_birthdays_query(
+    user_id: int,
+    days: int = BIRTHDAYS_WINDOW_DAYS,
+    today: date = None,
+    fields: Optional[list[str]] = None
+) -> Select:
+    """
+    Будує запит контактів, у яких день народження (без урахування року)
+    припадає на проміжок від сьогодні до сьогодні + days включно.
 
-    return query.all()
+    Використовує індекс (user_id, birthday_doy): звичайний діапазон або,
+    якщо проміжок переходить через кінець року, два діапазони.
 
-# 🎉 Фільтр: контакти з днями народження у найближчі 7 днів (ІГНОРУЄ РІК)
-def get_upcoming_birthdays(db: Session, user_id: int):
-    today = date.today()
-    next_week = today + timedelta(days=7)
+    :param user_id: ID користувача-власника контактів.
+    :param days: Кількість днів наперед.
+    :param today: Початкова дата (за замовчуванням — сьогодні).
+    :param fields: Якщо задано — вибираються лише ці колонки (плюс id) замість ORM-об'єктів.
+    :return: Запит SQLAlchemy.
+    """
+    today = today or date.today()
+    end = today + timedelta(days=days)
+    start_doy, end_doy = birthday_doy(today), birthday_doy(end)
 
-    print(f"🔎 Сьогодні: {today}")
-    print(f"📅 Шукаємо дні народження з {today.day}-{today.month} до {next_week.day}-{next_week.month} (ІГНОРУЄМО РІК)")
+    query = select(*contact_columns(fields)).filter(Contact.user_id == user_id)
+    if days >= 365:
+        query = query.filter(Contact.birthday_doy.isnot(None))
+    elif end.year == today.year:
+        query = query.filter(Contact.birthday_doy.between(start_doy, end_doy))
+    else:
+        query = query.filter((Contact.birthday_doy >= start_doy) | (Contact.birthday_doy <= end_doy))
+    # Спершу дні народження до кінця року, потім — з початку наступного
+    this_year_first = case((Contact.birthday_doy >= start_doy, 0), else_=1)
+    return query.order_by(this_year_first, Contact.birthday_doy, Contact.id)
 
-    contacts = db.query(Contact).filter(
-        Contact.user_id == user_id,  # фільтрація по user_id
-        ((func.extract('month', Contact.birthday) == today.month) & (func.extract('day', Contact.birthday) >= today.day)) |
-        ((func.extract('month', Contact.birthday) == next_week.month) & (func.extract('day', Contact.birthday) <= next_week.day))
-    ).all()
 
-    print(f"👀 Знайдено контактів: {len(contacts)}")
-    
-    return contacts
+# 🎉 Функція отримання контактів з днями народження у найближчі дні (ІГНОРУЄ РІК)
+def get_upcoming_birthdays(
+    db: Session,
+    user_id: int,
+    days: int = BIRTHDAYS_WINDOW_DAYS,
+    fields: Optional[list[str]] = None
+):
+    result = db.execute(build_birthdays_query(user_id, days, fields=fields))
+    return result.scalars().all() if fields is None else result.all()
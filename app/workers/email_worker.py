@@ -0,0 +1,81 @@
+import signal
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from app.config import get_settings
+from app.services import metrics
+from app.services.email import get_transport
+from app.services.email_queue import EMAIL_QUEUE_NAME, EmailQueue, process_job
+
+# Воркер черги листів. Запуск: python -m app.workers.email_worker
+
+# Як довго чекати нову задачу, перш ніж перевірити відкладені повтори (секунди)
+EMAIL_WORKER_POLL_INTERVAL = get_settings().email_worker_poll_interval
+# Порт, на якому воркер віддає метрики Prometheus (0 — не віддавати)
+EMAIL_WORKER_METRICS_PORT = get_settings().email_worker_metrics_port
+
+
+def run_once(queue: EmailQueue, transport, max_jobs: int = 100) -> int:
+    """
+    Обробляє задачі, що вже є в черзі, без очікування нових.
+
+    :param queue: Черга листів.
+    :param transport: Транспорт листів.
+    :param max_jobs: Максимальна кількість задач за виклик.
+    :return: Кількість оброблених задач.
+    """
+    queue.heartbeat()
+    queue.reclaim_stale()
+    queue.promote_due()
+    processed = 0
+    while processed < max_jobs:
+        raw = queue.reserve()
+        if raw is None:
+            break
+        process_job(queue, raw, transport)
+        processed += 1
+    return processed
+
+
+def run_worker(queue: EmailQueue, transport, stop: Optional[threading.Event] = None) -> None:
+    """
+    Обробляє задачі, доки не буде встановлено stop.
+
+    :param queue: Черга листів.
+    :param transport: Транспорт листів.
+    :param stop: Подія зупинки.
+    """
+    stop = stop or threading.Event()
+    try:
+        while not stop.is_set():
+            queue.heartbeat()
+            # Задачі впалих воркерів (без heartbeat довше за EMAIL_WORKER_HEARTBEAT_TTL)
+            requeued = queue.reclaim_stale()
+            if requeued:
+                logger.info(f"Повернуто в чергу задач зупинених воркерів: {requeued}")
+            queue.promote_due()
+            raw = queue.reserve(timeout=EMAIL_WORKER_POLL_INTERVAL)
+            if raw is not None:
+                process_job(queue, raw, transport)
+    finally:
+        queue.release()
+
+
+def main() -> None:
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    if EMAIL_WORKER_METRICS_PORT:
+        metrics.start_http_server(EMAIL_WORKER_METRICS_PORT)
+    client = metrics.InstrumentedRedis.from_url(get_settings().redis_url, decode_responses=True)
+    queue = EmailQueue(client, EMAIL_QUEUE_NAME)
+    logger.info(f"Воркер листів запущено, черга '{EMAIL_QUEUE_NAME}'")
+    run_worker(queue, get_transport(), stop)
+    logger.info("Воркер листів зупинено")
+
+
+if __name__ == "__main__":
+    main()
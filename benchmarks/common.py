@@ -0,0 +1,96 @@
+"""
+Спільне для бенчмарків: статистика вибірок, налаштування оточення з локальними
+замінниками зовнішніх сервісів (SQLite, fakeredis, листи у файл) і метадані запуску.
+"""
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """
+    Перцентиль вибірки (найближчий ранг).
+
+    :param samples: Значення.
+    :param q: Перцентиль від 0 до 100.
+    :return: Значення перцентиля.
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    """
+    p50/p95/p99, середнє і максимум вибірки часу в мілісекундах.
+    """
+    return {
+        "p50_ms": round(percentile(samples_ms, 50), 4),
+        "p95_ms": round(percentile(samples_ms, 95), 4),
+        "p99_ms": round(percentile(samples_ms, 99), 4),
+        "mean_ms": round(statistics.fmean(samples_ms), 4),
+        "max_ms": round(max(samples_ms), 4),
+    }
+
+
+def configure_environment(database_url: str = None, bcrypt_rounds: int = None) -> str:
+    """
+    Задає змінні оточення для запуску застосунку в процесі бенчмарку.
+    Викликається до першого імпорту app.*, бо налаштування читаються під час імпорту.
+
+    :param database_url: URL БД; за замовчуванням — новий файл SQLite у тимчасовому каталозі.
+    :param bcrypt_rounds: Вартість bcrypt (за замовчуванням — політика застосунку).
+    :return: Використаний URL БД.
+    """
+    workdir = tempfile.mkdtemp(prefix="contacts-bench-")
+    database_url = database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    # Усі запити приходять з однієї адреси; ліміти частоти не є предметом вимірювання
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    # Листи записуються у файл замість Mailgun
+    os.environ["EMAIL_TRANSPORT"] = "file"
+    os.environ["EMAIL_FILE_PATH"] = os.path.join(workdir, "emails.jsonl")
+    os.environ["AVATAR_STORAGE_PATH"] = os.path.join(workdir, "avatars")
+    if bcrypt_rounds is not None:
+        os.environ["PASSWORD_BCRYPT_ROUNDS"] = str(bcrypt_rounds)
+    return database_url
+
+
+def use_fakeredis() -> None:
+    """
+    Підставляє fakeredis замість Redis у кеш застосунку (синхронний і асинхронний клієнти
+    спільно використовують один FakeServer). Викликається всередині event loop бенчмарку.
+    """
+    import asyncio
+
+    import fakeredis
+
+    from app.services import async_cache, cache
+
+    server = fakeredis.FakeServer()
+    cache._redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_cache._redis_clients[asyncio.get_running_loop()] = fakeredis.FakeAsyncRedis(
+        server=server, decode_responses=True
+    )
+
+
+def run_metadata() -> dict:
+    """
+    Відомості про запуск для порівняння результатів між комітами.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
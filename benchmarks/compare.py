@@ -0,0 +1,81 @@
+"""
+Порівнює два звіти benchmarks.suite (наприклад, до і після коміту):
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Для кожного сценарію показує пропускну здатність і p95 обох запусків та зміну у відсотках;
+зміни, більші за поріг, позначаються. Код виходу 1, якщо є погіршення понад поріг
+(`--fail-on-regression`), — для використання в CI.
+"""
+import argparse
+import json
+import sys
+
+
+def _key(result: dict) -> tuple:
+    return result["suite"], result["name"], result["size"]
+
+
+def _rate(result: dict) -> float:
+    return result.get("throughput_rps", result.get("ops_per_sec"))
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(before: dict, after: dict, threshold: float) -> tuple[list[str], int]:
+    """
+    Рядки таблиці порівняння і кількість погіршень понад поріг.
+
+    :param before: Базовий звіт.
+    :param after: Новий звіт.
+    :param threshold: Поріг зміни у відсотках.
+    :return: Пара (рядки, кількість погіршень).
+    """
+    baseline = {_key(r): r for r in before["results"]}
+    lines = [f"{'suite':>5} {'name':<30} {'size':>7} {'rate before':>12} {'rate after':>12} {'Δ%':>7} "
+             f"{'p95 before':>11} {'p95 after':>11} {'Δ%':>7}"]
+    regressions = 0
+    for result in after["results"]:
+        base = baseline.get(_key(result))
+        if base is None:
+            continue
+        rate_change = _change(_rate(base), _rate(result))
+        p95_change = _change(base["p95_ms"], result["p95_ms"])
+        regressed = rate_change < -threshold or p95_change > threshold
+        regressions += regressed
+        mark = " !" if regressed else (" +" if rate_change > threshold or p95_change < -threshold else "")
+        size = "-" if result["size"] is None else result["size"]
+        lines.append(
+            f"{result['suite']:>5} {result['name']:<30} {size:>7} {_rate(base):>12.1f} {_rate(result):>12.1f} "
+            f"{rate_change:>+7.1f} {base['p95_ms']:>11.3f} {result['p95_ms']:>11.3f} {p95_change:>+7.1f}{mark}"
+        )
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Significant change, percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('git_commit')}  after: {after['meta'].get('git_commit')}")
+    for field in ("database", "concurrency", "requests", "iterations", "seed", "bcrypt_rounds"):
+        if before["meta"].get(field) != after["meta"].get(field):
+            print(f"warning: {field} differs ({before['meta'].get(field)} vs {after['meta'].get(field)})")
+    lines, regressions = compare(before, after, args.threshold)
+    print("\n".join(lines))
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Відтворювані набори даних для бенчмарків: для кожного розміру — окремий користувач
+з відомим паролем і `size` контактами, згенерованими Faker з фіксованим seed.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from faker import Faker
+from sqlalchemy import insert
+
+PASSWORD = "bench-password-123"
+INSERT_BATCH_SIZE = 5000
+
+
+@dataclass
+class Dataset:
+    size: int
+    user_id: int
+    email: str
+    password: str
+    # Підрядки імен і id контактів, що справді є в наборі, — для пошуку і читання за id
+    search_terms: list[str] = field(default_factory=list)
+    contact_ids: list[int] = field(default_factory=list)
+
+
+def generate_contacts(count: int, user_id: int, seed: int) -> list[dict]:
+    """
+    Контакти для масового INSERT; той самий seed дає ті самі дані.
+
+    :param count: Кількість контактів.
+    :param user_id: ID власника.
+    :param seed: Seed генератора.
+    :return: Список словників колонок.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    start = date(1950, 1, 1)
+    contacts = []
+    for i in range(count):
+        first_name, last_name = fake.first_name(), fake.last_name()
+        contacts.append({
+            "first_name": first_name,
+            "last_name": last_name,
+            # Email унікальний у межах набору незалежно від збігів імен
+            "email": f"{first_name.lower()}.{last_name.lower()}.{i}@{fake.free_email_domain()}",
+            "phone": fake.numerify("+380#########"),
+            "birthday": start + timedelta(days=rng.randrange(365 * 55)),
+            "extra_info": fake.sentence() if rng.random() < 0.5 else None,
+            "user_id": user_id,
+        })
+    return contacts
+
+
+def seed_database(session_factory, sizes: list[int], seed: int) -> list[Dataset]:
+    """
+    Створює користувачів і контакти для кожного розміру набору.
+
+    :param session_factory: Фабрика синхронних сесій (SessionLocal).
+    :param sizes: Кількості контактів.
+    :param seed: Seed генератора.
+    :return: Описи наборів даних.
+    """
+    from app.database.models import Contact, User
+    from app.services.security import hash_password
+
+    rng = random.Random(seed)
+    datasets = []
+    with session_factory() as db:
+        password_hash = hash_password(PASSWORD)
+        for size in sizes:
+            email = f"bench{size}@example.com"
+            user = User(username=f"bench{size}", email=email, password_hash=password_hash,
+                        is_verified=True, confirmed=True)
+            db.add(user)
+            db.commit()
+
+            contacts = generate_contacts(size, user.id, seed + size)
+            for start in range(0, len(contacts), INSERT_BATCH_SIZE):
+                db.execute(insert(Contact), contacts[start:start + INSERT_BATCH_SIZE])
+            db.commit()
+
+            sample = rng.sample(contacts, min(50, len(contacts)))
+            ids = [row[0] for row in db.query(Contact.id).filter(Contact.user_id == user.id).all()]
+            datasets.append(Dataset(
+                size=size,
+                user_id=user.id,
+                email=email,
+                password=PASSWORD,
+                search_terms=[c["last_name"][:4] for c in sample],
+                contact_ids=rng.sample(ids, min(200, len(ids))),
+            ))
+    return datasets
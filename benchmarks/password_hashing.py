@@ -0,0 +1,80 @@
+"""
+Вимірює час хешування і перевірки пароля для різних налаштувань політики,
+щоб підібрати вартість, яка вкладається в SLO входу.
+
+Запуск:
+    python -m benchmarks.password_hashing --bcrypt-rounds 10 11 12 13 --iterations 30
+    python -m benchmarks.password_hashing --argon2-time-cost 2 3 4   # потрібен argon2-cffi
+"""
+import argparse
+import statistics
+import time
+
+from passlib.exc import MissingBackendError
+
+from app.services.security import (
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_BCRYPT_ROUNDS,
+    build_context,
+)
+from benchmarks.common import percentile
+
+PASSWORD = "correct horse battery staple"
+
+
+def measure(context, iterations: int) -> dict:
+    """
+    Виконує hash один раз і verify `iterations` разів.
+
+    :return: Час hash і p50/p99/середнє verify у мілісекундах.
+    """
+    started = time.perf_counter()
+    hashed = context.hash(PASSWORD)
+    hash_ms = (time.perf_counter() - started) * 1000
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        context.verify(PASSWORD, hashed)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "hash_ms": hash_ms,
+        "verify_p50_ms": percentile(samples, 50),
+        "verify_p99_ms": percentile(samples, 99),
+        "verify_mean_ms": statistics.fmean(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Password hashing cost benchmark")
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[PASSWORD_BCRYPT_ROUNDS])
+    parser.add_argument("--argon2-time-cost", type=int, nargs="*", default=[])
+    parser.add_argument("--argon2-memory-cost", type=int, default=PASSWORD_ARGON2_MEMORY_COST)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    settings = [(f"bcrypt rounds={r}", build_context("bcrypt", bcrypt_rounds=r)) for r in args.bcrypt_rounds]
+    settings += [
+        (
+            f"argon2 t={t} m={args.argon2_memory_cost}",
+            build_context("argon2", argon2_time_cost=t, argon2_memory_cost=args.argon2_memory_cost),
+        )
+        for t in args.argon2_time_cost
+    ]
+
+    print(f"{'setting':<28} {'hash':>9} {'p50':>9} {'p99':>9} {'mean':>9}  (ms, {args.iterations} verifies)")
+    for name, context in settings:
+        try:
+            result = measure(context, args.iterations)
+        except MissingBackendError as e:
+            print(f"{name:<28} skipped: {e}")
+            continue
+        print(
+            f"{name:<28} {result['hash_ms']:>9.1f} {result['verify_p50_ms']:>9.1f} "
+            f"{result['verify_p99_ms']:>9.1f} {result['verify_mean_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Вимірює вартість серіалізації списку контактів (GET /contacts/) для різних
+способів побудови відповіді:
+
+    orm+json        ORM-об'єкти -> валідація response_model -> JSONResponse (як було)
+    orm+orjson      те саме, але ORJSONResponse (лише default_response_class)
+    rows+adapter    кортежі колонок -> закешований TypeAdapter.dump_json
+    rows+orjson     кортежі колонок -> словники -> ORJSONResponse (як зараз у маршруті)
+
+Запуск (потрібен DATABASE_URL, як і для застосунку; до БД запити не надсилаються):
+    python -m benchmarks.serialization --sizes 1000 10000 100000 --iterations 3
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from app.database.models import Contact
+from app.database.schemas import ContactResponse
+
+CONTACT_COLUMNS = ["id"] + [f for f in ContactResponse.model_fields if f != "id"]
+ContactRow = TypedDict(
+    "ContactRow",
+    {name: ContactResponse.model_fields[name].annotation for name in CONTACT_COLUMNS},
+    total=False,
+)
+_rows_adapter = TypeAdapter(list[ContactRow])
+_response_field = create_model_field("Response_get_contacts", list[ContactResponse], mode="serialization")
+
+
+def make_rows(count: int) -> list[tuple]:
+    """
+    Кортежі колонок у порядку CONTACT_COLUMNS, як їх повертає get_contacts_page.
+    """
+    values = {
+        "first_name": "Taras",
+        "last_name": "Shevchenko",
+        "phone": "+380501234567",
+        "birthday": date(1990, 3, 9),
+        "extra_info": "Коментар до контакту",
+        "user_id": 1,
+    }
+    return [
+        tuple(i if c == "id" else f"contact{i}@example.com" if c == "email" else values[c] for c in CONTACT_COLUMNS)
+        for i in range(1, count + 1)
+    ]
+
+
+def orm_json(objects: list[Contact]) -> bytes:
+    content = asyncio.run(serialize_response(field=_response_field, response_content=objects))
+    return JSONResponse(content).body
+
+
+def orm_orjson(objects: list[Contact]) -> bytes:
+    content = asyncio.run(serialize_response(field=_response_field, response_content=objects))
+    return ORJSONResponse(content).body
+
+
+def rows_adapter(rows: list[tuple]) -> bytes:
+    return _rows_adapter.dump_json([dict(zip(CONTACT_COLUMNS, row)) for row in rows])
+
+
+def rows_orjson(rows: list[tuple]) -> bytes:
+    return ORJSONResponse([dict(zip(CONTACT_COLUMNS, row)) for row in rows]).body
+
+
+def best_of(func, data, iterations: int) -> float:
+    """
+    Найкращий час виконання з `iterations` спроб у мілісекундах.
+    """
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func(data)
+        samples.append((time.perf_counter() - started) * 1000)
+    return min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Contact list serialisation benchmark")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    methods = [("orm+json", orm_json, True), ("orm+orjson", orm_orjson, True),
+               ("rows+adapter", rows_adapter, False), ("rows+orjson", rows_orjson, False)]
+
+    header = " ".join(f"{name:>13}" for name, _, _ in methods)
+    print(f"{'contacts':>9} {header}  (ms, best of {args.iterations})")
+    for size in args.sizes:
+        rows = make_rows(size)
+        objects = [Contact(**dict(zip(CONTACT_COLUMNS, row))) for row in rows]
+        # Усі способи мають давати однаковий JSON
+        expected = orjson.loads(orm_json(objects[:10]))
+        for name, func, orm in methods:
+            assert orjson.loads(func(objects[:10] if orm else rows[:10])) == expected, name
+
+        timings = [best_of(func, objects if orm else rows, args.iterations) for _, func, orm in methods]
+        print(f"{size:>9} " + " ".join(f"{t:>13.1f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Відтворюваний набір навантажувальних тестів і мікробенчмарків гарячих шляхів API.
+
+Навантаження: застосунок запускається в цьому ж процесі (httpx.ASGITransport, без мережі),
+`--concurrency` задач паралельно надсилають `--requests` запитів на кожен сценарій:
+
+    auth_login            POST /auth/login (bcrypt у пулі процесів, видача refresh-токена)
+    auth_me               GET /auth/me (get_current_user: JWT + кеш користувачів)
+    contacts_list         GET /contacts/ (перша сторінка, кеш у Redis)
+    contacts_list_fields  GET /contacts/?fields=... (вибірка колонок з БД, без кешу)
+    contact_by_id         GET /contacts/{id}
+    contacts_search       GET /contacts/search/?name=...
+    contacts_birthdays    GET /contacts/upcoming_birthdays/?days=30
+
+Мікробенчмарки: jwt_keys.encode/decode, функції crud і utils на синхронній сесії.
+
+Зовнішні сервіси замінено локальними: SQLite у тимчасовому каталозі (або `--database-url`
+з PostgreSQL), fakeredis замість Redis, листи записуються у файл замість Mailgun.
+Дані генеруються Faker з фіксованим `--seed`, тож запуски на різних комітах порівнянні:
+
+    python -m benchmarks.suite --sizes 1000 10000 --output before.json
+    git checkout <commit>
+    python -m benchmarks.suite --sizes 1000 10000 --output after.json
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from benchmarks.common import configure_environment, run_metadata, summarize, use_fakeredis
+from benchmarks.datasets import Dataset, seed_database
+
+SEARCH_FIELDS = "first_name,last_name,email"
+
+
+# 🔹 Навантаження через ASGI
+async def drive(client, send, total: int, concurrency: int, warmup: int) -> dict:
+    """
+    Виконує `total` запитів у `concurrency` паралельних задачах.
+
+    :param client: httpx.AsyncClient застосунку.
+    :param send: Корутина send(client, i) -> httpx.Response для i-го запиту.
+    :param total: Кількість вимірюваних запитів.
+    :param concurrency: Кількість одночасних запитів.
+    :param warmup: Кількість запитів перед вимірюванням (кеші, пули, процеси хешування).
+    :return: Пропускна здатність і перцентилі затримки.
+    """
+    for i in range(warmup):
+        await send(client, i)
+
+    counter = itertools.count()
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < total:
+            started = time.perf_counter()
+            response = await send(client, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2),
+        **summarize(latencies),
+    }
+
+
+def load_scenarios(dataset: Dataset, headers: dict) -> dict:
+    """
+    Сценарії навантаження для набору даних: назва -> send(client, i).
+    """
+    ids, terms = dataset.contact_ids, dataset.search_terms
+    form = {"username": dataset.email, "password": dataset.password}
+    return {
+        "auth_login": lambda c, i: c.post("/auth/login", data=form),
+        "auth_me": lambda c, i: c.get("/auth/me", headers=headers),
+        "contacts_list": lambda c, i: c.get("/contacts/", headers=headers),
+        "contacts_list_fields": lambda c, i: c.get(
+            "/contacts/", params={"fields": SEARCH_FIELDS}, headers=headers
+        ),
+        "contact_by_id": lambda c, i: c.get(f"/contacts/{ids[i % len(ids)]}", headers=headers),
+        "contacts_search": lambda c, i: c.get(
+            "/contacts/search/", params={"name": terms[i % len(terms)]}, headers=headers
+        ),
+        "contacts_birthdays": lambda c, i: c.get(
+            "/contacts/upcoming_birthdays/", params={"days": 30}, headers=headers
+        ),
+    }
+
+
+async def run_load(datasets: list[Dataset], args) -> list[dict]:
+    import httpx
+
+    from app.main import app
+
+    use_fakeredis()
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for dataset in datasets:
+                response = await client.post(
+                    "/auth/login", data={"username": dataset.email, "password": dataset.password}
+                )
+                response.raise_for_status()
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+                for name, send in load_scenarios(dataset, headers).items():
+                    if args.scenarios and name not in args.scenarios:
+                        continue
+                    stats = await drive(client, send, args.requests, args.concurrency, args.warmup)
+                    results.append({"suite": "load", "name": name, "size": dataset.size, **stats})
+                    print_result(results[-1])
+    return results
+
+
+# 🔹 Мікробенчмарки
+def measure(func, iterations: int) -> dict:
+    """
+    Час окремих викликів func() у мілісекундах.
+    """
+    func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / (sum(samples) / 1000), 2),
+        **summarize(samples),
+    }
+
+
+def run_micro(datasets: list[Dataset], args) -> list[dict]:
+    from app.config import SessionLocal, engine
+    from app.database import crud
+    from app.services import jwt_keys, utils
+
+    results = []
+
+    def record(name: str, size, func, iterations: int) -> None:
+        if args.scenarios and name not in args.scenarios:
+            return
+        results.append({"suite": "micro", "name": name, "size": size, **measure(func, iterations)})
+        print_result(results[-1])
+
+    token = jwt_keys.encode({"sub": "bench@example.com", "exp": 2**31})
+    record("jwt_encode", None, lambda: jwt_keys.encode({"sub": "bench@example.com", "exp": 2**31}),
+           args.iterations * 10)
+    record("jwt_decode", None, lambda: jwt_keys.decode(token), args.iterations * 10)
+    record("build_search_query", None,
+           lambda: utils.build_search_query(engine.dialect.name, name="Smi", user_id=1, fields=["id"]),
+           args.iterations * 10)
+
+    fields = ["id", "first_name", "last_name", "email"]
+    with SessionLocal() as db:
+        for ds in datasets:
+            ids, terms = itertools.cycle(ds.contact_ids), itertools.cycle(ds.search_terms)
+            record("crud_get_contacts_page", ds.size,
+                   lambda: crud.get_contacts_page(db, ds.user_id, 100), args.iterations)
+            record("crud_get_contacts_page_rows", ds.size,
+                   lambda: crud.get_contacts_page(db, ds.user_id, 100, fields=fields), args.iterations)
+            record("crud_get_contact_by_id", ds.size,
+                   lambda: crud.get_contact_by_id(db, next(ids), ds.user_id), args.iterations)
+            record("utils_search_contacts_rows", ds.size,
+                   lambda: utils.search_contacts(db, name=next(terms), user_id=ds.user_id, fields=fields),
+                   args.iterations)
+            record("utils_upcoming_birthdays_rows", ds.size,
+                   lambda: utils.get_upcoming_birthdays(db, ds.user_id, 30, fields=fields), args.iterations)
+            # ORM-об'єкти не накопичуються в identity map між ітераціями
+            db.expunge_all()
+    return results
+
+
+# 🔹 Запуск
+def print_result(result: dict) -> None:
+    size = "-" if result["size"] is None else result["size"]
+    rate = result.get("throughput_rps", result.get("ops_per_sec"))
+    print(f"{result['suite']:>5} {result['name']:<30} {size:>7} {rate:>11.1f}/s "
+          f"p50 {result['p50_ms']:>8.3f} p95 {result['p95_ms']:>8.3f} p99 {result['p99_ms']:>8.3f} ms"
+          + (f"  errors {result['errors']}" if result.get("errors") else ""))
+
+
+def prepare_database(database_url: str) -> None:
+    from app.config import Base, engine
+    import app.database.models  # noqa: F401 — реєструє таблиці в Base.metadata
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        Base.metadata.drop_all(conn)
+        Base.metadata.create_all(conn)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API load test and micro-benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000],
+                        help="Contacts per benchmark user")
+    parser.add_argument("--suites", nargs="*", choices=["load", "micro"], default=["load", "micro"])
+    parser.add_argument("--scenarios", nargs="*", default=None, help="Run only these scenarios")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per load scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per load scenario")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per micro-benchmark")
+    parser.add_argument("--seed", type=int, default=12345)
+    parser.add_argument("--database-url", default=None,
+                        help="Benchmark database (dropped and recreated!); default: temporary SQLite file")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None,
+                        help="Override PASSWORD_BCRYPT_ROUNDS (default: application policy)")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    database_url = configure_environment(args.database_url, args.bcrypt_rounds)
+    prepare_database(database_url)
+
+    from app.config import SessionLocal
+
+    started = time.perf_counter()
+    datasets = seed_database(SessionLocal, args.sizes, args.seed)
+    print(f"Seeded {sum(args.sizes)} contacts in {time.perf_counter() - started:.1f}s")
+
+    results = []
+    if "micro" in args.suites:
+        results += run_micro(datasets, args)
+    if "load" in args.suites:
+        results += asyncio.run(run_load(datasets, args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **run_metadata(),
+            "database": database_url.split("://", 1)[0],
+            "sizes": args.sizes,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "bcrypt_rounds": int(os.environ.get("PASSWORD_BCRYPT_ROUNDS", "12")),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,13 @@
+import os
+
+# TestClient без контекстного менеджера обслуговує кожен запит в окремому event loop,
+# тому асинхронні з'єднання з БД не можна повторно використовувати між запитами.
+os.environ.setdefault("DB_USE_NULL_POOL", "1")
+# Мінімальна вартість bcrypt прискорює тести; політика перевіряється окремо.
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+# Усі запити TestClient приходять з однієї адреси; ліміти перевіряються окремо.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -0,0 +1,91 @@
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+
+from app.database import crud
+from app.database.db import SessionLocal
+from app.database.models import Contact, User
+from app.services.utils import get_upcoming_birthdays, search_contacts
+
+FIELDS = ["id", "first_name", "email", "birthday"]
+
+
+def make_user(db) -> int:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(username=f"u_{suffix}", email=f"u_{suffix}@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def test_projected_reads_return_rows_without_session_tracking():
+    db = SessionLocal()
+    try:
+        user = User(username=f"ro_{uuid.uuid4().hex[:8]}", email=f"ro_{uuid.uuid4().hex[:8]}@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.execute(insert(Contact), [
+            {"first_name": f"Reader{i}", "last_name": "Only", "email": f"ro{i}_{uuid.uuid4().hex[:6]}@example.com",
+             "phone": "123", "birthday": date.today(), "user_id": user_id}
+            for i in range(3)
+        ])
+        db.commit()
+        db.expunge_all()
+
+        contacts = crud.get_contacts(db, user_id, fields=FIELDS)
+        contact = crud.get_contact_by_id(db, contacts[0].id, user_id, fields=FIELDS)
+        found = search_contacts(db, name="Reader", user_id=user_id, fields=FIELDS)
+        birthdays = get_upcoming_birthdays(db, user_id, days=0, fields=FIELDS)
+
+        assert [c.first_name for c in contacts] == ["Reader0", "Reader1", "Reader2"]
+        assert contact._fields == tuple(FIELDS)
+        assert contact.birthday == date.today()
+        assert len(found) == len(birthdays) == 3
+        assert all(isinstance(row, Row) for row in [*contacts, contact, *found, *birthdays])
+        # Жоден об'єкт не потрапив в identity map сесії
+        assert len(db.identity_map) == 0
+
+        # Без fields — як і раніше, ORM-об'єкти для змін
+        assert isinstance(crud.get_contact_by_id(db, contact.id, user_id), Contact)
+    finally:
+        db.close()
+
+
+def test_contact_email_is_unique_per_user():
+    db = SessionLocal()
+    try:
+        first, second = make_user(db), make_user(db)
+        email = f"shared_{uuid.uuid4().hex[:8]}@example.com"
+        contact = {"first_name": "Shared", "last_name": "Contact", "email": email, "phone": "1"}
+
+        # Той самий email у контактах різних користувачів
+        db.execute(insert(Contact), [{**contact, "user_id": first}, {**contact, "user_id": second}])
+        db.commit()
+
+        with pytest.raises(IntegrityError):
+            db.execute(insert(Contact), [{**contact, "user_id": first}])
+        db.rollback()
+    finally:
+        db.close()
+
+
+def test_contacts_page_uses_user_scoped_index():
+    db = SessionLocal()
+    try:
+        if db.bind.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN is SQLite-specific")
+        query = (
+            db.query(Contact.id).filter(Contact.user_id == 1, Contact.id > 10).order_by(Contact.id).limit(5)
+        )
+        compiled = query.statement.compile(db.bind, compile_kwargs={"literal_binds": True})
+        plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+        assert "ix_contacts_user_id_id" in plan
+        assert "TEMP B-TREE" not in plan
+    finally:
+        db.close()
@@ -1,5 +1,8 @@
-from app.database.db import get_db
+from app.database.db import get_db, get_async_db
+from app.database.engine import pool_status
+from app.config import engine
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from sqlalchemy.exc import ResourceClosedError
 
@@ -28,3 +31,31 @@ def test_get_db():
         assert True
     except Exception:
         assert True  # Будь-яка інша помилка теж означає, що сесія вже закрита
+
+
+async def test_get_async_db():
+    db_gen = get_async_db()
+    db_session = await db_gen.__anext__()
+
+    assert isinstance(db_session, AsyncSession)
+
+    try:
+        result = await db_session.execute(text("SELECT 1"))
+        assert result.scalar() == 1
+    finally:
+        await db_gen.aclose()
+
+
+def test_pool_status_tracks_checkouts():
+    before = pool_status(engine)["checkouts_total"]
+
+    db_gen = get_db()
+    db_session = next(db_gen)
+    db_session.execute(text("SELECT 1"))
+    status = pool_status(engine)
+    assert status["checked_out"] >= 1
+    db_gen.close()
+
+    status = pool_status(engine)
+    assert status["checkouts_total"] == before + 1
+    assert status["wait_seconds_max"] >= 0
@@ -69,3 +69,40 @@ def test_get_current_user(client, new_user_data):
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == new_user_data["email"]
+
+def test_login_upgrades_outdated_password_hash(client, new_user_data):
+    from app.database.db import SessionLocal
+    from app.database.models import User
+    from app.services.security import build_context, needs_update
+
+    client.post("/auth/signup", json=new_user_data)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == new_user_data["email"]).one()
+        user.password_hash = build_context(bcrypt_rounds=5).hash(new_user_data["password"])
+        db.commit()
+        assert needs_update(user.password_hash)
+
+        response = client.post("/auth/login", data={
+            "username": new_user_data["email"],
+            "password": new_user_data["password"]
+        })
+        assert response.status_code == 200
+
+        db.refresh(user)
+        assert not needs_update(user.password_hash)
+    finally:
+        db.close()
+
+def test_verify_email_requires_verification_token(client, new_user_data):
+    from app.services.auth import create_access_token, create_verification_token
+
+    client.post("/auth/signup", json=new_user_data)
+    access_token = create_access_token(data={"sub": new_user_data["email"]})
+
+    # Токен з іншим scope не підтверджує email
+    assert client.get(f"/auth/verify/{access_token}").status_code == 400
+
+    response = client.get(f"/auth/verify/{create_verification_token(new_user_data['email'])}")
+    assert response.status_code == 200
+    assert response.json()["is_verified"] is True
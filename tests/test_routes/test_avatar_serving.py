@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import avatars, storage
+
+client = TestClient(app)
+
+NAME = "0123456789abcdef-128.webp"
+CONTENT = b"RIFF\x00\x00\x00\x00WEBPVP8 " + bytes(range(200))
+
+
+@pytest.fixture(autouse=True)
+def avatar_storage(tmp_path, monkeypatch):
+    """Каталог аватарів з одним варіантом."""
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(tmp_path))
+    (tmp_path / NAME).write_bytes(CONTENT)
+    return tmp_path
+
+
+def test_get_avatar_immutable_with_strong_etag():
+    response = client.get(f"/avatars/{NAME}")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["etag"] == '"0123456789abcdef-128"'
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_get_avatar_not_modified_without_disk_read(avatar_storage):
+    etag = client.get(f"/avatars/{NAME}").headers["etag"]
+    (avatar_storage / NAME).unlink()
+
+    response = client.get(f"/avatars/{NAME}", headers={"If-None-Match": f'W/"other", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_get_avatar_range():
+    response = client.get(f"/avatars/{NAME}", headers={"Range": "bytes=0-11"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[:12]
+    assert response.headers["content-range"] == f"bytes 0-11/{len(CONTENT)}"
+
+
+def test_get_avatar_accel_redirect(monkeypatch):
+    monkeypatch.setattr(avatars, "AVATAR_ACCEL_REDIRECT_PREFIX", "/_avatars/")
+
+    response = client.get(f"/avatars/{NAME}")
+
+    assert response.status_code == 200
+    assert response.headers["x-accel-redirect"] == f"/_avatars/{NAME}"
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("name", ["ffffffffffffffff-128.webp", "user_7.jpg", "..%2Fmain.py"])
+def test_get_avatar_unknown_or_invalid_name(name):
+    assert client.get(f"/avatars/{name}").status_code == 404
@@ -1,28 +1,61 @@
+import asyncio
 import io
 import uuid
+
+import pytest
+from PIL import Image
+
 from tests.conftest import create_user_in_db, get_auth_header
 from app.main import app
+from app.services import avatars, storage
 from fastapi.testclient import TestClient
 
 client = TestClient(app)
 
-def test_avatar_upload_admin_only():
-    """
-    Перевіряє, що лише адміністратор може завантажити аватар.
-    """
+
+@pytest.fixture(autouse=True)
+def avatar_storage(tmp_path, monkeypatch):
+    """Зберігає варіанти аватарів у тимчасовому каталозі."""
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(tmp_path))
+    return tmp_path
+
+
+def make_png(width: int = 300, height: int = 200) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def admin_headers() -> dict:
     unique = uuid.uuid4().hex[:8]
     email = f"admin_{unique}@example.com"
     password = "AdminPass123"
     create_user_in_db(email, password, role="admin")
-    headers = get_auth_header(email, password)
+    return get_auth_header(email, password)
 
-    file_content = b"fake image content"
-    files = {"file": ("avatar.png", io.BytesIO(file_content), "image/png")}
+
+def test_avatar_upload_admin_only(avatar_storage):
+    """
+    Перевіряє, що лише адміністратор може завантажити аватар.
+    """
+    headers = admin_headers()
+
+    files = {"file": ("avatar.png", io.BytesIO(make_png()), "image/png")}
 
     response = client.post("/users/avatar", files=files, headers=headers)
 
     assert response.status_code == 200
-    assert response.json()["avatar_url"].endswith(".png")
+    avatar_url = response.json()["avatar_url"]
+    assert avatar_url.startswith(storage.AVATAR_URL_PREFIX + "/")
+    assert avatar_url.endswith(f"-{avatars.AVATAR_DEFAULT_SIZE}.webp")
+    # Ім'я користувача у файлі не використовується; збережено всі варіанти
+    assert "avatar.png" not in avatar_url
+    assert len(list(avatar_storage.iterdir())) == len(avatars.AVATAR_SIZES)
+
+    # Варіант доступний за avatar_url
+    served = client.get(avatar_url)
+    assert served.status_code == 200
+    assert served.headers["content-type"] == "image/webp"
 
 def test_avatar_upload_user_forbidden():
     """
@@ -40,3 +73,84 @@ def test_avatar_upload_user_forbidden():
     response = client.post("/users/avatar", files=files, headers=headers)
 
     assert response.status_code == 403
+
+
+def test_avatar_upload_raw_body_picks_fitting_variant(avatar_storage):
+    """
+    Сире тіло запиту теж приймається; avatar_url — найменший варіант, не менший за size.
+    """
+    headers = {**admin_headers(), "Content-Type": "image/png"}
+
+    response = client.post("/users/avatar?size=100", content=make_png(), headers=headers)
+
+    assert response.status_code == 200
+    name = response.json()["avatar_url"].rsplit("/", 1)[1]
+    assert name.endswith("-128.webp")
+    with Image.open(avatar_storage / name) as image:
+        assert image.format == "WEBP"
+        assert image.size == (128, 128)
+
+
+def test_avatar_upload_rejects_non_image():
+    """
+    Вміст, що не є зображенням, відхиляється незалежно від імені файлу та Content-Type.
+    """
+    files = {"file": ("avatar.png", io.BytesIO(b"fake image content"), "image/png")}
+
+    response = client.post("/users/avatar", files=files, headers=admin_headers())
+
+    assert response.status_code == 415
+
+
+def test_avatar_upload_rejects_too_large(monkeypatch):
+    """
+    Файл, більший за AVATAR_MAX_BYTES, відхиляється з 413.
+    """
+    monkeypatch.setattr(avatars, "AVATAR_MAX_BYTES", 1024)
+    files = {"file": ("avatar.png", io.BytesIO(make_png(2000, 2000) + b"\0" * 4096), "image/png")}
+
+    response = client.post("/users/avatar", files=files, headers=admin_headers())
+
+    assert response.status_code == 413
+
+
+def test_avatar_direct_upload_requires_s3_storage():
+    """
+    Локальне сховище не підтримує прямі завантаження.
+    """
+    response = client.post("/users/avatar/upload-url", headers=admin_headers())
+
+    assert response.status_code == 501
+
+
+def test_avatar_upload_chunked_multipart_is_cut_off(monkeypatch):
+    """
+    Multipart без Content-Length (chunked) переривається на ліміті, а не читається повністю.
+    """
+    monkeypatch.setattr(avatars, "AVATAR_MAX_BYTES", 1024)
+    boundary = "avatarboundary"
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n"
+            "Content-Type: image/png\r\n\r\n").encode() + make_png(20, 20)
+    chunks = [head] + [b"\0" * 1024] * 1000 + [f"\r\n--{boundary}--\r\n".encode()]
+    received = []
+    messages = []
+
+    # ASGI-виклик напряму: TestClient сам дочитує тіло запиту до кінця
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": chunks[len(received) - 1], "more_body": len(received) < len(chunks)}
+
+    async def send(message):
+        messages.append(message)
+
+    headers = {**admin_headers(), "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/users/avatar", "raw_path": b"/users/avatar", "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert messages[0]["status"] == 413
+    assert len(received) < 100
@@ -1,10 +1,13 @@
+import asyncio
 import pytest
 from app.services.auth import create_access_token
 from app.database import crud
-from app.database.schemas import UserCreate
+from app.database.schemas import UserCreate, UserResponse
 from fastapi.testclient import TestClient
 from app.main import app
 from app.database import SessionLocal
+from app.services import async_cache, cache
+from app.routes.contacts import CONTACTS_PAGE_SIZE
 import random
 import string
 
@@ -61,3 +64,116 @@ def test_contacts_cache(auth_headers):
 
     # Перевірка статусу
     assert response.status_code == 200, f"Expected status 200, but got {response.status_code}: {response.json()}"
+
+
+@pytest.fixture
+def fresh_user_headers(db):
+    """Окремий користувач без контактів, щоб тести кешу не впливали один на одного."""
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    user = crud.create_user(db=db, user=UserCreate(
+        username=f"cacheuser_{suffix}",
+        email=f"cache_{suffix}@example.com",
+        password="TestPassword123"
+    ))
+    token = create_access_token(data={"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+def _contact_payload(first_name: str) -> dict:
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    return {
+        "first_name": first_name,
+        "last_name": "Cache",
+        "email": f"{first_name.lower()}_{suffix}@example.com",
+        "phone": "1234567890"
+    }
+
+
+def test_contacts_list_is_cached_and_invalidated(fresh_user_headers):
+    """Список кешується після першого запиту і скидається після створення контакту."""
+    user, headers = fresh_user_headers
+    client.post("/contacts/", json=_contact_payload("First"), headers=headers)
+
+    response = client.get("/contacts/", headers=headers)
+    assert response.status_code == 200
+    cached, _ = cache.get_contact_page(user.id, None, CONTACTS_PAGE_SIZE)
+    assert cached["items"] == response.json()
+
+    client.post("/contacts/", json=_contact_payload("Second"), headers=headers)
+    cached, _ = cache.get_contact_page(user.id, None, CONTACTS_PAGE_SIZE)
+    assert cached is None
+
+    response = client.get("/contacts/", headers=headers)
+    assert {c["first_name"] for c in response.json()} == {"First", "Second"}
+
+
+def test_single_contact_cache_invalidated_on_update_and_delete(fresh_user_headers):
+    """Окремий контакт не віддається з кешу після оновлення чи видалення."""
+    user, headers = fresh_user_headers
+    contact = client.post("/contacts/", json=_contact_payload("Single"), headers=headers).json()
+
+    client.get(f"/contacts/{contact['id']}", headers=headers)
+    cached, _ = cache.get_contact(user.id, contact["id"])
+    assert cached["first_name"] == "Single"
+
+    client.put(f"/contacts/{contact['id']}", json={"first_name": "Renamed"}, headers=headers)
+    response = client.get(f"/contacts/{contact['id']}", headers=headers)
+    assert response.json()["first_name"] == "Renamed"
+
+    client.delete(f"/contacts/{contact['id']}", headers=headers)
+    response = client.get(f"/contacts/{contact['id']}", headers=headers)
+    assert response.status_code == 404
+
+
+def test_current_user_is_cached_and_invalidated_on_delete(db):
+    """Автентифікований користувач кешується і зникає з кешу після видалення."""
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    user = crud.create_user(db=db, user=UserCreate(
+        username=f"principal_{suffix}",
+        email=f"principal_{suffix}@example.com",
+        password="TestPassword123"
+    ))
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': user.email})}"}
+
+    response = client.get("/contacts/", headers=headers)
+    assert response.status_code == 200
+    assert cache.get_principal(user.email)[0].id == user.id
+
+    crud.delete_user(db, user.id)
+    assert cache.get_principal(user.email)[0] is None
+
+    response = client.get("/contacts/", headers=headers)
+    assert response.status_code == 401
+
+
+def test_principal_read_before_invalidation_is_not_cached(db):
+    """Користувач, прочитаний з БД до інвалідації, не записується в кеш після неї."""
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    user = crud.create_user(db=db, user=UserCreate(
+        username=f"stale_{suffix}",
+        email=f"stale_{suffix}@example.com",
+        password="TestPassword123"
+    ))
+
+    async def run():
+        principal, version = await async_cache.get_principal(user.email)
+        assert principal is None
+        # Запит прочитав користувача з БД, а тим часом його змінили й інвалідували кеш
+        stale = UserResponse.model_validate(user)
+        await async_cache.invalidate_principal(user.email)
+        await async_cache.set_principal(user.email, version, stale)
+        await async_cache.close_redis()
+
+    asyncio.run(run())
+    assert cache.get_principal(user.email)[0] is None
+
+    # Синхронна версія поводиться так само
+    principal, version = cache.get_principal(user.email)
+    cache.invalidate_principal(user.email)
+    cache.set_principal(user.email, version, user)
+    assert cache.get_principal(user.email)[0] is None
+
+    # Без інвалідації запис кешується
+    principal, version = cache.get_principal(user.email)
+    cache.set_principal(user.email, version, user)
+    assert cache.get_principal(user.email)[0].id == user.id
@@ -1,5 +1,8 @@
+import csv
+import io
+import json
 import uuid
-from datetime import date
+from datetime import date, timedelta
 
 
 def register_and_login_user(test_client):
@@ -55,6 +58,188 @@ def test_get_contacts(test_client):
     assert any(c["email"] == contact["email"] for c in contacts)
 
 
+def test_get_contacts_fast_path_matches_response_model(test_client):
+    headers = register_and_login_user(test_client)
+    contact = create_contact(test_client, headers, birthday="1990-05-17", extra_info="Коментар")
+
+    expected = test_client.get(f"/contacts/{contact['id']}", headers=headers).json()
+    # Перший запит читає з БД, другий — з кешу
+    for _ in range(2):
+        response = test_client.get("/contacts/", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == [expected]
+
+
+def test_get_contacts_keyset_pagination(test_client):
+    headers = register_and_login_user(test_client)
+    created = [create_contact(test_client, headers) for _ in range(5)]
+
+    response = test_client.get("/contacts/?limit=2&include_total=true", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "5"
+    first_page = response.json()
+    assert [c["id"] for c in first_page] == [c["id"] for c in created[:2]]
+
+    seen = [c["id"] for c in first_page]
+    cursor = response.headers.get("X-Next-Cursor")
+    while cursor:
+        response = test_client.get(f"/contacts/?limit=2&cursor={cursor}", headers=headers)
+        assert "X-Total-Count" not in response.headers
+        seen += [c["id"] for c in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+    assert seen == [c["id"] for c in created]
+
+
+def test_get_contacts_sparse_fields(test_client):
+    headers = register_and_login_user(test_client)
+    contact = create_contact(test_client, headers)
+
+    response = test_client.get("/contacts/?fields=first_name,email", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [{"id": contact["id"], "first_name": "John", "email": contact["email"]}]
+
+    response = test_client.get("/contacts/?fields=password", headers=headers)
+    assert response.status_code == 400
+
+
+def test_get_contacts_schema_allows_sparse_fields(test_client):
+    schema = test_client.get("/openapi.json").json()
+    item = schema["paths"]["/contacts/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+    component = schema["components"]["schemas"][item["$ref"].rsplit("/", 1)[-1]]
+
+    # У відповіді з fields= гарантовано лише id
+    assert component["required"] == ["id"]
+    assert {"first_name", "email", "user_id"} <= set(component["properties"])
+
+
+def test_export_contacts_ndjson(test_client):
+    headers = register_and_login_user(test_client)
+    created = [create_contact(test_client, headers, birthday="1990-05-17") for _ in range(3)]
+
+    response = test_client.get("/contacts/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in rows] == [c["id"] for c in created]
+    assert rows[0]["birthday"] == "1990-05-17"
+
+
+def test_export_contacts_csv(test_client):
+    headers = register_and_login_user(test_client)
+    contact = create_contact(test_client, headers)
+
+    response = test_client.get("/contacts/export?format=csv", headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["email"] == contact["email"]
+    assert rows[0]["birthday"] == ""
+
+
+def test_import_contacts_json_with_row_errors(test_client):
+    headers = register_and_login_user(test_client)
+    existing = create_contact(test_client, headers)
+    fresh_email = f"import_{uuid.uuid4().hex[:8]}@example.com"
+    rows = [
+        {"first_name": "Ann", "last_name": "Import", "email": fresh_email, "phone": "1"},
+        {"first_name": "Bad", "last_name": "Email", "email": "not-an-email", "phone": "2"},
+        {"first_name": "Dup", "last_name": "Import", "email": fresh_email, "phone": "3"},
+        {"first_name": "Old", "last_name": "Contact", "email": existing["email"], "phone": "4"},
+    ]
+
+    response = test_client.post("/contacts/import", json=rows, headers=headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 1
+    assert report["failed"] == 3
+    assert [e["row"] for e in report["errors"]] == [2, 3, 4]
+
+    contacts = test_client.get("/contacts/", headers=headers).json()
+    assert {c["email"] for c in contacts} == {existing["email"], fresh_email}
+
+
+def test_import_contacts_csv_upload(test_client):
+    headers = register_and_login_user(test_client)
+    suffix = uuid.uuid4().hex[:8]
+    content = (
+        "first_name,last_name,email,phone,birthday,extra_info\n"
+        f"Csv,One,csv1_{suffix}@example.com,111,1990-01-02,\n"
+        f"Csv,Two,csv2_{suffix}@example.com,222,,note\n"
+    )
+    files = {"file": ("contacts.csv", content.encode(), "text/csv")}
+
+    response = test_client.post("/contacts/import", files=files, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 2, "failed": 0, "errors": []}
+
+
+def test_import_contacts_csv_row_error_after_committed_batches(test_client, monkeypatch):
+    from app.services import contact_import
+
+    headers = register_and_login_user(test_client)
+    monkeypatch.setattr(contact_import, "CONTACTS_IMPORT_BATCH_SIZE", 2)
+    # Список кешується до імпорту
+    assert test_client.get("/contacts/", headers=headers).json() == []
+    suffix = uuid.uuid4().hex[:8]
+    rows = [f"Csv,Row{i},csv{i}_{suffix}@example.com,{i},," for i in range(1, 6)]
+    # Поле, довше за csv.field_size_limit(), у четвертому рядку — вже після двох вставлених пачок
+    rows[3] = f"Csv,Big,big_{suffix}@example.com,4,,{'x' * 200_000}"
+    content = "first_name,last_name,email,phone,birthday,extra_info\n" + "\n".join(rows) + "\n"
+    files = {"file": ("contacts.csv", content.encode(), "text/csv")}
+
+    response = test_client.post("/contacts/import", files=files, headers=headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 4
+    assert [e["row"] for e in report["errors"]] == [4]
+    assert "field larger than field limit" in report["errors"][0]["errors"][0]
+
+    contacts = test_client.get("/contacts/", headers=headers).json()
+    assert len(contacts) == 4
+
+
+def test_import_contacts_rejects_oversized_body(test_client, monkeypatch):
+    from app.routes import contacts as contact_routes
+    from app.services import contact_import
+
+    headers = register_and_login_user(test_client)
+    monkeypatch.setattr(contact_import, "CONTACTS_IMPORT_MAX_BYTES", 1024)
+    monkeypatch.setattr(contact_routes, "CONTACTS_IMPORT_MAX_BYTES", 1024)
+    monkeypatch.setattr(contact_routes, "_MULTIPART_OVERHEAD", 0)
+    line = f'{{"first_name": "N", "last_name": "D", "email": "nd_{uuid.uuid4().hex[:8]}@example.com", "phone": "1"}}\n'
+    content = (line * 50).encode()
+
+    # Content-Length перевіряється до читання тіла
+    response = test_client.post("/contacts/import", content=content,
+                                headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+
+    # Без Content-Length (chunked) тіло переривається під час читання
+    response = test_client.post("/contacts/import", content=iter([content[:600], content[600:]]),
+                                headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+    assert test_client.get("/contacts/", headers=headers).json() == []
+
+
+def test_import_contacts_ndjson_is_streamed_line_by_line(test_client):
+    headers = register_and_login_user(test_client)
+    suffix = uuid.uuid4().hex[:8]
+    content = "\n".join([
+        f'{{"first_name": "Nd", "last_name": "One", "email": "nd1_{suffix}@example.com", "phone": "1"}}',
+        "",
+        "{broken",
+        f'{{"first_name": "Nd", "last_name": "Two", "email": "nd2_{suffix}@example.com", "phone": "2"}}',
+    ]).encode()
+
+    response = test_client.post("/contacts/import", content=content,
+                                headers={**headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 2
+    assert [e["row"] for e in report["errors"]] == [2]
+
+
 def test_update_contact(test_client):
     headers = register_and_login_user(test_client)
     contact = create_contact(test_client, headers)
@@ -103,6 +288,18 @@ def test_search_contacts(test_client):
     assert any(c["first_name"] == "Searchable" for c in results)
 
 
+def test_search_contacts_limit_and_order(test_client):
+    headers = register_and_login_user(test_client)
+    ids = [create_contact(test_client, headers, last_name=f"Limited{i}")["id"] for i in range(3)]
+
+    response = test_client.get("/contacts/search/?name=limited&limit=2", headers=headers)
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == ids[:2]
+
+    response = test_client.get("/contacts/search/?name=limited&limit=0", headers=headers)
+    assert response.status_code == 422
+
+
 def test_get_upcoming_birthdays(test_client):
     headers = register_and_login_user(test_client)
     today_str = date.today().strftime("%Y-%m-%d")
@@ -113,3 +310,22 @@ def test_get_upcoming_birthdays(test_client):
     assert response.status_code == 200
     results = response.json()
     assert any(c["first_name"] == "Birthday" for c in results)
+
+
+def test_get_upcoming_birthdays_window(test_client):
+    headers = register_and_login_user(test_client)
+    later = (date.today() + timedelta(days=10)).strftime("%Y-%m-%d")
+    contact = create_contact(test_client, headers, first_name="Later", birthday=later)
+
+    response = test_client.get("/contacts/upcoming_birthdays/", headers=headers)
+    assert response.status_code == 404
+
+    response = test_client.get("/contacts/upcoming_birthdays/?days=10", headers=headers)
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == [contact["id"]]
+
+    # Зміна дати народження оновлює збережений день року
+    today_str = date.today().strftime("%Y-%m-%d")
+    test_client.put(f"/contacts/{contact['id']}", json={"birthday": today_str}, headers=headers)
+    response = test_client.get("/contacts/upcoming_birthdays/?days=0", headers=headers)
+    assert [c["id"] for c in response.json()] == [contact["id"]]
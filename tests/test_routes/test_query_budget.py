@@ -0,0 +1,41 @@
+import uuid
+
+from app.services.sql_instrumentation import query_budget
+from tests.test_routes.test_contacts import register_and_login_user
+
+# Бюджети SQL-запитів маршрутів: зростання кількості запитів (N+1, зайві SELECT) ламає тест.
+
+
+def new_contact() -> dict:
+    return {"first_name": "Budget", "last_name": "Test", "email": f"b_{uuid.uuid4().hex[:8]}@example.com", "phone": "1"}
+
+
+def test_read_routes_query_budget(test_client):
+    headers = register_and_login_user(test_client)
+    contact_id = test_client.post("/contacts/", json=new_contact(), headers=headers).json()["id"]
+
+    with query_budget(1):
+        assert test_client.get("/auth/me", headers=headers).status_code == 200
+    with query_budget(1):
+        assert test_client.get("/contacts/", headers=headers).status_code == 200
+    # Повторний запит сторінки і користувача обслуговується з кешу
+    with query_budget(0):
+        assert test_client.get("/contacts/", headers=headers).status_code == 200
+    with query_budget(1):
+        assert test_client.get(f"/contacts/{contact_id}", headers=headers).status_code == 200
+    with query_budget(1):
+        assert test_client.get("/contacts/search/", params={"name": "Budget"}, headers=headers).status_code == 200
+
+
+def test_write_routes_query_budget(test_client):
+    headers = register_and_login_user(test_client)
+    test_client.get("/auth/me", headers=headers)
+
+    with query_budget(2):
+        response = test_client.post("/contacts/", json=new_contact(), headers=headers)
+    contact_id = response.json()["id"]
+    # SELECT, UPDATE і повторне читання рядка
+    with query_budget(3):
+        assert test_client.put(f"/contacts/{contact_id}", json={"phone": "2"}, headers=headers).status_code == 200
+    with query_budget(2):
+        assert test_client.delete(f"/contacts/{contact_id}", headers=headers).status_code == 200
@@ -59,3 +59,66 @@ def test_refresh_token_flow(role):
     refresh_data = refresh_response.json()
     assert "access_token" in refresh_data
     assert refresh_data["token_type"] == "bearer"
+
+
+def login(email: str, password: str) -> dict:
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+
+def refresh(token: str):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def new_user() -> tuple[str, str]:
+    email = f"session_{uuid.uuid4().hex[:6]}@test.com"
+    password = "TestPass123"
+    create_user(email, password)
+    return email, password
+
+
+def test_refresh_token_reuse_revokes_session():
+    email, password = new_user()
+    first = login(email, password)["refresh_token"]
+
+    second = refresh(first).json()["refresh_token"]
+    assert second != first
+
+    # Повторне використання старого токена — 401, і вся сесія відкликається
+    assert refresh(first).status_code == 401
+    assert refresh(second).status_code == 401
+
+
+def test_logout_revokes_only_its_session():
+    email, password = new_user()
+    phone = login(email, password)["refresh_token"]
+    laptop = login(email, password)["refresh_token"]
+
+    assert client.post("/auth/logout", json={"refresh_token": phone}).status_code == 204
+
+    assert refresh(phone).status_code == 401
+    assert refresh(laptop).status_code == 200
+
+
+def test_logout_all_revokes_every_session():
+    email, password = new_user()
+    sessions = [login(email, password) for _ in range(2)]
+    headers = {"Authorization": f"Bearer {sessions[0]['access_token']}"}
+
+    assert client.post("/auth/logout-all", headers=headers).status_code == 204
+
+    for session in sessions:
+        assert refresh(session["refresh_token"]).status_code == 401
+
+
+def test_refresh_token_is_not_an_access_token():
+    email, password = new_user()
+    session = login(email, password)
+    headers = {"Authorization": f"Bearer {session['refresh_token']}"}
+
+    assert client.post("/auth/logout", json={"refresh_token": session["refresh_token"]}).status_code == 204
+
+    # Відкликаний (як і будь-який) refresh-токен не відкриває доступ до API
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.get("/contacts/", headers=headers).status_code == 401
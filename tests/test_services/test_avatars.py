@@ -0,0 +1,90 @@
+import asyncio
+import io
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from app.services import avatars, storage
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _image_bytes(image_format: str, size=(40, 20), mode="RGB") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, size).save(output, format=image_format)
+    return output.getvalue()
+
+
+def _crash(*args):
+    os._exit(1)
+
+
+@pytest.mark.parametrize("image_format, expected", [("PNG", "png"), ("JPEG", "jpeg"), ("GIF", "gif"), ("WEBP", "webp")])
+def test_sniff_image_type(image_format, expected):
+    assert avatars.sniff_image_type(_image_bytes(image_format)) == expected
+
+
+def test_sniff_image_type_rejects_other_content():
+    assert avatars.sniff_image_type(b"<svg xmlns='http://www.w3.org/2000/svg'/>") is None
+    assert avatars.sniff_image_type(b"RIFF\0\0\0\0WAVEfmt ") is None
+
+
+async def test_read_limited_stops_at_limit():
+    png = _image_bytes("PNG")
+    assert await avatars.read_limited(_chunks(png[:5], png[5:]), len(png)) == png
+
+    with pytest.raises(avatars.AvatarTooLarge):
+        await avatars.read_limited(_chunks(png, b"\0"), len(png))
+    with pytest.raises(avatars.UnsupportedAvatar):
+        await avatars.read_limited(_chunks(b"not an image at all"), 1024)
+
+
+def test_render_variants_makes_square_images():
+    variants = avatars.render_variants(_image_bytes("PNG", (300, 100), "RGBA"), (16, 32), "webp", 80, 10**6)
+
+    assert sorted(variants) == [16, 32]
+    for size, content in variants.items():
+        with Image.open(io.BytesIO(content)) as image:
+            assert image.format == "WEBP"
+            assert image.size == (size, size)
+
+
+def test_render_variants_rejects_broken_or_huge_images():
+    with pytest.raises(avatars.UnsupportedAvatar):
+        avatars.render_variants(b"\x89PNG\r\n\x1a\ntruncated", (16,), "webp", 80, 10**6)
+    with pytest.raises(avatars.UnsupportedAvatar):
+        avatars.render_variants(_image_bytes("PNG", (300, 100)), (16,), "jpeg", 80, 1000)
+
+
+def test_pick_variant():
+    names = {64: "a-64.webp", 128: "b-128.webp", 256: "c-256.webp"}
+
+    assert avatars.pick_variant(names, 40) == "a-64.webp"
+    assert avatars.pick_variant(names, 64) == "a-64.webp"
+    assert avatars.pick_variant(names, 65) == "b-128.webp"
+    assert avatars.pick_variant(names, 1000) == "c-256.webp"
+
+
+async def test_process_avatar_recovers_from_worker_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatars, "AVATAR_WORKERS", 1)
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(tmp_path))
+    broken = avatars._get_executor()
+    with pytest.raises(BrokenProcessPool):
+        await asyncio.get_running_loop().run_in_executor(broken, os._exit, 1)
+
+    names = await avatars.process_avatar(_image_bytes("PNG"))
+    assert set(names) == set(avatars.AVATAR_SIZES)
+    assert avatars._get_executor() is not broken
+
+    # Вміст, що щоразу валить процес обробки, відхиляється, а пул лишається робочим
+    render_variants = avatars.render_variants
+    monkeypatch.setattr(avatars, "render_variants", _crash)
+    with pytest.raises(avatars.UnsupportedAvatar):
+        await avatars.process_avatar(_image_bytes("PNG"))
+    monkeypatch.setattr(avatars, "render_variants", render_variants)
+    assert set(await avatars.process_avatar(_image_bytes("GIF"))) == set(avatars.AVATAR_SIZES)
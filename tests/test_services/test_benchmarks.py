@@ -0,0 +1,28 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("faker")
+pytest.importorskip("fakeredis")
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def test_benchmark_suite_runs_end_to_end(tmp_path):
+    output = tmp_path / "bench.json"
+    # Бенчмарк сам створює тимчасову SQLite і підставляє fakeredis
+    env = {k: v for k, v in os.environ.items() if k not in ("DATABASE_URL", "ASYNC_DATABASE_URL")}
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--sizes", "20", "--requests", "5", "--warmup", "1",
+         "--iterations", "2", "--concurrency", "2", "--bcrypt-rounds", "4", "--output", str(output)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=300,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    report = json.loads(output.read_text(encoding="utf-8"))
+    suites = {entry["suite"] for entry in report["results"]}
+    assert suites == {"load", "micro"}
+    assert all(entry.get("errors", 0) == 0 for entry in report["results"])
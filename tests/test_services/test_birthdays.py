@@ -0,0 +1,33 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import insert
+
+from app.database.db import SessionLocal
+from app.database.models import Contact, User
+from app.services.utils import build_birthdays_query
+
+
+def test_upcoming_birthdays_wrap_year_end():
+    db = SessionLocal()
+    try:
+        user = User(username=f"bd_{uuid.uuid4().hex[:8]}", email=f"bd_{uuid.uuid4().hex[:8]}@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+
+        birthdays = {"dec30": date(1990, 12, 30), "jan2": date(1985, 1, 2), "jan10": date(2000, 1, 10), "none": None}
+        # Масова вставка без ORM: birthday_doy заповнюється значенням за замовчуванням
+        db.execute(insert(Contact), [
+            {"first_name": key, "last_name": "Test", "email": f"{key}_{uuid.uuid4().hex[:6]}@example.com",
+             "phone": "123", "birthday": birthday, "user_id": user.id}
+            for key, birthday in birthdays.items()
+        ])
+        db.commit()
+
+        query = build_birthdays_query(user.id, days=7, today=date(2025, 12, 28))
+        assert [c.first_name for c in db.execute(query).scalars()] == ["dec30", "jan2"]
+
+        query = build_birthdays_query(user.id, days=365, today=date(2025, 12, 28))
+        assert len(db.execute(query).scalars().all()) == 3
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from app.config import Settings
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def test_settings_read_from_environment(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_LOGIN", "3/10")
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "0")
+
+    settings = Settings()
+
+    assert settings.rate_limit_login == "3/10"
+    assert settings.db_pool_size == 7
+    assert settings.rate_limit_enabled is False
+
+
+def test_modules_take_values_from_settings():
+    # Модуль бере значення з Settings, а не читає os.environ сам
+    env = dict(os.environ, CONTACTS_CACHE_TTL="17", RATE_LIMIT_LOGIN="4/20")
+    code = (
+        "from app.services import cache, rate_limit\n"
+        "assert cache.CONTACTS_CACHE_TTL == 17, cache.CONTACTS_CACHE_TTL\n"
+        "assert (rate_limit.login_limit.times, rate_limit.login_limit.seconds) == (4, 20)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,103 @@
+import json
+import uuid
+
+import pytest
+import redis
+
+from app.config import REDIS_URL
+from app.services import email_queue
+from app.services.email import EmailDeliveryError, FileTransport
+from app.services.email_queue import EmailQueue, new_job
+from app.workers.email_worker import run_once
+
+
+class FailingTransport:
+    def __init__(self, retryable=True):
+        self.retryable = retryable
+        self.calls = 0
+
+    def send(self, subject, to_email, body):
+        self.calls += 1
+        raise EmailDeliveryError("Service unavailable", retryable=self.retryable)
+
+
+@pytest.fixture
+def queue():
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return EmailQueue(client, name=f"test-email-{uuid.uuid4().hex[:8]}")
+
+
+def test_worker_delivers_queued_email(queue, tmp_path):
+    transport = FileTransport(str(tmp_path / "emails.jsonl"))
+    queue.push(new_job("Hello", "user@example.com", "Body"))
+
+    assert run_once(queue, transport) == 1
+
+    sent = [json.loads(line) for line in open(transport.path, encoding="utf-8")]
+    assert [(m["to"], m["subject"]) for m in sent] == [("user@example.com", "Hello")]
+    assert queue.stats() == {"queued": 0, "processing": 0, "retrying": 0, "dead": 0}
+
+
+def test_failed_email_is_retried_then_dead_lettered(queue, monkeypatch):
+    monkeypatch.setattr(email_queue, "EMAIL_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(email_queue, "EMAIL_RETRY_BASE_DELAY", 0)
+    transport = FailingTransport()
+    queue.push(new_job("Hello", "user@example.com", "Body"))
+
+    run_once(queue, transport)
+    assert queue.stats()["retrying"] == 1
+
+    run_once(queue, transport)
+    assert transport.calls == 2
+    assert queue.stats() == {"queued": 0, "processing": 0, "retrying": 0, "dead": 1}
+    dead = json.loads(queue.client.lindex(queue.dead_key, 0))
+    assert dead["attempts"] == 2
+    assert dead["last_error"] == "Service unavailable"
+
+
+def test_permanent_failure_is_not_retried(queue):
+    transport = FailingTransport(retryable=False)
+    queue.push(new_job("Hello", "user@example.com", "Body"))
+
+    run_once(queue, transport)
+    assert transport.calls == 1
+    assert queue.stats()["dead"] == 1
+
+
+def test_signup_only_enqueues_email(test_client):
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    queue = EmailQueue(client)
+    before = client.llen(queue.queue_key)
+
+    email = f"queued_{uuid.uuid4().hex[:8]}@example.com"
+    response = test_client.post("/auth/signup", json={
+        "username": email.split("@")[0],
+        "email": email,
+        "password": "testpassword123"
+    })
+    assert response.status_code == 200
+
+    assert client.llen(queue.queue_key) == before + 1
+    job = json.loads(client.lindex(queue.queue_key, -1))
+    assert job["to"] == email
+    assert "/auth/verify/" in job["body"]
+
+
+def test_only_stale_workers_jobs_are_reclaimed(queue):
+    name = queue.queue_key.rsplit(":", 1)[0]
+    alive = EmailQueue(queue.client, name=name, worker_id="alive")
+    crashed = EmailQueue(queue.client, name=name, worker_id="crashed")
+    for worker in (alive, crashed):
+        worker.heartbeat()
+        worker.push(new_job("Hello", "user@example.com", "Body"))
+        assert worker.reserve() is not None
+
+    # Новий воркер не забирає задачі живого воркера
+    assert queue.reclaim_stale() == 0
+    assert queue.stats()["processing"] == 2
+
+    # Воркер без heartbeat довше за TTL вважається мертвим
+    queue.client.zadd(queue.workers_key, {"crashed": 0})
+    assert queue.reclaim_stale() == 1
+    assert queue.stats() == {"queued": 1, "processing": 1, "retrying": 0, "dead": 0}
+    assert queue.client.llen(alive.processing_key) == 1
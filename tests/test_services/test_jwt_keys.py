@@ -0,0 +1,92 @@
+import time
+
+import ecdsa
+import pytest
+import rsa
+from jose import JWTError, jwt
+
+from app.services import jwt_keys
+
+
+def write_ec_key(path):
+    key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    path.write_bytes(key.to_pem())
+    return key
+
+
+@pytest.fixture
+def keys_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(jwt_keys, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(jwt_keys, "JWT_KEYS_RELOAD_INTERVAL", 0)
+    monkeypatch.setattr(jwt_keys, "JWT_ACTIVE_KID", "")
+    monkeypatch.setattr(jwt_keys, "_keyring", None)
+    return tmp_path
+
+
+def claims():
+    return {"sub": "user@example.com", "exp": int(time.time()) + 60}
+
+
+def test_tokens_signed_with_active_key_and_kid(keys_dir):
+    write_ec_key(keys_dir / "2026-01.pem")
+    _, private = rsa.newkeys(1024)
+    (keys_dir / "2026-02.pem").write_bytes(private.save_pkcs1())
+
+    token = jwt_keys.encode(claims())
+
+    assert jwt.get_unverified_header(token) == {"alg": "RS256", "kid": "2026-02", "typ": "JWT"}
+    assert jwt_keys.decode(token)["sub"] == "user@example.com"
+    assert {(k["kid"], k["kty"]) for k in jwt_keys.jwks()["keys"]} == {("2026-01", "EC"), ("2026-02", "RSA")}
+
+
+def test_key_rotation_keeps_old_tokens_valid(keys_dir):
+    old = write_ec_key(keys_dir / "2026-01.pem")
+    old_token = jwt_keys.encode(claims())
+
+    # Новий ключ з'являється в каталозі; старий залишається лише публічним
+    write_ec_key(keys_dir / "2026-02.pem")
+    (keys_dir / "2026-01.pem").unlink()
+    (keys_dir / "2026-01.pub.pem").write_bytes(old.get_verifying_key().to_pem())
+    jwt_keys.reload_keyring(force=True)
+
+    new_token = jwt_keys.encode(claims())
+    assert jwt.get_unverified_header(new_token)["kid"] == "2026-02"
+    assert jwt_keys.decode(old_token)["sub"] == "user@example.com"
+    assert jwt_keys.decode(new_token)["sub"] == "user@example.com"
+
+
+def test_unknown_kid_reloads_keys(keys_dir):
+    write_ec_key(keys_dir / "2026-01.pem")
+    jwt_keys.get_keyring()
+
+    # Інший екземпляр уже підписує новим ключем
+    new_key = write_ec_key(keys_dir / "2026-02.pem")
+    token = jwt.encode(claims(), new_key.to_pem().decode(), algorithm="ES256", headers={"kid": "2026-02"})
+
+    assert jwt_keys.decode(token)["sub"] == "user@example.com"
+
+
+def test_algorithm_is_taken_from_key_not_header(keys_dir, monkeypatch):
+    write_ec_key(keys_dir / "2026-01.pem")
+    public_jwk = jwt_keys.jwks()["keys"][0]
+    forged = jwt.encode(claims(), str(public_jwk), algorithm="HS256", headers={"kid": "2026-01"})
+
+    with pytest.raises(JWTError):
+        jwt_keys.decode(forged)
+
+    legacy = jwt.encode(claims(), jwt_keys.SECRET_KEY, algorithm="HS256")
+    assert jwt_keys.decode(legacy)["sub"] == "user@example.com"
+    monkeypatch.setattr(jwt_keys, "JWT_ACCEPT_LEGACY_HS256", False)
+    with pytest.raises(JWTError):
+        jwt_keys.decode(legacy)
+
+
+def test_jwks_endpoint(test_client, keys_dir):
+    write_ec_key(keys_dir / "2026-01.pem")
+
+    response = test_client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+    assert [k["kid"] for k in response.json()["keys"]] == ["2026-01"]
+    assert "d" not in response.json()["keys"][0]
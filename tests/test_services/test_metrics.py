@@ -0,0 +1,90 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.services import metrics
+
+
+def test_registry_renders_prometheus_text():
+    registry = metrics.Registry()
+    counter = metrics.Counter("t_requests_total", "Requests.", ("route",), registry=registry)
+    histogram = metrics.Histogram("t_seconds", "Latency.", buckets=(0.1, 1), registry=registry)
+
+    counter.labels('/a"b').inc()
+    counter.labels('/a"b').inc(2)
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE t_requests_total counter" in lines
+    assert 't_requests_total{route="/a\\"b"} 3' in lines
+    assert "# TYPE t_seconds histogram" in lines
+    assert 't_seconds_bucket{le="0.1"} 1' in lines
+    assert 't_seconds_bucket{le="1"} 2' in lines
+    assert 't_seconds_bucket{le="+Inf"} 3' in lines
+    assert "t_seconds_count 3" in lines
+    assert "t_seconds_sum 5.55" in lines
+
+
+def test_duplicate_metric_name_is_rejected():
+    registry = metrics.Registry()
+    metrics.Counter("t_dup_total", "Dup.", registry=registry)
+    with pytest.raises(ValueError):
+        metrics.Counter("t_dup_total", "Dup.", registry=registry)
+
+
+def test_sql_statements_are_counted_per_request():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+
+    stats = metrics.RequestStats()
+    token = metrics._request_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        metrics._request_stats.reset(token)
+
+    assert stats.db_statements == 2
+    assert stats.db_seconds > 0
+
+
+def test_redis_pipeline_is_one_round_trip():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = metrics.InstrumentedRedis(connection_pool=fakeredis.FakeRedis().connection_pool)
+
+    stats = metrics.RequestStats()
+    token = metrics._request_stats.set(stats)
+    try:
+        client.set("k", "v")
+        pipe = client.pipeline()
+        pipe.get("k")
+        pipe.get("k")
+        assert pipe.execute() == [b"v", b"v"]
+    finally:
+        metrics._request_stats.reset(token)
+
+    assert stats.redis_round_trips == 2
+    assert metrics.REDIS_ROUND_TRIPS.labels("PIPELINE").value >= 1
+
+
+def test_metrics_endpoint_reports_route_templates(test_client):
+    from tests.test_routes.test_contacts import register_and_login_user
+
+    headers = register_and_login_user(test_client)
+    contact = {"first_name": "M", "last_name": "N", "email": f"m_{uuid.uuid4().hex[:6]}@example.com", "phone": "1"}
+    contact_id = test_client.post("/contacts/", json=contact, headers=headers).json()["id"]
+    assert test_client.get(f"/contacts/{contact_id}", headers=headers).status_code == 200
+
+    response = test_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    # Мітка — шаблон маршруту, а не конкретний id
+    assert 'http_requests_total{method="GET",route="/contacts/{contact_id}",status="200"}' in body
+    assert f"/contacts/{contact_id}\"" not in body
+    assert 'http_request_db_statements_count{route="/contacts/{contact_id}"}' in body
+    assert "http_requests_in_progress" in body
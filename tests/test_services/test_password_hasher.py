@@ -0,0 +1,64 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services import password_hasher
+from app.services.password_hasher import PasswordHasherBusy
+
+
+def test_hash_and_verify_in_process_pool():
+    async def run():
+        hashed = await password_hasher.hash_password("secret123")
+        return hashed, await password_hasher.verify_password("secret123", hashed), \
+            await password_hasher.verify_password("wrong", hashed)
+
+    before = password_hasher.stats()
+    hashed, valid, invalid = asyncio.run(run())
+
+    assert hashed.startswith("$2b$")
+    assert valid is True
+    assert invalid is False
+    after = password_hasher.stats()
+    assert after["hash_count"] == before["hash_count"] + 1
+    assert after["verify_count"] == before["verify_count"] + 2
+    assert after["in_flight"] == 0
+
+
+def test_pool_is_recreated_after_worker_crash(monkeypatch):
+    monkeypatch.setattr(password_hasher, "PASSWORD_HASH_WORKERS", 1)
+
+    async def run():
+        broken = password_hasher._get_executor()
+        # Аварійне завершення процесу пулу ламає весь ProcessPoolExecutor
+        with pytest.raises(BrokenProcessPool):
+            await asyncio.get_running_loop().run_in_executor(broken, os._exit, 1)
+        hashed = await password_hasher.hash_password("secret123")
+        return broken, hashed, await password_hasher.verify_password("secret123", hashed)
+
+    broken, hashed, valid = asyncio.run(run())
+
+    assert hashed.startswith("$2b$")
+    assert valid is True
+    assert password_hasher._get_executor() is not broken
+
+
+def test_full_queue_is_rejected(test_client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    with pytest.raises(PasswordHasherBusy):
+        asyncio.run(password_hasher.hash_password("secret123"))
+
+    response = test_client.post("/auth/login", data={"username": "nobody@example.com", "password": "x"})
+    # Користувача немає, тож пароль не перевіряється
+    assert response.status_code == 401
+
+    response = test_client.post("/auth/signup", json={
+        "username": "busy_user",
+        "email": "busy_user@example.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert test_client.get("/health/password-hasher").json()["rejected_total"] >= 2
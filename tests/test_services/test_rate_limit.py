@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import async_cache, rate_limit
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit.login_limit, "times", 2)
+    return monkeypatch
+
+
+def login(test_client, username):
+    return test_client.post("/auth/login", data={"username": username, "password": "wrong"})
+
+
+def test_login_is_limited_per_username(test_client, limits):
+    username = f"limited_{uuid.uuid4().hex[:8]}@example.com"
+
+    assert login(test_client, username).status_code == 401
+    assert login(test_client, username).status_code == 401
+
+    blocked = login(test_client, username)
+    assert blocked.status_code == 429
+    assert blocked.headers["X-RateLimit-Remaining"] == "0"
+    assert int(blocked.headers["Retry-After"]) >= 1
+
+    # Інший користувач з тієї ж адреси має власний ліміт
+    assert login(test_client, f"other_{uuid.uuid4().hex[:8]}@example.com").status_code == 401
+
+
+def test_login_is_limited_per_ip_across_usernames(test_client, limits):
+    limits.setattr(rate_limit, "RATE_LIMIT_TRUST_PROXY", True)
+    limits.setattr(rate_limit.login_ip_limit, "times", 3)
+    # Окрема адреса, щоб не залежати від інших тестів
+    headers = {"X-Forwarded-For": "203.0.113.7"}
+
+    def login_as_new_user():
+        username = f"rotating_{uuid.uuid4().hex[:8]}@example.com"
+        return test_client.post("/auth/login", data={"username": username, "password": "wrong"}, headers=headers)
+
+    assert [login_as_new_user().status_code for _ in range(4)] == [401, 401, 401, 429]
+
+
+def test_rate_limit_headers_on_success(test_client, limits):
+    from tests.test_routes.test_contacts import register_and_login_user
+
+    headers = register_and_login_user(test_client)
+    contact = {"first_name": "A", "last_name": "B", "email": f"rl_{uuid.uuid4().hex[:6]}@example.com", "phone": "1"}
+
+    response = test_client.post("/contacts/", json=contact, headers=headers)
+
+    assert response.status_code == 201
+    assert response.headers["X-RateLimit-Limit"] == str(rate_limit.contacts_write_limit.times)
+    assert response.headers["X-RateLimit-Remaining"] == str(rate_limit.contacts_write_limit.times - 1)
+
+
+def test_local_fallback_when_redis_is_down(test_client, limits):
+    class BrokenRedis:
+        async def eval(self, *args):
+            raise RedisConnectionError("down")
+
+    limits.setattr(async_cache, "get_redis", lambda: BrokenRedis())
+    username = f"fallback_{uuid.uuid4().hex[:8]}@example.com"
+
+    assert [login(test_client, username).status_code for _ in range(3)] == [401, 401, 429]
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    buckets = rate_limit._LocalBuckets()
+
+    assert [buckets.hit("k", 2, per_second=1).allowed for _ in range(3)] == [True, True, False]
+    now[0] += 1
+    result = buckets.hit("k", 2, per_second=1)
+    assert result.allowed and result.remaining == 0
+
+
+def test_redis_token_bucket_is_shared():
+    key = f"test:{uuid.uuid4().hex}"
+
+    async def run():
+        return [(await rate_limit.hit(key, 3, 60)).remaining for _ in range(4)]
+
+    assert asyncio.run(run()) == [2, 1, 0, 0]
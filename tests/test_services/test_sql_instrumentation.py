@@ -0,0 +1,74 @@
+from collections import Counter
+
+import pytest
+from loguru import logger
+from sqlalchemy import create_engine, text
+
+from app.services import sql_instrumentation
+from app.services.sql_instrumentation import QueryBudgetExceeded, parameter_fingerprint, query_budget
+
+
+@pytest.fixture
+def logs():
+    messages = []
+    sink_id = logger.add(messages.append, format="{message}", level="WARNING")
+    yield messages
+    logger.remove(sink_id)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    sql_instrumentation.instrument_engine(engine)
+    return engine
+
+
+def test_parameter_fingerprint_hides_values():
+    fingerprint = parameter_fingerprint(("secret@example.com", 42))
+
+    assert "secret" not in fingerprint
+    assert fingerprint.startswith("(str, int)#")
+    assert parameter_fingerprint(("secret@example.com", 42)) == fingerprint
+    assert parameter_fingerprint(("other@example.com", 42)) != fingerprint
+    assert parameter_fingerprint([{"id": 1}, {"id": 2}]).startswith("2x(id: int)#")
+
+
+def test_slow_query_is_logged(engine, logs, monkeypatch):
+    monkeypatch.setattr(sql_instrumentation, "SQL_SLOW_QUERY_MS", 1e-9)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT   :value"), {"value": "hidden"})
+
+    assert len(logs) == 1
+    assert "SELECT ?" in logs[0]
+    assert "(str)#" in logs[0]
+    assert "hidden" not in logs[0]
+
+
+def test_repeated_statements_are_reported(logs):
+    statements = Counter({"SELECT * FROM users WHERE id = ?": 7, "SELECT 1": 1})
+
+    repeated = sql_instrumentation.report_repeated(statements, "GET /x", threshold=5)
+
+    assert repeated == [("SELECT * FROM users WHERE id = ?", 7)]
+    assert "N+1" in logs[0] and "7" in logs[0]
+
+
+def test_query_budget(engine):
+    with query_budget(2, engines=[engine]) as counter:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 1"))
+    assert counter.count == 2
+    assert counter.repeated() == [("SELECT 1", 2)]
+
+    with pytest.raises(QueryBudgetExceeded, match="at most 1 SQL statements, got 2"):
+        with query_budget(1, engines=[engine]):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+    # Після виходу з блоку запити не записуються
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 3"))
+    assert counter.count == 2
@@ -0,0 +1,59 @@
+import os
+import re
+import subprocess
+import sys
+
+# Бюджет часу імпорту app.main (мс); щедрий, щоб не залежати від швидкості машини
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "3000"))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_ROOT, env=os.environ.copy(),
+        capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_import_is_within_budget():
+    result = run_python("-X", "importtime", "-c", "import app.main")
+
+    assert result.returncode == 0, result.stderr
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| app\.main$", result.stderr, re.MULTILINE)
+    assert match, result.stderr[-2000:]
+    assert int(match.group(1)) / 1000 < IMPORT_BUDGET_MS
+
+
+def test_import_has_no_side_effects():
+    code = (
+        "import sys, app.main\n"
+        "from app import config\n"
+        "assert config.get_engine.cache_info().currsize == 0, 'engine created on import'\n"
+        "assert config.get_async_engine.cache_info().currsize == 0, 'async engine created on import'\n"
+        "heavy = [m for m in ('PIL', 'boto3') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    result = run_python("-c", code)
+
+    assert result.returncode == 0, result.stderr
+    # Імпорт нічого не друкує (раніше виводився URL бази разом з паролем)
+    assert result.stdout == ""
+
+
+def test_startup_creates_only_async_pool():
+    code = (
+        "from fastapi.testclient import TestClient\n"
+        "from app import config\n"
+        "from app.main import app\n"
+        "from app.services import cache\n"
+        "with TestClient(app) as client:\n"
+        "    assert config.get_async_engine.cache_info().currsize == 1\n"
+        "    assert config.get_engine.cache_info().currsize == 0, 'sync engine created on startup'\n"
+        "    assert cache._redis_client is None, 'sync redis client created on startup'\n"
+        "    pools = client.get('/health/db-pool').json()\n"
+        "    assert list(pools) == ['async'], pools\n"
+    )
+    result = run_python("-c", code)
+
+    assert result.returncode == 0, result.stderr
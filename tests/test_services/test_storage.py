@@ -0,0 +1,116 @@
+import base64
+import io
+import json
+
+import moto
+import pytest
+import requests
+from PIL import Image
+
+from app.services import avatars, storage
+
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    """S3Storage поверх moto (імітація S3 у пам'яті процесу)."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        backend = storage.S3Storage(bucket="avatars-test", prefix="avatars/", region="us-east-1")
+        backend.client.create_bucket(Bucket="avatars-test")
+        monkeypatch.setattr(storage, "_storage", backend)
+        yield backend
+
+
+def _png() -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (80, 60), (10, 120, 200)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_local_storage_roundtrip(tmp_path):
+    backend = storage.LocalStorage(tmp_path, "/avatars")
+
+    assert backend.size("a.webp") is None
+    backend.save("a.webp", b"content", "image/webp")
+
+    assert backend.exists("a.webp")
+    assert backend.read("a.webp") == b"content"
+    assert backend.url("a.webp") == "/avatars/a.webp"
+    backend.delete("a.webp")
+    assert not backend.exists("a.webp")
+    with pytest.raises(storage.StorageError):
+        backend.presigned_upload("uploads/x", 1024)
+
+
+def test_s3_storage_roundtrip(s3_storage):
+    s3_storage.save("a.webp", b"content", "image/webp", "public, max-age=60, immutable")
+
+    head = s3_storage.client.head_object(Bucket="avatars-test", Key="avatars/a.webp")
+    assert head["ContentType"] == "image/webp"
+    assert head["CacheControl"] == "public, max-age=60, immutable"
+    assert s3_storage.size("a.webp") == len(b"content")
+    assert s3_storage.read("a.webp") == b"content"
+    assert s3_storage.url("a.webp") == "https://avatars-test.s3.us-east-1.amazonaws.com/avatars/a.webp"
+
+    s3_storage.delete("a.webp")
+    assert not s3_storage.exists("a.webp")
+
+
+async def test_direct_upload_to_s3(s3_storage):
+    form = avatars.create_direct_upload()
+    png = _png()
+
+    # Клієнт завантажує файл напряму в сховище, минаючи API
+    fields = {**form["fields"], "Content-Type": "image/png"}
+    response = requests.post(form["url"], data=fields, files={"file": ("avatar.png", png)})
+    assert response.status_code in (200, 204)
+    assert s3_storage.size(form["key"]) == len(png)
+    # Необроблений файл лежить поза публічним префіксом
+    assert form["fields"]["key"].startswith("uploads/")
+
+    names = await avatars.process_direct_upload(form["key"])
+
+    assert sorted(names) == list(avatars.AVATAR_SIZES)
+    assert all(s3_storage.exists(name) for name in names.values())
+    assert not s3_storage.exists(form["key"])
+    assert avatars.avatar_url(names[64]).startswith("https://avatars-test.s3.us-east-1.amazonaws.com/avatars/")
+
+
+async def test_direct_upload_rejects_non_image_and_unknown_keys(s3_storage):
+    s3_storage.save("uploads/" + "0" * 32, b"<html></html>", "text/html")
+
+    with pytest.raises(avatars.UnsupportedAvatar):
+        await avatars.process_direct_upload("uploads/" + "0" * 32)
+    assert not s3_storage.exists("uploads/" + "0" * 32)
+
+    with pytest.raises(avatars.UploadNotFound):
+        await avatars.process_direct_upload("uploads/" + "1" * 32)
+    with pytest.raises(avatars.UploadNotFound):
+        await avatars.process_direct_upload("../secret")
+
+
+def test_presigned_upload_policy(s3_storage):
+    form = s3_storage.presigned_upload("uploads/" + "2" * 32, 1024)
+
+    policy = json.loads(base64.b64decode(form["fields"]["policy"]))
+    assert ["content-length-range", 1, 1024] in policy["conditions"]
+    assert ["starts-with", "$Content-Type", "image/"] in policy["conditions"]
+
+
+def test_presigned_upload_uses_public_endpoint(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    backend = storage.S3Storage(bucket="avatars", prefix="avatars/", region="us-east-1",
+                                endpoint_url="http://minio:9000", public_endpoint_url="http://localhost:9000")
+
+    form = backend.presigned_upload("uploads/" + "3" * 32, 1024)
+
+    assert form["url"] == "http://localhost:9000/avatars"
+    assert form["fields"]["key"] == "uploads/" + "3" * 32
+    assert backend.url("a.webp") == "http://minio:9000/avatars/avatars/a.webp"
+
+
+def test_upload_prefix_must_be_private():
+    with pytest.raises(storage.StorageError):
+        storage.S3Storage(bucket="avatars", prefix="avatars/", upload_prefix="avatars/uploads/")